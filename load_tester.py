@@ -0,0 +1,405 @@
+#!/usr/bin/env python
+"""
+Load generator for the Socialistic API.
+
+Many virtual users, each an ApiTester with its own account and token, run a
+weighted mix of scenarios (feed read, like toggle, comment, follow toggle,
+search, notification poll) against a running server from a thread pool.
+
+- Closed loop (default): each virtual user runs one scenario after the
+  other, optionally pausing ``--think-time`` seconds in between.
+- Open loop (``--rps``): scenarios start at a fixed rate whatever the
+  server's speed, shared by the virtual users. Latencies count from when a
+  request was due rather than when it was sent, so a slow server is not
+  hidden by the generator waiting for it (coordinated omission).
+
+Requests made during ``--warmup`` are not recorded. The p50/p95/p99
+latencies, error rates and throughput of every request type are printed and
+saved as JSON, by default to load_test_results.json next to the
+api_test_results.json of run_api_tests.py.
+
+The server only needs SQLite; with USE_REDIS=False the cache and the
+channel layer are kept in process:
+
+    USE_REDIS=False python manage.py runserver 8050
+    python load_tester.py --users 50 --warmup 10 --duration 60
+    python load_tester.py --rps 200 --mix feed=5,search=2,notifications=3
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+from urllib.parse import urljoin
+
+import requests
+
+from api_tester import ApiTester
+
+logger = logging.getLogger('load_tester')
+
+DEFAULT_MIX = {
+    'feed': 40,
+    'like': 15,
+    'comment': 10,
+    'follow': 10,
+    'search': 10,
+    'notifications': 15,
+}
+SEARCH_TERMS = ['python', 'django', 'async', 'bug', 'test', 'react', 'code', 'api']
+PASSWORD = 'loadtest-password-123'
+
+
+def percentile(values, q):
+    """The nearest-rank ``q``th percentile of sorted ``values``."""
+    if not values:
+        return None
+    rank = max(math.ceil(q / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    """Summarize the latencies in seconds and error count of one request type."""
+    latencies = sorted(latencies)
+    count = len(latencies)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        'requests': count,
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': ms(sum(latencies) / count) if count else None,
+        'p50_ms': ms(percentile(latencies, 50)),
+        'p95_ms': ms(percentile(latencies, 95)),
+        'p99_ms': ms(percentile(latencies, 99)),
+        'max_ms': ms(latencies[-1]) if count else None,
+    }
+
+
+class Recorder:
+    """Collects the latency and outcome of each request, from all threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.recording = False
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+
+    def add(self, name, latency, error=None):
+        if not self.recording:
+            return
+        with self.lock:
+            self.latencies[name].append(latency)
+            if error is not None:
+                self.errors[name][error] += 1
+
+    def report(self, elapsed):
+        names = sorted(self.latencies)
+        overall = summarize(
+            [latency for name in names for latency in self.latencies[name]],
+            sum(sum(self.errors[name].values()) for name in names),
+            elapsed,
+        )
+        return {
+            'overall': overall,
+            'requests': {
+                name: summarize(self.latencies[name], sum(self.errors[name].values()), elapsed)
+                for name in names
+            },
+            'errors': {name: dict(errors) for name, errors in self.errors.items() if errors},
+        }
+
+
+class VirtualUser(ApiTester):
+    """A registered user running scenarios with its own session and token."""
+
+    def __init__(self, base_url, recorder, run_id, number, timeout=10, seed=None):
+        super().__init__(base_url, None)
+        self.recorder = recorder
+        self.username = f'loadtest_{run_id}_{number}'
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.random = random.Random(f'{run_id if seed is None else seed}-{number}')
+        self.due = None
+        self.post_ids = []
+        self.author_ids = []
+        self.liked = set()
+        self.following = set()
+
+    def request(self, name, method, endpoint, expected_codes, **kwargs):
+        """Send a request and record its latency; returns None on failure."""
+        start, self.due = self.due or time.perf_counter(), None
+        try:
+            response = self.session.request(
+                method, urljoin(self.base_url, endpoint),
+                headers=self.get_headers(), timeout=self.timeout, **kwargs
+            )
+        except requests.RequestException as e:
+            self.recorder.add(name, time.perf_counter() - start, type(e).__name__)
+            return None
+        passed = response.status_code in expected_codes
+        self.recorder.add(name, time.perf_counter() - start, None if passed else str(response.status_code))
+        return response if passed else None
+
+    def setup(self):
+        """Register, log in and write a first post for the others to act on."""
+        data = {
+            'username': self.username,
+            'email': f'{self.username}@example.com',
+            'full_name': f'Load Test {self.username}',
+            'password': PASSWORD,
+            'confirm_password': PASSWORD,
+        }
+        if self.request('register', 'POST', '/api/auth/register/', [201], json=data) is None:
+            return False
+        response = self.request(
+            'login', 'POST', '/api/auth/login/', [200],
+            json={'email': data['email'], 'password': PASSWORD}
+        )
+        if response is None:
+            return False
+        self.token = response.json().get('access')
+        self.user_id = response.json().get('user', {}).get('id')
+        self.request(
+            'create_post', 'POST', '/api/posts/', [201],
+            json={'content': f'Load test post by {self.username}', 'code_snippet': "print('load')"}
+        )
+        return self.token is not None
+
+    def run(self, scenario):
+        getattr(self, f'scenario_{scenario}')()
+
+    def scenario_feed(self):
+        response = self.request('feed', 'GET', '/api/posts/', [200])
+        if response is None:
+            return
+        posts = response.json().get('results', [])
+        self.post_ids = [post['id'] for post in posts]
+        self.author_ids = [
+            author['id'] if isinstance(author, dict) else author
+            for author in (post.get('author') for post in posts) if author
+        ]
+
+    def scenario_like(self):
+        if not self.post_ids:
+            return self.scenario_feed()
+        post_id = self.random.choice(self.post_ids)
+        if post_id in self.liked:
+            if self.request('unlike', 'DELETE', f'/api/posts/{post_id}/unlike/', [204]) is not None:
+                self.liked.discard(post_id)
+        elif self.request('like', 'POST', f'/api/posts/{post_id}/like/', [201]) is not None:
+            self.liked.add(post_id)
+
+    def scenario_comment(self):
+        if not self.post_ids:
+            return self.scenario_feed()
+        post_id = self.random.choice(self.post_ids)
+        self.request(
+            'comment', 'POST', f'/api/posts/{post_id}/comments/', [201],
+            json={'content': f'Load test comment by {self.username}'}
+        )
+
+    def scenario_follow(self):
+        candidates = [user_id for user_id in self.author_ids if user_id != self.user_id]
+        if not candidates:
+            return self.scenario_feed()
+        user_id = self.random.choice(candidates)
+        if user_id in self.following:
+            if self.request('unfollow', 'DELETE', f'/api/users/{user_id}/unfollow/', [204]) is not None:
+                self.following.discard(user_id)
+        elif self.request('follow', 'POST', f'/api/users/{user_id}/follow/', [201]) is not None:
+            self.following.add(user_id)
+
+    def scenario_search(self):
+        self.request(
+            'search', 'GET', '/api/posts/search/', [200],
+            params={'q': self.random.choice(SEARCH_TERMS)}
+        )
+
+    def scenario_notifications(self):
+        response = self.request('notifications_unread', 'GET', '/api/notifications/unread-count/', [200])
+        if response is not None and response.json().get('count'):
+            self.request('notifications', 'GET', '/api/notifications/', [200])
+
+
+class LoadTest:
+    """Drives virtual users through the warm-up and measured phases."""
+
+    def __init__(self, base_url, users=10, mix=None, duration=30, warmup=5,
+                 rps=None, think_time=0.0, timeout=10, seed=None):
+        self.base_url = base_url
+        self.users = users
+        self.mix = mix or DEFAULT_MIX
+        self.duration = duration
+        self.warmup = warmup
+        self.rps = rps
+        self.think_time = think_time
+        self.timeout = timeout
+        self.seed = seed
+        self.run_id = uuid.uuid4().hex[:8]
+        self.recorder = Recorder()
+        self.stopping = threading.Event()
+
+    def choose(self, rng):
+        return rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+
+    def setup(self, pool):
+        virtual_users = [
+            VirtualUser(self.base_url, self.recorder, self.run_id, number, self.timeout, self.seed)
+            for number in range(self.users)
+        ]
+        ready = [user for user, ok in zip(virtual_users, pool.map(VirtualUser.setup, virtual_users)) if ok]
+        logger.info(f'{len(ready)}/{self.users} virtual users logged in')
+        return ready
+
+    def closed_loop(self, user):
+        while not self.stopping.is_set():
+            user.run(self.choose(user.random))
+            if self.think_time:
+                self.stopping.wait(user.random.expovariate(1 / self.think_time))
+
+    def open_loop(self, user, schedule):
+        while True:
+            try:
+                due = schedule.get(timeout=0.1)
+            except Empty:
+                if self.stopping.is_set():
+                    return
+                continue
+            user.due = due
+            user.run(self.choose(user.random))
+
+    def dispatch(self, schedule):
+        """Put the due time of each scenario on ``schedule`` at ``rps``."""
+        interval = 1 / self.rps
+        due = time.perf_counter()
+        while not self.stopping.is_set():
+            due += interval
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            schedule.put(due)
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.users + 1) as pool:
+            virtual_users = self.setup(pool)
+            if not virtual_users:
+                raise RuntimeError('No virtual user could register and log in')
+
+            if self.rps:
+                schedule = Queue()
+                workers = [pool.submit(self.dispatch, schedule)]
+                workers += [pool.submit(self.open_loop, user, schedule) for user in virtual_users]
+            else:
+                workers = [pool.submit(self.closed_loop, user) for user in virtual_users]
+
+            logger.info(f'Warming up for {self.warmup}s')
+            time.sleep(self.warmup)
+            self.recorder.recording = True
+            started = time.perf_counter()
+            logger.info(f'Measuring for {self.duration}s')
+            time.sleep(self.duration)
+            self.recorder.recording = False
+            elapsed = time.perf_counter() - started
+            self.stopping.set()
+            for worker in workers:
+                worker.result()
+
+        return {
+            'base_url': self.base_url,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'config': {
+                'users': self.users,
+                'logged_in': len(virtual_users),
+                'mode': 'open' if self.rps else 'closed',
+                'target_rps': self.rps,
+                'think_time': self.think_time,
+                'warmup': self.warmup,
+                'duration': round(elapsed, 2),
+                'mix': self.mix,
+            },
+            **self.recorder.report(elapsed),
+        }
+
+
+def parse_mix(value):
+    """Parse ``feed=5,search=1`` into scenario weights."""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(
+                f'Unknown scenario {name!r}, choose from {", ".join(DEFAULT_MIX)}'
+            )
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'Invalid weight for {name!r}: {weight!r}')
+    return mix
+
+
+def print_report(results):
+    print(f"\n{'Request':<22}{'count':>8}{'err%':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    rows = list(results['requests'].items()) + [('TOTAL', results['overall'])]
+    for name, stats in rows:
+        def ms(key):
+            return '-' if stats[key] is None else f'{stats[key]:.1f}'
+        print(
+            f"{name:<22}{stats['requests']:>8}{stats['error_rate'] * 100:>8.2f}"
+            f"{stats['throughput_rps']:>9.1f}{ms('p50_ms'):>9}{ms('p95_ms'):>9}"
+            f"{ms('p99_ms'):>9}{ms('max_ms'):>9}"
+        )
+    print('Latencies in ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Socialistic API')
+    parser.add_argument('--url', '-u', type=str, default='http://localhost:8050',
+                        help='Base URL of the API (default: http://localhost:8050)')
+    parser.add_argument('--users', type=int, default=10,
+                        help='Number of virtual users (default: 10)')
+    parser.add_argument('--duration', type=float, default=30,
+                        help='Seconds of measured load (default: 30)')
+    parser.add_argument('--warmup', type=float, default=5,
+                        help='Seconds of unrecorded load before measuring (default: 5)')
+    parser.add_argument('--rps', type=float, default=None,
+                        help='Start scenarios at this rate (open loop) instead of back to back')
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help='Mean pause of each virtual user between scenarios in closed loop')
+    parser.add_argument('--mix', type=parse_mix, default=None,
+                        help=f'Scenario weights, e.g. feed=5,like=2 (default: '
+                             f'{",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items())})')
+    parser.add_argument('--timeout', type=float, default=10,
+                        help='Request timeout in seconds (default: 10)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed of the scenario choices')
+    parser.add_argument('--output', '-o', type=str, default='load_test_results.json',
+                        help='Path to save the results (default: load_test_results.json)')
+    args = parser.parse_args()
+
+    print(f"🚀 Load testing {args.url} with {args.users} virtual users")
+    load_test = LoadTest(
+        args.url, users=args.users, mix=args.mix, duration=args.duration,
+        warmup=args.warmup, rps=args.rps, think_time=args.think_time,
+        timeout=args.timeout, seed=args.seed,
+    )
+    results = load_test.run()
+    print_report(results)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nLoad test results saved to JSON: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""
+Fast read path for notification lists, built on ``users.encoders.RowEncoder``.
+
+Notifications are encoded from ``.values()`` rows; their senders come from
+the cached user fragments.
+"""
+from notifications.serializers import NotificationSerializer
+from users.encoders import RowEncoder, aencode_users
+
+notification_encoder = RowEncoder(NotificationSerializer, omit=['sender'])
+
+# Columns of the rows aencode_notifications() takes
+NOTIFICATION_COLUMNS = (*notification_encoder.columns, 'sender_id')
+
+
+async def aencode_notifications(rows, request=None):
+    """Return the NotificationSerializer data of the given rows, in order."""
+    users = await aencode_users({row['sender_id'] for row in rows}, request)
+    return [
+        {
+            name: users.get(row['sender_id']) if name == 'sender' else item[name]
+            for name in notification_encoder.field_names
+        }
+        for row, item in zip(rows, notification_encoder.encode(rows))
+    ]
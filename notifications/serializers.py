@@ -1,9 +1,9 @@
 from rest_framework import serializers
 from .models import Notification, NotificationSetting
-from users.serializers import UserSerializer
+from users.serializers import UserSerializer, SideloadUsersMixin, SparseFieldsMixin
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SideloadUsersMixin, SparseFieldsMixin, serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
     
     class Meta:
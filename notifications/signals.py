@@ -1,3 +1,4 @@
+import asyncio
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from asgiref.sync import async_to_sync
@@ -6,6 +7,37 @@ from .models import Notification
 from .serializers import NotificationSerializer
 
 
+def push_notifications(notifications):
+    """
+    Send notifications to their recipients' WebSocket groups.
+    
+    Notifications inserted with ``bulk_create`` do not fire ``post_save``, so
+    callers creating them in bulk push the whole batch here in a single
+    round trip to the channel layer.
+    """
+    if not notifications:
+        return
+    
+    channel_layer = get_channel_layer()
+    messages = [
+        (
+            f'notifications_{notification.recipient_id}',
+            {
+                'type': 'notification_message',
+                'notification': NotificationSerializer(notification).data
+            }
+        )
+        for notification in notifications
+    ]
+    
+    async def send_all():
+        await asyncio.gather(*(
+            channel_layer.group_send(group, message) for group, message in messages
+        ))
+    
+    async_to_sync(send_all)()
+
+
 @receiver(post_save, sender=Notification)
 def notification_created(sender, instance, created, **kwargs):
     """
@@ -24,4 +56,4 @@ def notification_created(sender, instance, created, **kwargs):
                 'type': 'notification_message',
                 'notification': notification_data
             }
-        ) 
\ No newline at end of file
+        )
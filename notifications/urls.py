@@ -4,12 +4,13 @@ from notifications.views.notifications import (
     NotificationDeleteView, NotificationSettingView,
     NotificationUnreadCountView, NotificationMarkAllReadView
 )
+from users.views.asynchronous import AsyncGetView
 
 urlpatterns = [
-    path('', NotificationListView.as_view(), name='notification-list'),
+    path('', AsyncGetView.as_view(sync_view=NotificationListView.as_view()), name='notification-list'),
     path('<int:pk>/read/', NotificationMarkReadView.as_view(), name='notification-mark-read'),
     path('<int:pk>/', NotificationDeleteView.as_view(), name='notification-detail'),
     path('settings/', NotificationSettingView.as_view(), name='notification-settings'),
-    path('unread-count/', NotificationUnreadCountView.as_view(), name='notification-unread-count'),
+    path('unread-count/', AsyncGetView.as_view(sync_view=NotificationUnreadCountView.as_view()), name='notification-unread-count'),
     path('mark-all-read/', NotificationMarkAllReadView.as_view(), name='notification-mark-all-read'),
 ] 
\ No newline at end of file
@@ -5,11 +5,13 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from notifications.models import Notification, NotificationSetting
 from notifications.serializers import NotificationSerializer, NotificationSettingSerializer
-from asgiref.sync import async_to_sync
+from notifications.encoders import NOTIFICATION_COLUMNS, aencode_notifications
+from users.views.mixins import NormalizedUsersMixin
+from asgiref.sync import async_to_sync, sync_to_async
 from channels.layers import get_channel_layer
 
 
-class NotificationListView(generics.ListCreateAPIView):
+class NotificationListView(NormalizedUsersMixin, generics.ListCreateAPIView):
     """
     API endpoint for listing and creating user notifications.
     """
@@ -17,7 +19,19 @@ class NotificationListView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return self.request.user.notifications.all()
+        return self.prefetch_users(self.request.user.notifications.all(), 'sender')
+    
+    async def aget(self, request, *args, **kwargs):
+        """Async ``list()`` in the default shape, see ``users.views.asynchronous``."""
+        if not self.get_field_selection().is_default or self.is_normalized():
+            return None
+        
+        rows = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(
+            *NOTIFICATION_COLUMNS
+        )
+        page = await sync_to_async(self.paginate_queryset)(rows)
+        data = await aencode_notifications(page, request)
+        return self.get_paginated_response(data)
     
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
@@ -79,4 +93,8 @@ class NotificationUnreadCountView(APIView):
     
     def get(self, request):
         count = Notification.objects.filter(recipient=request.user, is_read=False).count()
+        return Response({'count': count})
+    
+    async def aget(self, request):
+        count = await Notification.objects.filter(recipient=request.user, is_read=False).acount()
         return Response({'count': count}) 
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+Fast read path for post lists, built on ``users.encoders.RowEncoder``.
+
+Posts are assembled from cached fragments holding everything but the
+author, programming language and ``is_liked``, which are added per request.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from posts.models import Post, PostLike
+from posts.serializers import PostSerializer
+from users.catalog import language_catalog
+from users.encoders import RowEncoder, aencode_users, encode_users, user_fragments
+from users.fragments import FragmentCache
+
+post_encoder = RowEncoder(PostSerializer, omit=['author', 'programming_language', 'is_liked'])
+
+
+def load_post_fragments(post_ids):
+    """
+    Load and encode the fragments of the given posts in one query, from the
+    primary since they are cached well past any replica lag.
+    """
+    rows = list(Post.objects.using(DEFAULT_DB_ALIAS).filter(id__in=post_ids).with_engagement().order_by().values(*post_encoder.columns, 'author_id', 'programming_language_id'))
+
+    fragments = {}
+    for row, data in zip(rows, post_encoder.encode(rows)):
+        data['author_id'] = row['author_id']
+        data['programming_language_id'] = row['programming_language_id']
+        fragments[row['id']] = data
+    return fragments
+
+
+post_fragments = FragmentCache('post', post_encoder, load_post_fragments)
+
+
+def post_versions(post_ids):
+    """
+    Return the versions of the given posts and of the authors and
+    languages rendered with them.
+    """
+    fragments = post_fragments.get_many(post_ids)
+    post_ids = [pk for pk in post_ids if pk in fragments]
+    if not post_ids:
+        return []
+    author_ids = sorted({fragments[pk]['author_id'] for pk in post_ids})
+    return [
+        *post_fragments.versions.get_many(post_ids).values(),
+        *user_fragments.versions.get_many(author_ids).values(),
+        language_catalog.version(),
+    ]
+
+
+async def apost_versions(post_ids):
+    """Async ``post_versions()``."""
+    fragments = await post_fragments.aget_many(post_ids)
+    post_ids = [pk for pk in post_ids if pk in fragments]
+    if not post_ids:
+        return []
+    author_ids = sorted({fragments[pk]['author_id'] for pk in post_ids})
+    return [
+        *(await post_fragments.versions.aget_many(post_ids)).values(),
+        *(await user_fragments.versions.aget_many(author_ids)).values(),
+        await language_catalog.aversion(),
+    ]
+
+
+def encode_posts(post_ids, request=None):
+    """Return the PostSerializer data of the given posts, in order."""
+    fragments = post_fragments.get_many(post_ids)
+    users = encode_users({fragment['author_id'] for fragment in fragments.values()}, request)
+
+    languages = language_catalog.get_many(
+        {fragment['programming_language_id'] for fragment in fragments.values()} - {None}, request
+    )
+
+    viewer = getattr(request, 'user', None)
+    liked = set()
+    if viewer is not None and viewer.is_authenticated:
+        liked = set(PostLike.objects.filter(
+            user=viewer, post_id__in=fragments
+        ).values_list('post_id', flat=True))
+
+    return assemble_posts(post_ids, fragments, users, languages, liked)
+
+
+async def aencode_posts(post_ids, request=None):
+    """Async ``encode_posts()``."""
+    fragments = await post_fragments.aget_many(post_ids)
+    users = await aencode_users({fragment['author_id'] for fragment in fragments.values()}, request)
+
+    languages = await language_catalog.aget_many(
+        {fragment['programming_language_id'] for fragment in fragments.values()} - {None}, request
+    )
+
+    viewer = getattr(request, 'user', None)
+    liked = set()
+    if viewer is not None and viewer.is_authenticated:
+        liked = {pk async for pk in PostLike.objects.filter(
+            user=viewer, post_id__in=fragments
+        ).values_list('post_id', flat=True)}
+
+    return assemble_posts(post_ids, fragments, users, languages, liked)
+
+
+def assemble_posts(post_ids, fragments, users, languages, liked):
+    return [
+        post_fragments.assemble(
+            fragments[pk],
+            author=users[fragments[pk]['author_id']],
+            programming_language=languages.get(fragments[pk]['programming_language_id']),
+            is_liked=pk in liked,
+        )
+        for pk in post_ids
+        if pk in fragments
+    ]
@@ -1,10 +1,63 @@
 from django.db import models
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from users.models import ProgrammingLanguage
 from django.core.exceptions import ValidationError
 
 
+def _count(model, field):
+    """Subquery counting the ``model`` rows whose ``field`` is the outer row."""
+    rows = model.objects.filter(**{field: OuterRef('pk')}).order_by()
+    return Coalesce(
+        Subquery(rows.values(field).annotate(count=Count('pk')).values('count')),
+        0
+    )
+
+
+def _liked_by(model, field, viewer):
+    """Whether ``viewer`` has a ``model`` like of the outer row."""
+    return Exists(model.objects.filter(user=viewer, **{field: OuterRef('pk')}))
+
+
+class PostQuerySet(models.QuerySet):
+    """QuerySet with helpers for loading what PostSerializer reads."""
+    
+    def with_engagement(self, viewer=None, likes=True, comments=True):
+        """
+        Annotate like and comment counts and whether ``viewer`` likes each
+        post, so serializing the posts needs no per-row queries.
+        
+        ``likes=False`` and ``comments=False`` skip counts the response
+        doesn't include.
+        """
+        queryset = self
+        if likes:
+            queryset = queryset.annotate(likes_count=_count(PostLike, 'post'))
+        if comments:
+            queryset = queryset.annotate(comments_count=_count(Comment, 'post'))
+        if viewer is not None and viewer.is_authenticated:
+            queryset = queryset.annotate(viewer_has_liked=_liked_by(PostLike, 'post', viewer))
+        return queryset
+
+
+class CommentQuerySet(models.QuerySet):
+    """QuerySet with helpers for loading what CommentSerializer reads."""
+    
+    def with_engagement(self, viewer=None, likes=True):
+        """
+        Annotate like counts and whether ``viewer`` likes each comment, so
+        serializing the comments needs no per-row queries.
+        """
+        queryset = self
+        if likes:
+            queryset = queryset.annotate(likes_count=_count(CommentLike, 'comment'))
+        if viewer is not None and viewer.is_authenticated:
+            queryset = queryset.annotate(viewer_has_liked=_liked_by(CommentLike, 'comment', viewer))
+        return queryset
+
+
 class Post(models.Model):
     """A post in the developer social network."""
     
@@ -26,6 +79,8 @@ class Post(models.Model):
         related_name='liked_posts'
     )
     
+    objects = PostQuerySet.as_manager()
+    
     def __str__(self):
         return f"Post by {self.author.username}: {self.content[:30]}"
     
@@ -35,14 +90,27 @@ class Post(models.Model):
             raise ValidationError(_('A post must have either content or code snippet.'))
         super().clean()
     
+    # Counts annotated by PostQuerySet.with_engagement() take precedence
     @property
     def likes_count(self):
+        if hasattr(self, '_likes_count'):
+            return self._likes_count
         return self.likes.count()
     
+    @likes_count.setter
+    def likes_count(self, value):
+        self._likes_count = value
+    
     @property
     def comments_count(self):
+        if hasattr(self, '_comments_count'):
+            return self._comments_count
         return self.comments.count()
     
+    @comments_count.setter
+    def comments_count(self, value):
+        self._comments_count = value
+    
     class Meta:
         ordering = ['-created_at']
 
@@ -61,6 +129,8 @@ class Comment(models.Model):
         related_name='liked_comments'
     )
     
+    objects = CommentQuerySet.as_manager()
+    
     def __str__(self):
         return f"Comment by {self.author.username} on post {self.post.id}: {self.content[:30]}"
     
@@ -70,10 +140,17 @@ class Comment(models.Model):
             raise ValidationError(_('A comment must have content.'))
         super().clean()
     
+    # Counts annotated by CommentQuerySet.with_engagement() take precedence
     @property
     def likes_count(self):
+        if hasattr(self, '_likes_count'):
+            return self._likes_count
         return self.likes.count()
     
+    @likes_count.setter
+    def likes_count(self, value):
+        self._likes_count = value
+    
     class Meta:
         ordering = ['created_at']
 
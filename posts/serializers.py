@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from .models import Post, Comment, PostLike, CommentLike
-from users.serializers import UserSerializer, ProgrammingLanguageSerializer
+from users.serializers import UserSerializer, ProgrammingLanguageSerializer, SideloadUsersMixin, SparseFieldsMixin
+from users.catalog import CatalogPrimaryKeyRelatedField, language_catalog
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SideloadUsersMixin, SparseFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     likes_count = serializers.IntegerField(read_only=True)
     is_liked = serializers.SerializerMethodField()
@@ -17,17 +18,21 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'author', 'created_at', 'updated_at']
     
     def get_is_liked(self, obj):
+        # Annotated by CommentQuerySet.with_engagement()
+        if hasattr(obj, 'viewer_has_liked'):
+            return obj.viewer_has_liked
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return CommentLike.objects.filter(user=request.user, comment=obj).exists()
         return False
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SideloadUsersMixin, SparseFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     programming_language = ProgrammingLanguageSerializer(read_only=True)
-    programming_language_id = serializers.PrimaryKeyRelatedField(
-        queryset=ProgrammingLanguageSerializer.Meta.model.objects.all(),
+    programming_language_id = CatalogPrimaryKeyRelatedField(
+        language_catalog,
         write_only=True,
         required=False,
         source='programming_language'
@@ -47,6 +52,10 @@ class PostSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'author', 'created_at', 'updated_at']
     
     def get_is_liked(self, obj):
+        # Annotated by PostQuerySet.with_engagement()
+        if hasattr(obj, 'viewer_has_liked'):
+            return obj.viewer_has_liked
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return PostLike.objects.filter(user=request.user, post=obj).exists()
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .encoders import post_fragments
+from .models import Post, Comment, PostLike
+
+
+@receiver([post_save, post_delete], sender=Post)
+def post_changed(sender, instance, **kwargs):
+    """
+    Drop the cached fragment of a changed post.
+    """
+    post_fragments.invalidate([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=PostLike)
+@receiver([post_save, post_delete], sender=Comment)
+def post_counts_changed(sender, instance, **kwargs):
+    """
+    Drop the fragment of a post whose like or comment count changed.
+    """
+    post_fragments.invalidate([instance.post_id])
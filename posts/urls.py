@@ -6,11 +6,12 @@ from posts.views.comments import (
     CommentListCreateView, CommentDetailView, CommentLikeView
 )
 from posts.views.search import PostSearchView
+from users.views.asynchronous import AsyncGetView
 
 urlpatterns = [
     # Posts
-    path('', PostListCreateView.as_view(), name='post-list'),
-    path('<int:pk>/', PostDetailView.as_view(), name='post-detail'),
+    path('', AsyncGetView.as_view(sync_view=PostListCreateView.as_view()), name='post-list'),
+    path('<int:pk>/', AsyncGetView.as_view(sync_view=PostDetailView.as_view()), name='post-detail'),
     path('<int:pk>/like/', PostLikeView.as_view(), name='post-like'),
     path('<int:pk>/unlike/', PostUnlikeView.as_view(), name='post-unlike'),
     path('<int:pk>/comments/', PostCommentsView.as_view(), name='post-comments'),
@@ -7,9 +7,26 @@ from posts.models import Post, Comment, CommentLike
 from posts.serializers import CommentSerializer
 from notifications.models import Notification
 from posts.pagination import CustomCursorPagination
+from users.views.mixins import NormalizedUsersMixin
+from socialistic.throttling import RateLimitedMixin
 
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentGraphMixin(NormalizedUsersMixin):
+    """
+    Loads the authors, like counts and likes CommentSerializer renders
+    along with the comments, skipping those left out by ``?fields=``.
+    """
+    
+    def get_comment_queryset(self, queryset):
+        selection = self.get_field_selection()
+        queryset = queryset.with_engagement(
+            viewer=self.request.user if selection.includes('is_liked') else None,
+            likes=selection.includes('likes_count'),
+        )
+        return self.prefetch_users(queryset, 'author')
+
+
+class CommentListCreateView(CommentGraphMixin, generics.ListCreateAPIView):
     """
     API endpoint for listing and creating comments on a post.
     """
@@ -19,7 +36,7 @@ class CommentListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        return post.comments.all()
+        return self.get_comment_queryset(post.comments.all())
     
     def perform_create(self, serializer):
         post = get_object_or_404(Post, pk=self.kwargs['post_id'])
@@ -37,14 +54,16 @@ class CommentListCreateView(generics.ListCreateAPIView):
             )
 
 
-class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CommentDetailView(CommentGraphMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint for retrieving, updating, and deleting a comment.
     """
-    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_queryset(self):
+        return self.get_comment_queryset(Comment.objects.all())
+    
     def perform_update(self, serializer):
         # Only allow the author to update the comment
         if serializer.instance.author != self.request.user:
@@ -58,11 +77,12 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
-class CommentLikeView(APIView):
+class CommentLikeView(RateLimitedMixin, APIView):
     """
     API endpoint for liking/unliking a comment.
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'likes'
     
     def post(self, request, pk):
         comment = get_object_or_404(Comment, pk=pk)
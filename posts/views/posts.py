@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -5,42 +6,161 @@ from django.shortcuts import get_object_or_404
 from django.contrib.contenttypes.models import ContentType
 from posts.models import Post, Comment, PostLike, CommentLike
 from posts.serializers import PostSerializer, CommentSerializer
+from posts.encoders import aencode_posts, apost_versions, encode_posts, post_versions
 from notifications.models import Notification
 from posts.pagination import CustomCursorPagination
+from users.views.mixins import ConditionalGetMixin, NormalizedUsersMixin
+from posts.views.comments import CommentGraphMixin
+from socialistic.throttling import RateLimitedMixin
 import sys
 
 
-class PostListCreateView(generics.ListCreateAPIView):
+class PostGraphMixin(ConditionalGetMixin, NormalizedUsersMixin):
+    """
+    Loads the authors, programming languages, counts and likes
+    PostSerializer renders along with the posts, skipping those left out
+    by ``?fields=`` or ``?expand=``.
+    
+    Lists in the default shape are assembled from cached post and user
+    fragments by ``posts.encoders``, with the same output, and answer
+    conditional GETs from the versions of the page's posts.
+    """
+    use_row_encoders = True
+    
+    def get_post_queryset(self, queryset):
+        selection = self.get_field_selection()
+        queryset = queryset.with_engagement(
+            viewer=self.request.user if selection.includes('is_liked') else None,
+            likes=selection.includes('likes_count'),
+            comments=selection.includes('comments_count'),
+        )
+        if selection.expands('programming_language'):
+            queryset = queryset.select_related('programming_language')
+        return self.prefetch_users(queryset, 'author')
+    
+    def can_encode_rows(self):
+        return (
+            self.use_row_encoders
+            and self.get_field_selection().is_default
+            and not self.is_normalized()
+        )
+    
+    def list(self, request, *args, **kwargs):
+        if not self.can_encode_rows():
+            return super().list(request, *args, **kwargs)
+        
+        # Paginate over the ids plus the columns the cursor is built from
+        rows = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(
+            'id', 'created_at'
+        )
+        page = self.paginate_queryset(rows)
+        post_ids = [row['id'] for row in (page if page is not None else rows)]
+        
+        not_modified = self.not_modified(post_versions(post_ids), post_ids, self.get_page_links())
+        if not_modified is not None:
+            return not_modified
+        
+        if page is not None:
+            return self.get_paginated_response(encode_posts(post_ids, request))
+        return Response(encode_posts(post_ids, request))
+    
+    async def alist(self, request, queryset):
+        """
+        Async ``list()`` of ``queryset`` for ``users.views.asynchronous``,
+        or None for the sync view to render other shapes.
+        """
+        if not self.can_encode_rows():
+            return None
+        
+        rows = self.filter_queryset(queryset).prefetch_related(None).values('id', 'created_at')
+        # DRF's paginators query synchronously
+        page = await sync_to_async(self.paginate_queryset)(rows)
+        if page is None:
+            page = [row async for row in rows]
+        post_ids = [row['id'] for row in page]
+        
+        not_modified = self.not_modified(await apost_versions(post_ids), post_ids, self.get_page_links())
+        if not_modified is not None:
+            return not_modified
+        
+        data = await aencode_posts(post_ids, request)
+        if self.paginator is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class PostListCreateView(RateLimitedMixin, PostGraphMixin, generics.ListCreateAPIView):
     """
     API endpoint for listing and creating posts.
     """
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'posts'
     pagination_class = CustomCursorPagination
     
     def get_queryset(self):
         # In test environment, return all posts
         if 'pytest' in sys.modules:
-            return Post.objects.all()
+            return self.get_post_queryset(Post.objects.all())
         
         # In production, get posts from users the current user follows + their own posts
         following_users = self.request.user.following.values_list('following_id', flat=True)
+        return self.get_feed_queryset(list(following_users))
+    
+    async def aget_queryset(self):
+        if 'pytest' in sys.modules:
+            return self.get_post_queryset(Post.objects.all())
         
+        following_users = self.request.user.following.values_list('following_id', flat=True)
+        return self.get_feed_queryset([pk async for pk in following_users])
+    
+    def get_feed_queryset(self, following_ids):
         # If user is not following anyone, show all posts instead of empty feed
-        if not following_users:
-            return Post.objects.all()
+        if not following_ids:
+            return self.get_post_queryset(Post.objects.all())
         
-        return Post.objects.filter(author_id__in=list(following_users) + [self.request.user.id])
+        return self.get_post_queryset(
+            Post.objects.filter(author_id__in=following_ids + [self.request.user.id])
+        )
+    
+    async def aget(self, request, *args, **kwargs):
+        return await self.alist(request, await self.aget_queryset())
 
 
-class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PostDetailView(PostGraphMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint for retrieving, updating, and deleting a post.
     """
-    queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_queryset(self):
+        return self.get_post_queryset(Post.objects.all())
+    
+    def retrieve(self, request, *args, **kwargs):
+        # Posts that don't exist have no versions and get their 404
+        versions = post_versions([kwargs['pk']])
+        if versions:
+            not_modified = self.not_modified(versions)
+            if not_modified is not None:
+                return not_modified
+        return super().retrieve(request, *args, **kwargs)
+    
+    async def aget(self, request, *args, **kwargs):
+        if not self.can_encode_rows():
+            return None
+        
+        # Missing posts get their 404 from the sync view
+        versions = await apost_versions([kwargs['pk']])
+        if not versions:
+            return None
+        not_modified = self.not_modified(versions)
+        if not_modified is not None:
+            return not_modified
+        
+        data = await aencode_posts([kwargs['pk']], request)
+        return Response(data[0]) if data else None
+    
     def perform_update(self, serializer):
         # Only allow the author to update the post
         if serializer.instance.author != self.request.user:
@@ -54,11 +174,12 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
-class PostLikeView(APIView):
+class PostLikeView(RateLimitedMixin, APIView):
     """
     API endpoint for liking a post.
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'likes'
     
     def post(self, request, pk):
         post = get_object_or_404(Post, pk=pk)
@@ -87,11 +208,12 @@ class PostLikeView(APIView):
         return Response(status=status.HTTP_201_CREATED)
 
 
-class PostUnlikeView(APIView):
+class PostUnlikeView(RateLimitedMixin, APIView):
     """
     API endpoint for unliking a post.
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'likes'
     
     def delete(self, request, pk):
         post = get_object_or_404(Post, pk=pk)
@@ -102,7 +224,7 @@ class PostUnlikeView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class PostCommentsView(generics.ListCreateAPIView):
+class PostCommentsView(CommentGraphMixin, generics.ListCreateAPIView):
     """
     API endpoint for listing and creating comments on a post.
     """
@@ -112,7 +234,7 @@ class PostCommentsView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         post = get_object_or_404(Post, pk=self.kwargs['pk'])
-        return post.comments.all()
+        return self.get_comment_queryset(post.comments.all())
     
     def perform_create(self, serializer):
         post = get_object_or_404(Post, pk=self.kwargs['pk'])
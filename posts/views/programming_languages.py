@@ -2,6 +2,8 @@ from rest_framework import generics
 from rest_framework.permissions import AllowAny
 from users.models import ProgrammingLanguage
 from users.serializers import ProgrammingLanguageSerializer
+from users.catalog import language_catalog
+from users.views.mixins import CatalogListMixin
 from rest_framework.pagination import PageNumberPagination
 
 class ProgrammingLanguagePagination(PageNumberPagination):
@@ -10,11 +12,12 @@ class ProgrammingLanguagePagination(PageNumberPagination):
     """
     page_size = 100  # Show more languages per page since there won't be many
 
-class ProgrammingLanguageListView(generics.ListAPIView):
+class ProgrammingLanguageListView(CatalogListMixin, generics.ListAPIView):
     """
     API endpoint to list all programming languages.
     """
     queryset = ProgrammingLanguage.objects.all().order_by('name')
     serializer_class = ProgrammingLanguageSerializer
     permission_classes = [AllowAny]
-    pagination_class = ProgrammingLanguagePagination
\ No newline at end of file
+    pagination_class = ProgrammingLanguagePagination
+    catalog = language_catalog
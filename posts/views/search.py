@@ -1,9 +1,10 @@
 from rest_framework import generics, permissions
 from posts.models import Post
 from posts.serializers import PostSerializer
+from posts.views.posts import PostGraphMixin
 from django.db.models import Q
 
-class PostSearchView(generics.ListAPIView):
+class PostSearchView(PostGraphMixin, generics.ListAPIView):
     """
     API endpoint for searching posts.
     """
@@ -21,4 +22,4 @@ class PostSearchView(generics.ListAPIView):
                 Q(author__username__icontains=query)
             )
         
-        return queryset 
\ No newline at end of file
+        return self.get_post_queryset(queryset) 
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Helpers for using Python integers as sparse bit vectors.
+
+Bit ``n`` of a mask is set when the id ``n`` is a member of the set.
+"""
+
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:  # Python < 3.10
+    def popcount(mask):
+        return bin(mask).count('1')
+
+
+def mask_from_ids(ids):
+    """Build a mask with the bits for the given ids set."""
+    # Set bits in a byte buffer: OR-ing into a growing int copies it each time
+    bits = bytearray()
+    for id_ in ids:
+        byte_index = id_ >> 3
+        if byte_index >= len(bits):
+            bits.extend(bytes(byte_index + 1 - len(bits)))
+        bits[byte_index] |= 1 << (id_ & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def ids_from_mask(mask):
+    """Return the ids whose bits are set in ``mask``, in ascending order."""
+    ids = []
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+    for byte_index, byte in enumerate(data):
+        while byte:
+            low_bit = byte & -byte
+            ids.append(byte_index * 8 + low_bit.bit_length() - 1)
+            byte ^= low_bit
+    return ids
@@ -0,0 +1,118 @@
+"""
+Facet counts for project search.
+
+Keeps an inverted index from each tech stack skill and each status to the
+bitmap of project ids that have it, so counting the projects per facet value
+is a bitmap intersection rather than a GROUP BY over the M2M join.
+"""
+from projects.bitsets import popcount, mask_from_ids
+from projects.indexes import ProcessIndex
+from projects.models import Project
+
+
+class FacetIndex:
+    """Skill and status bitmaps over project ids."""
+
+    def __init__(self, project_statuses, project_skills):
+        self._status_of = dict(project_statuses)
+        self._skills_of = {}
+        projects_by_status = {}
+        projects_by_skill = {}
+
+        for project_id, status in self._status_of.items():
+            projects_by_status.setdefault(status, []).append(project_id)
+        for project_id, skill_id in project_skills:
+            self._skills_of.setdefault(project_id, set()).add(skill_id)
+            projects_by_skill.setdefault(skill_id, []).append(project_id)
+
+        self.all = mask_from_ids(self._status_of)
+        self.statuses = {
+            status: mask_from_ids(ids) for status, ids in projects_by_status.items()
+        }
+        self.skills = {
+            skill_id: mask_from_ids(ids) for skill_id, ids in projects_by_skill.items()
+        }
+
+    def set_status(self, project_id, status):
+        bit = 1 << project_id
+        old_status = self._status_of.get(project_id)
+        if old_status is not None:
+            self.statuses[old_status] &= ~bit
+        self._status_of[project_id] = status
+        self.statuses[status] = self.statuses.get(status, 0) | bit
+        self.all |= bit
+
+    def set_skills(self, project_id, skill_ids):
+        bit = 1 << project_id
+        for skill_id in self._skills_of.pop(project_id, ()):
+            self.skills[skill_id] &= ~bit
+        if skill_ids:
+            self._skills_of[project_id] = set(skill_ids)
+        for skill_id in skill_ids:
+            self.skills[skill_id] = self.skills.get(skill_id, 0) | bit
+
+    def remove(self, project_id):
+        self.set_skills(project_id, ())
+        status = self._status_of.pop(project_id, None)
+        if status is not None:
+            self.statuses[status] &= ~(1 << project_id)
+        self.all &= ~(1 << project_id)
+
+    def counts(self, base=None, skill_id=None, status=None):
+        """
+        Count projects per skill and per status within ``base``.
+
+        ``base`` is a bitmap of candidate projects and defaults to all of
+        them. Skill counts honour the status filter and status counts honour
+        the skill filter, so each facet shows what selecting one of its
+        values would return.
+        """
+        if base is None:
+            base = self.all
+        skill_base = base if status is None else base & self.statuses.get(status, 0)
+        status_base = base if skill_id is None else base & self.skills.get(skill_id, 0)
+
+        skill_counts = {}
+        for facet_skill_id, mask in list(self.skills.items()):
+            count = popcount(skill_base & mask)
+            if count:
+                skill_counts[facet_skill_id] = count
+
+        status_counts = {
+            facet_status: popcount(status_base & mask)
+            for facet_status, mask in list(self.statuses.items())
+        }
+        return skill_counts, status_counts
+
+
+class ProjectFacets(ProcessIndex):
+    """The process's facet index, loaded in two queries."""
+
+    def load(self):
+        return FacetIndex(
+            Project.objects.order_by().values_list('id', 'status').iterator(),
+            Project.tech_stack.through.objects.values_list('project_id', 'skill_id').iterator(),
+        )
+
+    def update_status(self, project_id, status):
+        self.apply(lambda index: index.set_status(project_id, status))
+
+    def update_skills(self, project_ids):
+        """Reload the tech stacks of the given projects from the database."""
+        def change(index):
+            skills = {project_id: [] for project_id in project_ids}
+            rows = Project.tech_stack.through.objects.filter(
+                project_id__in=project_ids
+            ).values_list('project_id', 'skill_id')
+            for project_id, skill_id in rows:
+                skills[project_id].append(skill_id)
+
+            for project_id, skill_ids in skills.items():
+                index.set_skills(project_id, skill_ids)
+        self.apply(change)
+
+    def remove_project(self, project_id):
+        self.apply(lambda index: index.remove(project_id))
+
+
+facets = ProjectFacets()
@@ -0,0 +1,48 @@
+"""
+In-memory indexes of projects shared by the threads of a process.
+
+``matching`` and ``facets`` each keep an index built from a few queries
+over all projects. ``ProcessIndex`` owns its lifecycle: the index is built
+lazily by the subclass's ``load()``, kept up to date with the changes made
+in this process through ``apply()``, and rebuilt once ``ttl`` seconds old
+so that changes made by other processes are picked up.
+"""
+import threading
+import time
+
+# Rebuild indexes at least this often (in seconds)
+INDEX_TTL = 300
+
+
+class ProcessIndex:
+    """Lazily loaded, periodically rebuilt index returned by ``load()``."""
+
+    def __init__(self, ttl=INDEX_TTL):
+        self.ttl = ttl
+        self._index = None
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, index):
+        return index is not None and time.monotonic() - self._built_at < self.ttl
+
+    def get_index(self):
+        index = self._index
+        if not self._is_fresh(index):
+            with self._lock:
+                index = self._index
+                if not self._is_fresh(index):
+                    index = self.load()
+                    self._built_at = time.monotonic()
+                    self._index = index
+        return index
+
+    def invalidate(self):
+        """Drop the index so that it's rebuilt on next use."""
+        self._index = None
+
+    def apply(self, change):
+        """Call ``change(index)`` if the index is loaded, under the lock."""
+        with self._lock:
+            if self._index is not None:
+                change(self._index)
@@ -0,0 +1,162 @@
+"""
+Skill-based matching between users and projects.
+
+Users and projects are encoded as bit vectors over skill ids (``User.skills``
+and ``Project.tech_stack``) and scored by the cosine similarity of those
+vectors. An inverted index from each skill to its users and projects limits
+scoring to candidates sharing at least one skill, and the top matches of each
+user and project are memoized until the index changes. Callers excluding
+some members fetch that many more matches, so exclusions never shrink the
+results below the limit.
+"""
+import heapq
+import math
+from collections import defaultdict
+
+from projects.bitsets import popcount, ids_from_mask
+from projects.indexes import ProcessIndex
+from projects.models import Project
+from users.models import Skill
+
+# Number of matches memoized for each user and project, unless exclusions
+# need more
+TOP_MATCHES = 50
+
+
+def similarity(a, b):
+    """Cosine similarity of two skill masks."""
+    shared = popcount(a & b)
+    if not shared:
+        return 0.0
+    return shared / math.sqrt(popcount(a) * popcount(b))
+
+
+class SkillVectors:
+    """Skill masks of one kind of member plus the skill -> members index."""
+
+    def __init__(self, pairs=()):
+        self.vectors = {}
+        self.by_skill = defaultdict(set)
+        for member_id, skill_id in pairs:
+            self.vectors[member_id] = self.vectors.get(member_id, 0) | 1 << skill_id
+            self.by_skill[skill_id].add(member_id)
+
+    def get(self, member_id):
+        return self.vectors.get(member_id, 0)
+
+    def set(self, member_id, skill_ids):
+        """Replace the skills of a member."""
+        self.remove(member_id)
+        for skill_id in skill_ids:
+            self.vectors[member_id] = self.vectors.get(member_id, 0) | 1 << skill_id
+            self.by_skill[skill_id].add(member_id)
+
+    def remove(self, member_id):
+        for skill_id in ids_from_mask(self.vectors.pop(member_id, 0)):
+            self.by_skill[skill_id].discard(member_id)
+
+    def top_matches(self, vector, count=TOP_MATCHES):
+        """Return the ``count`` ``(score, member_id)`` pairs best matching ``vector``."""
+        candidates = set()
+        for skill_id in ids_from_mask(vector):
+            candidates.update(self.by_skill.get(skill_id, ()))
+
+        return heapq.nlargest(
+            count,
+            ((similarity(vector, self.vectors[member_id]), member_id) for member_id in candidates)
+        )
+
+
+class SkillIndex:
+    """Skill vectors for all users and projects with memoized top matches."""
+
+    def __init__(self, project_skills, user_skills):
+        self.projects = SkillVectors(project_skills)
+        self.users = SkillVectors(user_skills)
+        self.clear_matches()
+
+    def clear_matches(self):
+        self._top_projects = {}
+        self._top_users = {}
+
+    def _top(self, memo, key, vectors, vector, count):
+        # Memoized as (count asked for, matches); fewer matches than asked
+        # for means there are no more
+        count = max(count, TOP_MATCHES)
+        asked, matches = memo.get(key, (0, []))
+        if asked < count and len(matches) == asked:
+            matches = vectors.top_matches(vector, count)
+            memo[key] = (count, matches)
+        return matches[:count]
+
+    def top_projects(self, user_id, count=TOP_MATCHES):
+        return self._top(self._top_projects, user_id, self.projects, self.users.get(user_id), count)
+
+    def top_users(self, project_id, count=TOP_MATCHES):
+        return self._top(self._top_users, project_id, self.users, self.projects.get(project_id), count)
+
+
+class SkillMatcher(ProcessIndex):
+    """The process's skill index, loaded in two queries."""
+
+    def load(self):
+        return SkillIndex(
+            Project.tech_stack.through.objects.values_list('project_id', 'skill_id').iterator(),
+            Skill.users.through.objects.values_list('user_id', 'skill_id').iterator(),
+        )
+
+    def _update(self, vectors, through, member_field, member_ids):
+        skills = defaultdict(set)
+        rows = through.objects.filter(
+            **{f'{member_field}__in': member_ids}
+        ).values_list(member_field, 'skill_id')
+        for member_id, skill_id in rows:
+            skills[member_id].add(skill_id)
+
+        for member_id in member_ids:
+            vectors.set(member_id, skills[member_id])
+
+    def update_projects(self, project_ids):
+        """Reload the tech stacks of the given projects from the database."""
+        def change(index):
+            self._update(index.projects, Project.tech_stack.through, 'project_id', project_ids)
+            index.clear_matches()
+        self.apply(change)
+
+    def update_users(self, user_ids):
+        """Reload the skills of the given users from the database."""
+        def change(index):
+            self._update(index.users, Skill.users.through, 'user_id', user_ids)
+            index.clear_matches()
+        self.apply(change)
+
+    def remove_project(self, project_id):
+        def change(index):
+            index.projects.remove(project_id)
+            index.clear_matches()
+        self.apply(change)
+
+    def remove_user(self, user_id):
+        def change(index):
+            index.users.remove(user_id)
+            index.clear_matches()
+        self.apply(change)
+
+    def recommend_projects(self, user_id, limit, exclude=()):
+        """Return up to ``limit`` ``(project_id, score)`` pairs for a user."""
+        matches = self.get_index().top_projects(user_id, limit + len(exclude))
+        return [
+            (project_id, score) for score, project_id in matches
+            if project_id not in exclude
+        ][:limit]
+
+    def find_collaborators(self, project_id, limit, exclude=()):
+        """Return up to ``limit`` ``(user_id, score)`` pairs for a project."""
+        matches = self.get_index().top_users(project_id, limit + len(exclude))
+        return [
+            (user_id, score) for score, user_id in matches
+            if user_id not in exclude
+        ][:limit]
+
+
+matcher = SkillMatcher()
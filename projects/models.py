@@ -1,10 +1,74 @@
 from django.db import models
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from users.models import Skill
 
 
+class ProjectQuerySet(models.QuerySet):
+    """QuerySet with helpers for loading what ProjectSerializer reads."""
+    
+    def with_collaborator_graph(self, viewer=None, collaborators_limit=None, users=None,
+                                creator=True, tech_stack=True, collaborators=True,
+                                collaborator_users=True, counts=True):
+        """
+        Load creators, tech stacks, collaborators and their users in a fixed
+        number of queries, and annotate collaborator counts and whether
+        ``viewer`` collaborates on each project.
+        
+        ``collaborators_limit`` keeps only the first N collaborators of each
+        project, in the order they joined. ``users`` is the queryset the
+        creators and collaborator users are loaded with. The remaining flags
+        skip loading the parts of the graph a response doesn't include.
+        """
+        if users is None:
+            users = get_user_model().objects.with_profile_data(viewer)
+        memberships = ProjectCollaborator.objects.filter(project=OuterRef('pk')).order_by()
+        queryset = self
+        
+        if counts:
+            queryset = queryset.annotate(
+                collaborators_count=Coalesce(
+                    Subquery(memberships.values('project').annotate(count=Count('pk')).values('count')),
+                    0
+                )
+            )
+        if tech_stack:
+            queryset = queryset.prefetch_related('tech_stack')
+        if creator:
+            queryset = queryset.prefetch_related(Prefetch('creator', queryset=users))
+        
+        if collaborators:
+            collaborators = ProjectCollaborator.objects.order_by('joined_at', 'id')
+            if collaborators_limit is not None:
+                # Number rows per project rather than slicing, so the limited
+                # prefetch can still populate projectcollaborator_set
+                collaborators = collaborators.annotate(
+                    position=Window(
+                        RowNumber(),
+                        partition_by=F('project'),
+                        order_by=[F('joined_at').asc(), F('id').asc()]
+                    )
+                ).filter(position__lte=collaborators_limit)
+            queryset = queryset.prefetch_related(
+                Prefetch('projectcollaborator_set', queryset=collaborators)
+            )
+            if collaborator_users:
+                queryset = queryset.prefetch_related(
+                    Prefetch('projectcollaborator_set__user', queryset=users)
+                )
+        
+        if viewer is not None and viewer.is_authenticated:
+            queryset = queryset.annotate(
+                viewer_is_collaborator=Exists(memberships.filter(user=viewer))
+            )
+        
+        return queryset
+
+
 class Project(models.Model):
     """A project that users can collaborate on."""
     
@@ -32,13 +96,22 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ProjectQuerySet.as_manager()
+    
     def __str__(self):
         return self.title
     
+    # Count annotated by ProjectQuerySet.with_collaborator_graph() takes precedence
     @property
     def collaborators_count(self):
+        if hasattr(self, '_collaborators_count'):
+            return self._collaborators_count
         return self.collaborators.count()
     
+    @collaborators_count.setter
+    def collaborators_count(self, value):
+        self._collaborators_count = value
+    
     def clean(self):
         """Validate the project."""
         if not self.title:
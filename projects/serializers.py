@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from .models import Project, ProjectCollaborator, CollaborationRequest
-from users.serializers import UserSerializer, SkillSerializer
+from users.serializers import UserSerializer, SkillSerializer, SideloadUsersMixin, SparseFieldsMixin
+from users.catalog import CatalogPrimaryKeyRelatedField, skill_catalog
 
 
-class ProjectCollaboratorSerializer(serializers.ModelSerializer):
+class ProjectCollaboratorSerializer(SideloadUsersMixin, SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
     class Meta:
@@ -12,7 +13,7 @@ class ProjectCollaboratorSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'joined_at']
 
 
-class CollaborationRequestSerializer(serializers.ModelSerializer):
+class CollaborationRequestSerializer(SideloadUsersMixin, SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(source='user', read_only=True)
     project = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -23,11 +24,11 @@ class CollaborationRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'user_id', 'project', 'status', 'created_at']
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SideloadUsersMixin, SparseFieldsMixin, serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
     tech_stack = SkillSerializer(many=True, read_only=True)
-    tech_stack_ids = serializers.PrimaryKeyRelatedField(
-        queryset=SkillSerializer.Meta.model.objects.all(),
+    tech_stack_ids = CatalogPrimaryKeyRelatedField(
+        skill_catalog,
         write_only=True,
         many=True,
         source='tech_stack'
@@ -51,6 +52,10 @@ class ProjectSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'creator', 'created_at', 'updated_at']
     
     def get_is_collaborator(self, obj):
+        # Annotated by ProjectQuerySet.with_collaborator_graph()
+        if hasattr(obj, 'viewer_is_collaborator'):
+            return obj.viewer_is_collaborator
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return ProjectCollaborator.objects.filter(
@@ -67,4 +72,22 @@ class ProjectSerializer(serializers.ModelSerializer):
         
         # The Project model's save method already adds the creator as owner collaborator
         
-        return project 
\ No newline at end of file
+        return project 
+
+
+class ProjectMatchSerializer(ProjectSerializer):
+    """Project recommended to a user, with its skill match score."""
+    
+    match_score = serializers.FloatField(read_only=True)
+    
+    class Meta(ProjectSerializer.Meta):
+        fields = ProjectSerializer.Meta.fields + ['match_score']
+
+
+class CollaboratorMatchSerializer(UserSerializer):
+    """User suggested as a project collaborator, with their skill match score."""
+    
+    match_score = serializers.FloatField(read_only=True)
+    
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['match_score']
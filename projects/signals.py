@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from users.models import Skill
+from .models import Project, ProjectCollaborator
+from .facets import facets
+from .matching import matcher
+from .versions import project_versions
+
+M2M_CHANGES = ('post_add', 'post_remove', 'post_clear')
+
+# The matching and facet indexes are shared by the threads of the process
+# and only rebuilt every few minutes, so changes are applied to them once
+# committed: before then, other requests can't see the rows they reload,
+# and a rolled back change must not be applied at all.
+
+
+@receiver(m2m_changed, sender=Project.tech_stack.through)
+def project_tech_stack_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep the skill matching and facet indexes in sync with project tech stacks.
+    """
+    if reverse and action == 'pre_clear':
+        # pk_set isn't given when a skill is cleared from every project
+        project_versions.touch(list(instance.projects.values_list('pk', flat=True)))
+    if action not in M2M_CHANGES:
+        return
+    
+    if not reverse:
+        project_ids = [instance.pk]
+    elif pk_set is not None:
+        project_ids = list(pk_set)
+    else:
+        # A skill was cleared from every project
+        transaction.on_commit(matcher.invalidate)
+        transaction.on_commit(facets.invalidate)
+        return
+    
+    transaction.on_commit(lambda: matcher.update_projects(project_ids))
+    transaction.on_commit(lambda: facets.update_skills(project_ids))
+    project_versions.touch(project_ids)
+
+
+@receiver(m2m_changed, sender=Skill.users.through)
+def user_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep the skill matching index in sync with user skills.
+    """
+    if action not in M2M_CHANGES:
+        return
+    
+    # Skill.users is the forward side, so user.skills changes are reverse
+    if reverse:
+        user_ids = [instance.pk]
+    elif pk_set is not None:
+        user_ids = list(pk_set)
+    else:
+        # A skill was cleared from every user
+        transaction.on_commit(matcher.invalidate)
+        return
+    transaction.on_commit(lambda: matcher.update_users(user_ids))
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, **kwargs):
+    project_id, project_status = instance.pk, instance.status
+    transaction.on_commit(lambda: facets.update_status(project_id, project_status))
+    project_versions.touch([instance.pk])
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    # The instance's pk is cleared once the delete is done
+    project_id = instance.pk
+    transaction.on_commit(lambda: matcher.remove_project(project_id))
+    transaction.on_commit(lambda: facets.remove_project(project_id))
+    project_versions.touch([project_id])
+
+
+@receiver([post_save, post_delete], sender=ProjectCollaborator)
+def project_collaborator_changed(sender, instance, **kwargs):
+    project_versions.touch([instance.project_id])
+
+
+@receiver([post_save, pre_delete], sender=Skill)
+def skill_changed(sender, instance, created=False, **kwargs):
+    """
+    Change the versions of the projects listing a renamed or deleted skill.
+    """
+    if not created:
+        project_versions.touch(list(instance.projects.values_list('pk', flat=True)))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: matcher.remove_user(user_id))
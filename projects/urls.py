@@ -3,12 +3,15 @@ from projects.views.projects import (
     ProjectListCreateView, ProjectDetailView, ProjectCollaborateView,
     ProjectLeaveView, CollaborationRequestListView, CollaborationRequestResponseView
 )
+from projects.views.recommendations import ProjectRecommendationView, ProjectCollaboratorMatchView
 
 urlpatterns = [
     path('', ProjectListCreateView.as_view(), name='project-list'),
+    path('recommended/', ProjectRecommendationView.as_view(), name='project-recommended'),
     path('<int:pk>/', ProjectDetailView.as_view(), name='project-detail'),
     path('<int:pk>/collaborate/', ProjectCollaborateView.as_view(), name='project-collaborate'),
     path('<int:pk>/leave/', ProjectLeaveView.as_view(), name='project-leave'),
+    path('<int:pk>/find-collaborators/', ProjectCollaboratorMatchView.as_view(), name='project-find-collaborators'),
     path('collaboration-requests/', CollaborationRequestListView.as_view(), name='collaboration-requests'),
     path('collaboration-requests/<int:pk>/respond/', CollaborationRequestResponseView.as_view(), name='collaboration-request-respond'),
 ] 
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""
+Versions of projects, for conditional GETs of project details.
+
+A project's version changes with the project itself, its collaborators and
+its tech stack; the users it renders have versions of their own.
+"""
+from users.versions import VersionCache
+
+project_versions = VersionCache('project')
@@ -2,13 +2,20 @@ from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from projects.models import Project, ProjectCollaborator, CollaborationRequest
 from projects.serializers import (
     ProjectSerializer, ProjectCollaboratorSerializer, 
     CollaborationRequestSerializer
 )
+from projects.versions import project_versions
 from notifications.models import Notification
+from users.encoders import user_fragments
+from users.views.mixins import ConditionalGetMixin, NormalizedUsersMixin
+from socialistic.throttling import RateLimitedMixin
+
+User = get_user_model()
 
 
 class IsProjectCreatorOrReadOnly(permissions.BasePermission):
@@ -24,7 +31,36 @@ class IsProjectCreatorOrReadOnly(permissions.BasePermission):
         return obj.creator == request.user
 
 
-class ProjectListCreateView(generics.ListCreateAPIView):
+class ProjectGraphMixin(NormalizedUsersMixin):
+    """
+    Loads everything ProjectSerializer reads in a fixed number of queries.
+    
+    The optional ``collaborators_limit`` query parameter returns only the
+    first N collaborators of each project. Parts of the graph left out by
+    ``?fields=`` or ``?expand=`` aren't loaded.
+    """
+    
+    def get_project_queryset(self, queryset):
+        limit = self.request.query_params.get('collaborators_limit', '')
+        selection = self.get_field_selection()
+        # Normalized responses load the users separately
+        load_users = not self.is_normalized()
+        
+        return queryset.with_collaborator_graph(
+            self.request.user if selection.includes('is_collaborator') else None,
+            collaborators_limit=int(limit) if limit.isdigit() else None,
+            users=User.objects.with_profile_data(
+                **self.get_profile_data_options('creator', 'collaborators.user')
+            ),
+            creator=load_users and selection.expands('creator'),
+            tech_stack=selection.includes('tech_stack'),
+            collaborators=selection.includes('collaborators'),
+            collaborator_users=load_users and selection.expands_path('collaborators.user'),
+            counts=selection.includes('collaborators_count'),
+        )
+
+
+class ProjectListCreateView(ProjectGraphMixin, generics.ListCreateAPIView):
     """
     API endpoint for listing and creating projects.
     """
@@ -32,23 +68,41 @@ class ProjectListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Project.objects.all()
+        return self.get_project_queryset(Project.objects.all())
 
 
-class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProjectDetailView(ConditionalGetMixin, ProjectGraphMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint for retrieving, updating, and deleting a project.
     """
-    queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated, IsProjectCreatorOrReadOnly]
+    
+    def get_queryset(self):
+        return self.get_project_queryset(Project.objects.all())
+    
+    def retrieve(self, request, *args, **kwargs):
+        # The creator and collaborators are rendered along with the project
+        user_ids = Project.objects.filter(pk=kwargs['pk']).values_list(
+            'creator_id', 'projectcollaborator__user_id'
+        )
+        if user_ids:
+            user_ids = sorted({pk for row in user_ids for pk in row} - {None})
+            not_modified = self.not_modified([
+                *project_versions.get_many([kwargs['pk']]).values(),
+                *user_fragments.versions.get_many(user_ids).values(),
+            ])
+            if not_modified is not None:
+                return not_modified
+        return super().retrieve(request, *args, **kwargs)
 
 
-class ProjectCollaborateView(APIView):
+class ProjectCollaborateView(RateLimitedMixin, APIView):
     """
     API endpoint for requesting to collaborate on a project.
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'collaboration'
     
     def post(self, request, pk):
         project = get_object_or_404(Project, pk=pk)
@@ -120,7 +174,7 @@ class ProjectLeaveView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class CollaborationRequestListView(generics.ListAPIView):
+class CollaborationRequestListView(NormalizedUsersMixin, generics.ListAPIView):
     """
     API endpoint for listing collaboration requests for projects created by the user.
     """
@@ -129,10 +183,11 @@ class CollaborationRequestListView(generics.ListAPIView):
     
     def get_queryset(self):
         # Get all pending requests for projects created by the user
-        return CollaborationRequest.objects.filter(
+        queryset = CollaborationRequest.objects.filter(
             project__creator=self.request.user,
             status='pending'
         )
+        return self.prefetch_users(queryset, 'user')
 
 
 class CollaborationRequestResponseView(APIView):
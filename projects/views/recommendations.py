@@ -0,0 +1,84 @@
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+from projects.matching import matcher, TOP_MATCHES
+from projects.models import Project, ProjectCollaborator
+from projects.serializers import ProjectMatchSerializer, CollaboratorMatchSerializer
+from projects.views.projects import ProjectGraphMixin
+from users.views.mixins import FieldSelectionMixin
+
+User = get_user_model()
+
+
+class MatchListMixin:
+    """
+    Lists the best skill matches of a user or project, best first, as
+    returned by the view's ``get_matches()``: ``(id, score)`` pairs.
+
+    The optional ``limit`` query parameter caps the number of results.
+    """
+    pagination_class = None
+    default_limit = 20
+
+    def get_limit(self):
+        limit = self.request.query_params.get('limit', '')
+        return min(int(limit), TOP_MATCHES) if limit.isdigit() else self.default_limit
+
+    def list(self, request, *args, **kwargs):
+        matches = self.get_matches()
+        scores = dict(matches)
+        position = {match_id: index for index, (match_id, _) in enumerate(matches)}
+
+        objects = sorted(
+            self.get_queryset().filter(id__in=scores),
+            key=lambda obj: position[obj.id]
+        )
+        for obj in objects:
+            obj.match_score = round(scores[obj.id], 4)
+
+        serializer = self.get_serializer(objects, many=True)
+        return Response(serializer.data)
+
+
+class ProjectRecommendationView(MatchListMixin, ProjectGraphMixin, generics.ListAPIView):
+    """
+    API endpoint for listing projects matching the user's skills.
+    """
+    serializer_class = ProjectMatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return self.get_project_queryset(Project.objects.all())
+
+    def get_matches(self):
+        # Don't recommend projects the user already works on
+        joined = ProjectCollaborator.objects.filter(
+            user=self.request.user
+        ).values_list('project_id', flat=True)
+        return matcher.recommend_projects(
+            self.request.user.id, self.get_limit(), exclude=set(joined)
+        )
+
+
+class ProjectCollaboratorMatchView(MatchListMixin, FieldSelectionMixin, generics.ListAPIView):
+    """
+    API endpoint for finding users whose skills match a project's tech stack.
+    """
+    serializer_class = CollaboratorMatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return self.get_user_queryset()
+
+    def get_matches(self):
+        project = get_object_or_404(Project, pk=self.kwargs['pk'])
+
+        # Don't suggest users who already collaborate on the project
+        collaborators = ProjectCollaborator.objects.filter(
+            project=project
+        ).values_list('user_id', flat=True)
+        return matcher.find_collaborators(
+            project.id, self.get_limit(), exclude=set(collaborators)
+        )
@@ -1,34 +1,84 @@
 from rest_framework import generics, filters
 from rest_framework.permissions import IsAuthenticated
+from projects.bitsets import mask_from_ids
+from projects.facets import facets
 from projects.models import Project
 from projects.serializers import ProjectSerializer
-from users.models import Skill
+from projects.views.projects import ProjectGraphMixin
+from users.catalog import skill_catalog
 
 
-class ProjectSearchView(generics.ListAPIView):
+class ProjectSearchView(ProjectGraphMixin, generics.ListAPIView):
     """
     API endpoint for searching projects.
+    
+    Along with the page of results, returns how many projects match each
+    tech stack skill and each status.
     """
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['title', 'description']
     
+    def get_skill_filter(self):
+        """Return the id of the skill to filter by, if it exists."""
+        skill_id = self.request.query_params.get('skill', '')
+        if skill_id.isdigit() and int(skill_id) in skill_catalog:
+            return int(skill_id)
+        return None
+    
+    def get_status_filter(self):
+        status = self.request.query_params.get('status')
+        if status in ['active', 'completed', 'on_hold']:
+            return status
+        return None
+    
     def get_queryset(self):
         queryset = Project.objects.all()
         
         # Filter by skill/tech stack if provided
-        skill_id = self.request.query_params.get('skill')
-        if skill_id:
-            try:
-                skill = Skill.objects.get(id=skill_id)
-                queryset = queryset.filter(tech_stack=skill)
-            except Skill.DoesNotExist:
-                pass
+        skill_id = self.get_skill_filter()
+        if skill_id is not None:
+            queryset = queryset.filter(tech_stack=skill_id)
         
         # Filter by status if provided
-        status = self.request.query_params.get('status')
-        if status in ['active', 'completed', 'on_hold']:
+        status = self.get_status_filter()
+        if status is not None:
             queryset = queryset.filter(status=status)
         
-        return queryset 
\ No newline at end of file
+        return self.get_project_queryset(queryset)
+    
+    def get_facets(self):
+        """
+        Count matching projects per skill and status from the facet index.
+        
+        Only a text search needs the database, to find the ids of the
+        projects it matches.
+        """
+        base = None
+        if self.request.query_params.get(filters.SearchFilter.search_param):
+            matching = self.filter_queryset(Project.objects.order_by())
+            base = mask_from_ids(matching.values_list('id', flat=True).iterator())
+        
+        skill_counts, status_counts = facets.get_index().counts(
+            base, skill_id=self.get_skill_filter(), status=self.get_status_filter()
+        )
+        skills = sorted(skill_catalog.get_many(skill_counts).values(), key=lambda skill: skill['name'])
+        tech_stack = [
+            {'id': skill['id'], 'name': skill['name'], 'count': skill_counts[skill['id']]}
+            for skill in skills
+        ]
+        tech_stack.sort(key=lambda facet: facet['count'], reverse=True)
+        
+        return {
+            'tech_stack': tech_stack,
+            'status': [
+                {'value': value, 'count': status_counts.get(value, 0)}
+                for value, _ in Project.STATUS_CHOICES
+            ],
+        }
+    
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        response.data['facets'] = self.get_facets()
+        return response
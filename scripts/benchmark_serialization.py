@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Benchmark the post list read path: DRF serializers and JSONRenderer against
+the precompiled row encoders and the orjson-based renderer.
+
+Runs against the configured database, so populate it first (e.g. with
+scripts/populate_db.py). Both paths go through PostListCreateView and must
+render the same bytes.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'socialistic.settings')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import Django after setting up environment
+import django
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from posts.pagination import CustomCursorPagination
+from posts.views.posts import PostListCreateView
+from users.renderers import FastJSONRenderer
+
+User = get_user_model()
+
+
+def render_page(user, fast):
+    """Render one page of the post list, through the fast path or not."""
+    view = PostListCreateView.as_view(
+        use_row_encoders=fast,
+        renderer_classes=[FastJSONRenderer if fast else JSONRenderer]
+    )
+    request = APIRequestFactory().get('/api/posts/', HTTP_HOST=settings.ALLOWED_HOSTS[0])
+    force_authenticate(request, user=user)
+    response = view(request)
+    response.render()
+    return response.content
+
+
+def benchmark(user, fast, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = render_page(user, fast)
+        timings.append(time.perf_counter() - start)
+    return content, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--page-size', type=int, default=100, help='posts per page')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per path')
+    parser.add_argument('--email', help='user to request the feed as (default: first user)')
+    args = parser.parse_args()
+
+    user = User.objects.get(email=args.email) if args.email else User.objects.first()
+    if user is None:
+        sys.exit('No users found; run scripts/populate_db.py first.')
+    CustomCursorPagination.page_size = args.page_size
+
+    # Warm up both paths (imports, connection, query compilation)
+    render_page(user, fast=False)
+    render_page(user, fast=True)
+
+    slow_content, slow = benchmark(user, fast=False, repeat=args.repeat)
+    fast_content, fast = benchmark(user, fast=True, repeat=args.repeat)
+
+    print(f"Page of up to {args.page_size} posts, {len(slow_content)} bytes, {args.repeat} runs")
+    for label, timings in [('serializers + JSONRenderer', slow), ('row encoders + orjson', fast)]:
+        print(
+            f"  {label:28} median {statistics.median(timings) * 1000:8.2f} ms"
+            f"   min {min(timings) * 1000:8.2f} ms"
+        )
+    print(f"  speedup: {statistics.median(slow) / statistics.median(fast):.2f}x")
+
+    if slow_content != fast_content:
+        sys.exit('ERROR: the two paths rendered different output')
+    print("  output is byte-identical")
+
+
+if __name__ == '__main__':
+    main()
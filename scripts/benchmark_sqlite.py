@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+Benchmark SQLite under concurrent mixed load: Django's stock backend with a
+connection per request against socialistic.db with persistent connections.
+
+Threads stand in for requests served concurrently. Each repeatedly reads a
+feed page or toggles a like in a transaction that reads before it writes,
+then releases its connection as Django does at the end of a request. Both
+configurations run on fresh database files in a temporary directory.
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'socialistic.settings')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from django.conf import settings
+
+TMP_DIR = Path(tempfile.mkdtemp(prefix='benchmark_sqlite_'))
+
+# Configure the databases before Django opens any connection
+settings.DATABASES = {
+    'default': {
+        'ENGINE': 'socialistic.db',
+        'NAME': TMP_DIR / 'tuned.sqlite3',
+        'CONN_MAX_AGE': None,
+    },
+    'stock': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': TMP_DIR / 'stock.sqlite3',
+    },
+}
+settings.DATABASE_REPLICAS = []
+settings.CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+# Import Django after setting up environment
+import django
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import OperationalError, connections, transaction
+from posts.models import Post, PostLike
+
+User = get_user_model()
+
+CONFIGURATIONS = [
+    ('stock', 'stock backend, connection per request'),
+    ('default', 'socialistic.db, persistent'),
+]
+
+
+def populate(alias, users, posts):
+    call_command('migrate', database=alias, verbosity=0)
+    User.objects.db_manager(alias).bulk_create([
+        User(username=f'user{n}', email=f'user{n}@example.com') for n in range(users)
+    ])
+    user_ids = list(User.objects.using(alias).values_list('id', flat=True))
+    Post.objects.using(alias).bulk_create([
+        Post(author_id=random.choice(user_ids), content=f'Post {n}') for n in range(posts)
+    ])
+    return user_ids, list(Post.objects.using(alias).values_list('id', flat=True))
+
+
+def read_feed(alias):
+    list(Post.objects.using(alias).order_by('-created_at').values('id', 'content', 'author_id')[:20])
+
+
+def toggle_like(alias, user_id, post_id):
+    with transaction.atomic(using=alias):
+        like = PostLike.objects.using(alias).filter(user_id=user_id, post_id=post_id).first()
+        if like is None:
+            PostLike.objects.using(alias).create(user_id=user_id, post_id=post_id)
+        else:
+            like.delete()
+
+
+def worker(alias, user_ids, post_ids, write_ratio, deadline, results):
+    reads, writes, errors = [], [], 0
+    while time.monotonic() < deadline:
+        write = random.random() < write_ratio
+        start = time.perf_counter()
+        try:
+            if write:
+                toggle_like(alias, random.choice(user_ids), random.choice(post_ids))
+            else:
+                read_feed(alias)
+        except OperationalError:
+            errors += 1
+        else:
+            (writes if write else reads).append(time.perf_counter() - start)
+        finally:
+            # What the request_finished signal does
+            connections[alias].close_if_unusable_or_obsolete()
+    connections[alias].close()
+    results.append((reads, writes, errors))
+
+
+def run(alias, user_ids, post_ids, args):
+    results = []
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(alias, user_ids, post_ids, args.write_ratio, deadline, results))
+        for _ in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reads = [timing for result in results for timing in result[0]]
+    writes = [timing for result in results for timing in result[1]]
+    errors = sum(result[2] for result in results)
+    return reads, writes, errors
+
+
+def percentile(timings, fraction):
+    if not timings:
+        return float('nan')
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * fraction))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8, help='concurrent workers')
+    parser.add_argument('--duration', type=float, default=5, help='seconds per configuration')
+    parser.add_argument('--write-ratio', type=float, default=0.3, help='share of operations that write')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--posts', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(
+        f"{args.threads} threads, {args.duration:g}s each, {args.write_ratio:.0%} writes, "
+        f"{args.users} users, {args.posts} posts"
+    )
+    throughput = {}
+    for alias, label in CONFIGURATIONS:
+        user_ids, post_ids = populate(alias, args.users, args.posts)
+        reads, writes, errors = run(alias, user_ids, post_ids, args)
+        throughput[alias] = (len(reads) + len(writes)) / args.duration
+        print(f"  {label}")
+        print(
+            f"    {throughput[alias]:8.0f} ops/s   {errors} 'database is locked' errors\n"
+            f"    reads  p50 {percentile(reads, 0.5):7.2f} ms   p95 {percentile(reads, 0.95):7.2f} ms\n"
+            f"    writes p50 {percentile(writes, 0.5):7.2f} ms   p95 {percentile(writes, 0.95):7.2f} ms"
+        )
+    print(f"  throughput gain: {throughput['default'] / throughput['stock']:.2f}x")
+    shutil.rmtree(TMP_DIR)
+
+
+if __name__ == '__main__':
+    main()
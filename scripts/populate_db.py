@@ -1,10 +1,30 @@
 #!/usr/bin/env python
 """
-Script to populate the database with fake data for development and testing.
+Populate the database with a synthetic, production-like dataset.
+
+The data is generated from a seed, so a seed and a set of sizes always give
+the same rows, whatever the chunk size or number of worker processes. The
+graph follows the skew of real social networks: a user's followers, likes
+and comments come from a power-law popularity, and how much users post,
+like and comment from a log-normal activity. Projects come with tech
+stacks, collaborators and collaboration requests, and every follow, like,
+comment and request gets its notification (see --notification-rate).
+
+Rows are written with bulk_create in chunks of about --chunk-size rows, one
+transaction per chunk, optionally in --workers processes. The defaults make
+about 180k rows; --users 10000 makes about 1.8M. New rows are added to
+what's already in the database; run `manage.py flush` first for a clean
+dataset.
 """
 import os
 import sys
+import time
 import random
+import argparse
+import itertools
+import multiprocessing
+from bisect import bisect
+from contextlib import contextmanager
 from datetime import timedelta
 
 # Set up Django environment
@@ -15,395 +35,495 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import django
 django.setup()
 
-from django.utils import timezone
-from django.db import transaction
-from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db import connection, connections, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
 from users.models import Skill, ProgrammingLanguage, Follow
 from posts.models import Post, Comment, PostLike, CommentLike
 from projects.models import Project, ProjectCollaborator, CollaborationRequest
 from notifications.models import Notification
-from faker import Faker
 
 User = get_user_model()
-fake = Faker()
-
-# Configuration
-NUM_USERS = 20
-NUM_SKILLS = 15
-NUM_PROGRAMMING_LANGUAGES = 10
-NUM_POSTS_PER_USER = (2, 8)  # Min, Max
-NUM_COMMENTS_PER_POST = (1, 5)  # Min, Max
-NUM_PROJECTS_PER_USER = (1, 3)  # Min, Max
-FOLLOW_PROBABILITY = 0.3  # 30% chance a user follows another user
-LIKE_PROBABILITY = 0.4  # 40% chance a user likes a post
-COMMENT_LIKE_PROBABILITY = 0.3  # 30% chance a user likes a comment
-COLLABORATION_PROBABILITY = 0.2  # 20% chance a user requests collaboration on a project
-
-
-def create_users(num_users):
-    """Create random users."""
-    print(f"Creating {num_users} users...")
-    users = []
-    
-    # Create admin user if it doesn't exist
-    if not User.objects.filter(email='admin@example.com').exists():
-        admin = User.objects.create_superuser(
-            username='admin',
-            email='admin@example.com',
-            password='adminpassword',
-            full_name='Admin User',
-            bio=fake.paragraph()
-        )
-        users.append(admin)
-        print("Created admin user: admin@example.com / adminpassword")
-    
-    # Create regular users
-    for i in range(num_users):
-        first_name = fake.first_name()
-        last_name = fake.last_name()
-        username = f"{first_name.lower()}{last_name.lower()}{random.randint(1, 999)}"
-        email = f"{username}@example.com"
-        
-        if User.objects.filter(email=email).exists():
-            continue
-            
-        user = User.objects.create_user(
-            username=username[:30],  # Ensure username is not too long
-            email=email,
-            password='password123',
-            full_name=f"{first_name} {last_name}",
-            bio=fake.paragraph()
+
+SKILLS = {
+    'frontend': ['React', 'Angular', 'Vue.js', 'HTML5', 'CSS3', 'Sass', 'JavaScript', 'TypeScript'],
+    'backend': ['Django', 'Flask', 'FastAPI', 'Express.js', 'Spring Boot', 'Ruby on Rails', 'Laravel'],
+    'mobile': ['React Native', 'Flutter', 'Kotlin', 'Swift', 'Xamarin'],
+    'data': ['Pandas', 'NumPy', 'TensorFlow', 'PyTorch', 'scikit-learn', 'R'],
+    'devops': ['Docker', 'Kubernetes', 'Jenkins', 'GitHub Actions', 'AWS', 'Azure', 'Google Cloud'],
+    'design': ['Figma', 'Sketch', 'Illustrator'],
+    'other': ['PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'Elasticsearch'],
+}
+LANGUAGES = ['Python', 'JavaScript', 'TypeScript', 'Java', 'C#', 'C++', 'Go', 'Rust', 'PHP', 'Ruby', 'Swift', 'Kotlin']
+PASSWORD = 'password123'
+
+# Shape of the Pareto distributions of follows and collaboration requests;
+# below 2 a few users get most of them
+PARETO_SHAPE = 1.5
+
+MODELS = [
+    User, Skill.users.through, Follow, Post, Comment, PostLike, CommentLike,
+    Project, Project.tech_stack.through, ProjectCollaborator, CollaborationRequest, Notification,
+]
+
+
+def pareto(rng, mean, cap):
+    """Draw a heavy-tailed count with the given mean, at most ``cap``."""
+    if mean <= 0:
+        return 0
+    scale = mean * (PARETO_SHAPE - 1) / PARETO_SHAPE
+    return min(cap, int(scale * rng.paretovariate(PARETO_SHAPE)))
+
+
+def poisson(rng, mean):
+    """Draw a count with the given mean and a light tail."""
+    count, total = 0, rng.expovariate(1)
+    while total < mean:
+        count += 1
+        total += rng.expovariate(1)
+    return count
+
+
+def sample_distinct(rng, population, cum_weights, k, exclude):
+    """Draw up to ``k`` distinct members of ``population``, weighted."""
+    chosen = set()
+    total = cum_weights[-1]
+    for _ in range(k * 3):
+        if len(chosen) >= k:
+            break
+        member = population[bisect(cum_weights, rng.random() * total)]
+        if member != exclude:
+            chosen.add(member)
+    return sorted(chosen)
+
+
+def owner_rng(seed, table, owner_id):
+    # One generator per parent row, so chunking doesn't change the data
+    return random.Random(f'{seed}:{table}:{owner_id}')
+
+
+def offsets(counts, base):
+    """Return the first id of the rows of each owner."""
+    return list(itertools.accumulate(counts, initial=base))
+
+
+class Plan:
+    """
+    What every chunk needs to know about the rest of the dataset: ids, names,
+    how popular and active each user is, and how many rows each parent row
+    gets. Generated in the parent process and shared with the workers.
+    """
+
+    def __init__(self, args, bases, skill_ids, language_ids, content_types):
+        self.args = args
+        self.seed = args.seed
+        self.skill_ids = skill_ids
+        self.language_ids = language_ids
+        self.content_types = content_types
+        self.password = make_password(PASSWORD)
+        self.end = timezone.now()
+        self.start = self.end - timedelta(days=args.days)
+        rng = random.Random(f'{self.seed}:plan')
+        fake = Faker()
+        fake.seed_instance(self.seed)
+        n = args.users
+
+        self.user_ids = list(range(bases[User], bases[User] + n))
+        self.full_names = [f'{fake.first_name()} {fake.last_name()}' for _ in range(n)]
+        self.usernames = [
+            ''.join(filter(str.isalnum, f'{name.split()[0][:12]}{name.split()[-1][:8]}{user_id}')).lower()
+            for name, user_id in zip(self.full_names, self.user_ids)
+        ]
+        # Users joined over the first half of the period
+        self.joined = sorted(rng.uniform(0, 0.5) for _ in range(n))
+
+        ranks = list(range(n))
+        rng.shuffle(ranks)
+        # Both average 1 per user
+        popularity = [1 / (rank + 1) ** args.popularity_exponent for rank in ranks]
+        total = sum(popularity)
+        self.popularity = [weight * n / total for weight in popularity]
+        activity = [rng.lognormvariate(0, 1) for _ in range(n)]
+        total = sum(activity)
+        self.activity = [weight * n / total for weight in activity]
+        self.cum_popularity = list(itertools.accumulate(self.popularity))
+        self.cum_activity = list(itertools.accumulate(self.activity))
+
+        self.follows = [
+            pareto(rng, args.follows_per_user * self.activity[i], n // 2) for i in range(n)
+        ]
+        self.posts = [poisson(rng, args.posts_per_user * self.activity[i]) for i in range(n)]
+        self.post_ids = offsets(self.posts, bases[Post])
+        post_authors = [i for i in range(n) for _ in range(self.posts[i])]
+        # Popular authors get more engagement
+        self.likes = [
+            min(n - 1, poisson(rng, args.likes_per_post * self.popularity[i] ** 0.5))
+            for i in post_authors
+        ]
+        self.comments = [
+            poisson(rng, args.comments_per_post * self.popularity[i] ** 0.5) for i in post_authors
+        ]
+        self.comment_ids = offsets(self.comments, bases[Comment])
+        self.projects = [poisson(rng, args.projects_per_user * self.activity[i]) for i in range(n)]
+        self.project_ids = offsets(self.projects, bases[Project])
+        self.requests = [
+            pareto(rng, args.requests_per_project, n - 1) for _ in range(self.project_ids[-1] - bases[Project])
+        ]
+        self.request_ids = offsets(self.requests, bases[CollaborationRequest])
+
+        self.sentences = [fake.sentence(nb_words=12) for _ in range(2000)]
+        self.words = [fake.word() for _ in range(1000)]
+
+    def time(self, rng, after, skew=1):
+        """
+        Return a random time after the fraction ``after`` of the period,
+        closer to it the higher ``skew`` is.
+        """
+        fraction = after + (1 - after) * rng.random() ** skew
+        return self.start + (self.end - self.start) * fraction
+
+    def fraction(self, moment):
+        return (moment - self.start) / (self.end - self.start)
+
+    def text(self, rng, sentences):
+        return ' '.join(rng.choices(self.sentences, k=sentences))
+
+    def notify(self, rng):
+        return rng.random() < self.args.notification_rate
+
+    def notification(self, recipient, sender, type, model, object_id, text, created_at):
+        return Notification(
+            recipient_id=recipient, sender_id=sender, type=type,
+            content_type_id=self.content_types[model], object_id=object_id,
+            text=text, created_at=created_at,
         )
-        users.append(user)
-    
-    return users
-
-
-def create_skills(num_skills):
-    """Create programming skills."""
-    print(f"Creating {num_skills} skills...")
-    skills = []
-    
-    categories = ['frontend', 'backend', 'mobile', 'data science', 'devops', 'database']
-    frontend_skills = ['React', 'Angular', 'Vue.js', 'HTML5', 'CSS3', 'Sass', 'JavaScript', 'TypeScript']
-    backend_skills = ['Django', 'Flask', 'FastAPI', 'Express.js', 'Spring Boot', 'Ruby on Rails', 'Laravel']
-    mobile_skills = ['React Native', 'Flutter', 'Kotlin', 'Swift', 'Xamarin']
-    data_science_skills = ['Pandas', 'NumPy', 'TensorFlow', 'PyTorch', 'scikit-learn', 'R']
-    devops_skills = ['Docker', 'Kubernetes', 'Jenkins', 'GitHub Actions', 'AWS', 'Azure', 'Google Cloud']
-    database_skills = ['PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'ElasticSearch', 'Firebase']
-    
-    all_skills = {
-        'frontend': frontend_skills,
-        'backend': backend_skills,
-        'mobile': mobile_skills,
-        'data science': data_science_skills,
-        'devops': devops_skills,
-        'database': database_skills
+
+
+def generate_users(plan, start, stop):
+    rows = {User: [], Skill.users.through: []}
+    for i in range(start, stop):
+        user_id = plan.user_ids[i]
+        rng = owner_rng(plan.seed, 'users', user_id)
+        username = plan.usernames[i]
+        joined = plan.start + (plan.end - plan.start) * plan.joined[i]
+        rows[User].append(User(
+            id=user_id, username=username, email=f'{username}@example.com', password=plan.password,
+            full_name=plan.full_names[i], bio=plan.text(rng, rng.randint(0, 3)),
+            github_profile=f'https://github.com/{username}' if rng.random() < 0.6 else '',
+            stackoverflow_profile=f'https://stackoverflow.com/users/{user_id}' if rng.random() < 0.3 else '',
+            date_joined=joined, created_at=joined, updated_at=joined,
+        ))
+        for skill_id in rng.sample(plan.skill_ids, min(len(plan.skill_ids), rng.randint(0, 6))):
+            rows[Skill.users.through].append(Skill.users.through(user_id=user_id, skill_id=skill_id))
+    return rows
+
+
+def generate_follows(plan, start, stop):
+    rows = {Follow: [], Notification: []}
+    for i in range(start, stop):
+        follower = plan.user_ids[i]
+        rng = owner_rng(plan.seed, 'follows', follower)
+        for following in sample_distinct(rng, plan.user_ids, plan.cum_popularity, plan.follows[i], follower):
+            j = following - plan.user_ids[0]
+            created_at = plan.time(rng, max(plan.joined[i], plan.joined[j]))
+            rows[Follow].append(Follow(follower_id=follower, following_id=following, created_at=created_at))
+            if plan.notify(rng):
+                rows[Notification].append(plan.notification(
+                    following, follower, 'follow', User, following,
+                    f'{plan.usernames[i]} started following you', created_at,
+                ))
+    return rows
+
+
+def generate_posts(plan, start, stop):
+    rows = {Post: []}
+    for i in range(start, stop):
+        author = plan.user_ids[i]
+        rng = owner_rng(plan.seed, 'posts', author)
+        for post_id in range(plan.post_ids[i], plan.post_ids[i + 1]):
+            created_at = plan.time(rng, plan.joined[i])
+            has_code = rng.random() < 0.4
+            rows[Post].append(Post(
+                id=post_id, author_id=author, content=plan.text(rng, rng.randint(1, 5)),
+                code_snippet='\n'.join(rng.choices(plan.sentences, k=rng.randint(2, 8))) if has_code else None,
+                programming_language_id=rng.choice(plan.language_ids) if has_code else None,
+                created_at=created_at, updated_at=created_at,
+            ))
+    return rows
+
+
+def generate_engagement(plan, start, stop):
+    """Likes and comments of the posts from index ``start`` to ``stop``."""
+    rows = {Comment: [], PostLike: [], CommentLike: [], Notification: []}
+    base = plan.post_ids[0]
+    posts = Post.objects.filter(id__gte=base + start, id__lt=base + stop).values_list('id', 'author_id', 'created_at')
+    for post_id, author, post_created in posts.order_by('id'):
+        p = post_id - base
+        rng = owner_rng(plan.seed, 'engagement', post_id)
+        after = plan.fraction(post_created)
+        for user in sample_distinct(rng, plan.user_ids, plan.cum_activity, plan.likes[p], author):
+            created_at = plan.time(rng, after, skew=3)
+            rows[PostLike].append(PostLike(user_id=user, post_id=post_id, created_at=created_at))
+            if plan.notify(rng):
+                rows[Notification].append(plan.notification(
+                    author, user, 'like', Post, post_id,
+                    f'{plan.usernames[user - plan.user_ids[0]]} liked your post', created_at,
+                ))
+        for comment_id in range(plan.comment_ids[p], plan.comment_ids[p + 1]):
+            commenter = plan.user_ids[bisect(plan.cum_activity, rng.random() * plan.cum_activity[-1])]
+            created_at = plan.time(rng, after, skew=3)
+            rows[Comment].append(Comment(
+                id=comment_id, post_id=post_id, author_id=commenter, content=plan.text(rng, rng.randint(1, 3)),
+                created_at=created_at, updated_at=created_at,
+            ))
+            if commenter != author and plan.notify(rng):
+                rows[Notification].append(plan.notification(
+                    author, commenter, 'comment', Comment, comment_id,
+                    f'{plan.usernames[commenter - plan.user_ids[0]]} commented on your post', created_at,
+                ))
+            likes = min(len(plan.user_ids) - 1, poisson(rng, plan.args.likes_per_comment))
+            for user in sample_distinct(rng, plan.user_ids, plan.cum_activity, likes, commenter):
+                liked_at = plan.time(rng, plan.fraction(created_at), skew=3)
+                rows[CommentLike].append(CommentLike(user_id=user, comment_id=comment_id, created_at=liked_at))
+                if plan.notify(rng):
+                    rows[Notification].append(plan.notification(
+                        commenter, user, 'like', Comment, comment_id,
+                        f'{plan.usernames[user - plan.user_ids[0]]} liked your comment', liked_at,
+                    ))
+    return rows
+
+
+def generate_projects(plan, start, stop):
+    rows = {
+        Project: [], Project.tech_stack.through: [], ProjectCollaborator: [],
+        CollaborationRequest: [], Notification: [],
     }
-    
-    for category in categories:
-        for skill_name in all_skills[category]:
-            if len(skills) >= num_skills:
-                break
-                
-            skill, created = Skill.objects.get_or_create(
-                name=skill_name,
-                defaults={'category': category}
-            )
-            skills.append(skill)
-    
-    # If we need more skills, create random ones
-    while len(skills) < num_skills:
-        category = random.choice(categories)
-        skill_name = fake.word().capitalize() + " " + fake.word().capitalize()
-        
-        skill, created = Skill.objects.get_or_create(
-            name=skill_name,
-            defaults={'category': category}
-        )
-        if created:
-            skills.append(skill)
-    
-    return skills
-
-
-def create_programming_languages(num_languages):
-    """Create programming languages."""
-    print(f"Creating {num_languages} programming languages...")
-    languages = []
-    
-    language_names = ['Python', 'JavaScript', 'TypeScript', 'Java', 'C#', 'C++', 'Go', 'Rust', 'PHP', 'Ruby', 'Swift', 'Kotlin']
-    
-    for language_name in language_names[:num_languages]:
-        language, created = ProgrammingLanguage.objects.get_or_create(name=language_name)
-        languages.append(language)
-    
-    return languages
-
-
-def create_follows(users):
-    """Create follow relationships between users."""
-    print("Creating follow relationships...")
-    follows = []
-    
-    for follower in users:
-        for following in users:
-            if follower != following and random.random() < FOLLOW_PROBABILITY:
-                follow, created = Follow.objects.get_or_create(
-                    follower=follower,
-                    following=following
-                )
-                if created:
-                    follows.append(follow)
-                    # Create notification with content_type for Follow model
-                    Notification.objects.get_or_create(
-                        recipient=following,
-                        sender=follower,
-                        type='follow',
-                        text=f"{follower.username} started following you.",
-                        content_type=ContentType.objects.get_for_model(Follow),
-                        object_id=follow.id
-                    )
-    
-    print(f"Created {len(follows)} follow relationships")
-    return follows
-
-
-def create_posts(users, languages):
-    """Create posts for users."""
-    print("Creating posts...")
-    posts = []
-    
-    for user in users:
-        num_posts = random.randint(*NUM_POSTS_PER_USER)
-        for _ in range(num_posts):
-            has_code = random.random() > 0.5
-            language = random.choice(languages) if has_code else None
-            
-            post = Post.objects.create(
-                author=user,
-                content=fake.paragraph(),
-                code_snippet=fake.text(max_nb_chars=200) if has_code else "",
-                programming_language=language
-            )
-            posts.append(post)
-    
-    print(f"Created {len(posts)} posts")
-    return posts
-
-
-def create_comments(users, posts):
-    """Create comments on posts."""
-    print("Creating comments...")
-    comments = []
-    
-    for post in posts:
-        num_comments = random.randint(*NUM_COMMENTS_PER_POST)
-        for _ in range(num_comments):
-            user = random.choice(users)
-            
-            comment = Comment.objects.create(
-                author=user,
-                post=post,
-                content=fake.paragraph(nb_sentences=2)
-            )
-            comments.append(comment)
-            
-            # Create notification for post author if commenter is not the author
-            if user != post.author:
-                Notification.objects.get_or_create(
-                    recipient=post.author,
-                    sender=user,
-                    type='comment',
-                    content_type=ContentType.objects.get_for_model(post),
-                    object_id=post.id,
-                    text=f"{user.username} commented on your post"
-                )
-    
-    print(f"Created {len(comments)} comments")
-    return comments
-
-
-def create_likes(users, posts, comments):
-    """Create likes for posts and comments."""
-    print("Creating likes...")
-    post_likes = []
-    comment_likes = []
-    
-    # Post likes
-    for post in posts:
-        for user in users:
-            if user != post.author and random.random() < LIKE_PROBABILITY:
-                like, created = PostLike.objects.get_or_create(
-                    user=user,
-                    post=post
-                )
-                if created:
-                    post_likes.append(like)
-                    # Create notification
-                    if user != post.author:
-                        Notification.objects.get_or_create(
-                            recipient=post.author,
-                            sender=user,
-                            type='like',
-                            content_type=ContentType.objects.get_for_model(post),
-                            object_id=post.id,
-                            text=f"{user.username} liked your post"
-                        )
-    
-    # Comment likes
-    for comment in comments:
-        for user in users:
-            if user != comment.author and random.random() < COMMENT_LIKE_PROBABILITY:
-                like, created = CommentLike.objects.get_or_create(
-                    user=user,
-                    comment=comment
-                )
-                if created:
-                    comment_likes.append(like)
-                    # Create notification
-                    if user != comment.author:
-                        Notification.objects.get_or_create(
-                            recipient=comment.author,
-                            sender=user,
-                            type='like',
-                            content_type=ContentType.objects.get_for_model(comment),
-                            object_id=comment.id,
-                            text=f"{user.username} liked your comment"
-                        )
-    
-    print(f"Created {len(post_likes)} post likes and {len(comment_likes)} comment likes")
-    return post_likes, comment_likes
-
-
-def create_projects(users, skills):
-    """Create projects."""
-    print("Creating projects...")
-    projects = []
-    
-    # Project statuses
-    statuses = ['active', 'completed', 'planning']
-    
-    for user in users:
-        num_projects = random.randint(*NUM_PROJECTS_PER_USER)
-        for _ in range(num_projects):
-            # Create project
-            project = Project.objects.create(
-                creator=user,
-                title=fake.sentence(nb_words=4)[:-1],  # Remove period
-                description=fake.paragraph(),
-                repo_url=f"https://github.com/{user.username}/{fake.word()}-{fake.word()}",
-                status=random.choice(statuses)
-            )
-            
-            # Add tech stack (1-5 random skills)
-            project_skills = random.sample(skills, random.randint(1, min(5, len(skills))))
-            project.tech_stack.set(project_skills)
-            
-            # Add creator as collaborator
-            ProjectCollaborator.objects.create(
-                project=project,
-                user=user,
-                role='creator'
-            )
-            
-            projects.append(project)
-    
-    print(f"Created {len(projects)} projects")
-    return projects
-
-
-def create_collaborations(users, projects):
-    """Create collaboration requests."""
-    print("Creating collaboration requests...")
-    collaboration_requests = []
-    
-    for project in projects:
-        for user in users:
-            # Skip if user is already a collaborator
-            if ProjectCollaborator.objects.filter(project=project, user=user).exists():
-                continue
-                
-            if user != project.creator and random.random() < COLLABORATION_PROBABILITY:
-                status = random.choice(['pending', 'approved', 'rejected'])
-                request = CollaborationRequest.objects.create(
-                    user=user,
-                    project=project,
-                    message=fake.paragraph(nb_sentences=1),
-                    status=status
+    base = plan.project_ids[0]
+    for i in range(start, stop):
+        creator = plan.user_ids[i]
+        rng = owner_rng(plan.seed, 'projects', creator)
+        for project_id in range(plan.project_ids[i], plan.project_ids[i + 1]):
+            created_at = plan.time(rng, plan.joined[i])
+            title = ' '.join(rng.choices(plan.words, k=rng.randint(2, 5))).capitalize()
+            rows[Project].append(Project(
+                id=project_id, creator_id=creator, title=title, description=plan.text(rng, rng.randint(2, 6)),
+                repo_url=f'https://github.com/{plan.usernames[i]}/{title.lower().replace(" ", "-")}',
+                status=rng.choices(['active', 'completed', 'on_hold'], weights=[6, 3, 1])[0],
+                created_at=created_at, updated_at=created_at,
+            ))
+            for skill_id in rng.sample(plan.skill_ids, min(len(plan.skill_ids), rng.randint(1, 5))):
+                rows[Project.tech_stack.through].append(
+                    Project.tech_stack.through(project_id=project_id, skill_id=skill_id)
                 )
-                collaboration_requests.append(request)
-                
-                # Create notification for project creator
-                Notification.objects.get_or_create(
-                    recipient=project.creator,
-                    sender=user,
-                    type='project_request',
-                    content_type=ContentType.objects.get_for_model(project),
-                    object_id=project.id,
-                    text=f"{user.username} requested to collaborate on your project '{project.title}'"
-                )
-                
-                # If accepted, add user as collaborator
+            rows[ProjectCollaborator].append(ProjectCollaborator(
+                project_id=project_id, user_id=creator, role='owner', joined_at=created_at,
+            ))
+
+            p = project_id - base
+            requesters = sample_distinct(rng, plan.user_ids, plan.cum_activity, plan.requests[p], creator)
+            for request_id, user in zip(range(plan.request_ids[p], plan.request_ids[p + 1]), requesters):
+                requested_at = plan.time(rng, plan.fraction(created_at), skew=2)
+                status = rng.choices(['pending', 'approved', 'rejected'], weights=[3, 5, 2])[0]
+                username = plan.usernames[user - plan.user_ids[0]]
+                rows[CollaborationRequest].append(CollaborationRequest(
+                    id=request_id, user_id=user, project_id=project_id, message=plan.text(rng, 1),
+                    status=status, created_at=requested_at, updated_at=requested_at,
+                ))
+                if plan.notify(rng):
+                    rows[Notification].append(plan.notification(
+                        creator, user, 'project_request', CollaborationRequest, request_id,
+                        f'{username} requested to collaborate on {title}', requested_at,
+                    ))
                 if status == 'approved':
-                    ProjectCollaborator.objects.get_or_create(
-                        project=project,
-                        user=user,
-                        role='contributor'
-                    )
-                    
-                    # Create notification for requester
-                    Notification.objects.get_or_create(
-                        recipient=user,
-                        sender=project.creator,
-                        type='project_accepted',
-                        content_type=ContentType.objects.get_for_model(project),
-                        object_id=project.id,
-                        text=f"Your request to collaborate on '{project.title}' was accepted"
-                    )
-    
-    print(f"Created {len(collaboration_requests)} collaboration requests")
-    return collaboration_requests
-
-
-@transaction.atomic
+                    rows[ProjectCollaborator].append(ProjectCollaborator(
+                        project_id=project_id, user_id=user, role='contributor', joined_at=requested_at,
+                    ))
+                    if plan.notify(rng):
+                        rows[Notification].append(plan.notification(
+                            user, creator, 'project_accepted', Project, project_id,
+                            f'Your request to join {title} was approved', requested_at,
+                        ))
+    return rows
+
+
+# (name, generator, rows each parent row gets), in dependency order
+PHASES = [
+    ('users', generate_users, lambda plan: [1] * len(plan.user_ids)),
+    ('follows', generate_follows, lambda plan: plan.follows),
+    ('posts', generate_posts, lambda plan: plan.posts),
+    ('likes and comments', generate_engagement, lambda plan: [
+        likes + comments * (1 + plan.args.likes_per_comment)
+        for likes, comments in zip(plan.likes, plan.comments)
+    ]),
+    ('projects', generate_projects, lambda plan: [
+        projects * (3 + plan.args.requests_per_project) for projects in plan.projects
+    ]),
+]
+
+
+def chunk_ranges(counts, size):
+    """Split parent rows into ranges with about ``size`` rows each."""
+    start, total = 0, 0
+    for i, count in enumerate(counts):
+        total += count
+        if total >= size:
+            yield start, i + 1
+            start, total = i + 1, 0
+    if start < len(counts):
+        yield start, len(counts)
+
+
+GENERATORS = {name: generate for name, generate, _ in PHASES}
+
+
+@contextmanager
+def explicit_timestamps():
+    """Let bulk_create write the generated creation and update times."""
+    fields = [
+        field for model in MODELS for field in model._meta.get_fields()
+        if isinstance(field, models.DateTimeField) and (field.auto_now or field.auto_now_add)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+_plan = None
+
+
+def init_worker(plan):
+    global _plan
+    _plan = plan
+
+
+def write_chunk(task):
+    """Generate and insert one chunk of a phase in one transaction."""
+    phase, start, stop = task
+    rows = GENERATORS[phase](_plan, start, stop)
+    with explicit_timestamps(), transaction.atomic():
+        for model, objs in rows.items():
+            model.objects.bulk_create(objs, batch_size=_plan.args.batch_size)
+    return {model._meta.db_table: len(objs) for model, objs in rows.items()}
+
+
+def get_bases():
+    """Return the first free id of the tables whose ids are generated."""
+    return {
+        model: (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        for model in (User, Post, Comment, Project, CollaborationRequest)
+    }
+
+
+def create_catalogs():
+    skills = [
+        Skill.objects.get_or_create(name=name, defaults={'category': category})[0].id
+        for category, names in SKILLS.items() for name in names
+    ]
+    languages = [ProgrammingLanguage.objects.get_or_create(name=name)[0].id for name in LANGUAGES]
+    return skills, languages
+
+
+def create_admin():
+    if not User.objects.filter(email='admin@example.com').exists():
+        User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpassword', full_name='Admin User'
+        )
+        print("Created admin user: admin@example.com / adminpassword")
+
+
+def reset_sequences():
+    """Move the id sequences past the generated ids (a no-op on SQLite)."""
+    statements = connection.ops.sequence_reset_sql(no_style(), MODELS)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def populate(args, log=print):
+    """Generate the dataset described by ``args``; return the rows per table."""
+    create_admin()
+    skill_ids, language_ids = create_catalogs()
+    content_types = {
+        model: ContentType.objects.get_for_model(model).id
+        for model in (User, Post, Comment, Project, CollaborationRequest)
+    }
+    plan = Plan(args, get_bases(), skill_ids, language_ids, content_types)
+    totals = dict.fromkeys((model._meta.db_table for model in MODELS), 0)
+
+    if args.workers > 1:
+        # Workers open their own connections
+        connections.close_all()
+        pool = multiprocessing.Pool(args.workers, initializer=init_worker, initargs=(plan,))
+        run = pool.imap_unordered
+    else:
+        init_worker(plan)
+        pool, run = None, map
+    try:
+        for name, _, counts in PHASES:
+            started = time.perf_counter()
+            tasks = [(name, start, stop) for start, stop in chunk_ranges(counts(plan), args.chunk_size)]
+            rows = 0
+            for written in run(write_chunk, tasks):
+                for table, count in written.items():
+                    totals[table] += count
+                    rows += count
+            log(f"  {name:20} {rows:9,} rows in {time.perf_counter() - started:6.1f}s")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    reset_sequences()
+    return totals
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=365, help='period the activity is spread over')
+    parser.add_argument('--follows-per-user', type=float, default=30, help='mean')
+    parser.add_argument('--popularity-exponent', type=float, default=1.0,
+                        help='Zipf exponent of user popularity; higher is more skewed')
+    parser.add_argument('--posts-per-user', type=float, default=10, help='mean')
+    parser.add_argument('--likes-per-post', type=float, default=5, help='mean')
+    parser.add_argument('--comments-per-post', type=float, default=2, help='mean')
+    parser.add_argument('--likes-per-comment', type=float, default=0.5, help='mean')
+    parser.add_argument('--projects-per-user', type=float, default=1, help='mean')
+    parser.add_argument('--requests-per-project', type=float, default=2, help='mean')
+    parser.add_argument('--notification-rate', type=float, default=1,
+                        help='share of follows, likes, comments and requests that notify')
+    parser.add_argument('--chunk-size', type=int, default=20000, help='rows per transaction')
+    parser.add_argument('--batch-size', type=int, default=2000, help='rows per INSERT')
+    parser.add_argument('--workers', type=int, default=1, help='processes generating chunks')
+    return parser
+
+
 def main():
-    """Main function to populate the database."""
-    print("Starting database population...")
-    
-    # Create basic data
-    users = create_users(NUM_USERS)
-    skills = create_skills(NUM_SKILLS)
-    languages = create_programming_languages(NUM_PROGRAMMING_LANGUAGES)
-    
-    # Assign random skills to users
-    print("Assigning skills to users...")
-    for user in users:
-        user_skills = random.sample(skills, random.randint(1, min(5, len(skills))))
-        user.skills.set(user_skills)
-    
-    # Create relationships and content
-    follows = create_follows(users)
-    posts = create_posts(users, languages)
-    comments = create_comments(users, posts)
-    post_likes, comment_likes = create_likes(users, posts, comments)
-    projects = create_projects(users, skills)
-    collaboration_requests = create_collaborations(users, projects)
-    
-    print("Database population completed successfully!")
-    print(f"Created {len(users)} users")
-    print(f"Created {len(skills)} skills")
-    print(f"Created {len(languages)} programming languages")
-    print(f"Created {len(follows)} follow relationships")
-    print(f"Created {len(posts)} posts")
-    print(f"Created {len(comments)} comments")
-    print(f"Created {len(post_likes)} post likes")
-    print(f"Created {len(comment_likes)} comment likes")
-    print(f"Created {len(projects)} projects")
-    print(f"Created {len(collaboration_requests)} collaboration requests")
-    print(f"Created {Notification.objects.count()} notifications")
+    args = get_parser().parse_args()
+
+    print(f"Populating the database with {args.users:,} users (seed {args.seed})...")
+    started = time.perf_counter()
+    totals = populate(args)
+    # Cached fragments, versions and catalogs predate the new rows
+    cache.clear()
+
+    print(f"Created {sum(totals.values()):,} rows in {time.perf_counter() - started:.1f}s:")
+    for table, count in totals.items():
+        print(f"  {table:30} {count:9,}")
+    print(f"Generated users log in with <username>@example.com / {PASSWORD}")
 
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
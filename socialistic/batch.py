@@ -0,0 +1,181 @@
+"""
+Batch endpoint: runs several API requests in one round trip.
+
+The sub-requests are dispatched in-process to the views their URLs
+resolve to. They skip the middleware and reuse the batch request's
+authentication instead of decoding the JWT again, and share an identity
+map (``users.identity``) so objects rendered by several of them are
+fetched from the cache once. Batches of reads can run concurrently.
+"""
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve, reverse
+from rest_framework import serializers
+from rest_framework.views import APIView
+from users import identity
+from users.renderers import FastJSONRenderer
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Headers of the batch request that aren't passed on to sub-requests
+PRIVATE_META = {
+    'CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_AUTHORIZATION', 'HTTP_COOKIE',
+    'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_ACCEPT',
+    'PATH_INFO', 'QUERY_STRING', 'REQUEST_METHOD',
+}
+
+# Headers sub-requests may set, and response headers returned for each
+REQUEST_HEADERS = {'If-None-Match', 'If-Modified-Since'}
+RESPONSE_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Location')
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    url = serializers.CharField()
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+    def validate_url(self, value):
+        url = urlsplit(value)
+        if (
+            url.scheme or url.netloc
+            or not url.path.startswith('/api/')
+            or url.path.startswith(reverse('batch'))
+        ):
+            raise serializers.ValidationError("Must be an API path other than the batch endpoint.")
+        return value
+
+    def validate_headers(self, value):
+        unsupported = set(value) - REQUEST_HEADERS
+        if unsupported:
+            raise serializers.ValidationError(
+                f"Unsupported headers: {', '.join(sorted(unsupported))}."
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchRequestSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"A batch can hold at most {settings.BATCH_MAX_REQUESTS} requests."
+            )
+        return value
+
+
+def build_subrequest(request, spec):
+    """Return the WSGIRequest for one sub-request of ``request``."""
+    url = urlsplit(spec['url'])
+    body = b''
+    if 'body' in spec:
+        body = FastJSONRenderer().render(spec['body'])
+
+    environ = {
+        key: value for key, value in request.META.items()
+        if isinstance(value, str) and key not in PRIVATE_META
+    }
+    environ.update({
+        'REQUEST_METHOD': spec['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'HTTP_ACCEPT': 'application/json',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.url_scheme': request.scheme,
+    })
+    for name, value in spec.get('headers', {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+
+    subrequest = WSGIRequest(environ)
+    # Authenticate as the batch request did (see rest_framework.request.Request)
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def run_subrequest(request, spec):
+    """Dispatch one sub-request and return its response."""
+    subrequest = build_subrequest(request, spec)
+    try:
+        match = resolve(subrequest.path_info)
+    except Resolver404:
+        return HttpResponse(status=404)
+
+    subrequest.resolver_match = match
+    try:
+        # Async views are dispatched to the sync view they wrap
+        view = getattr(match.func, 'sync_view', match.func)
+        response = view(subrequest, *match.args, **match.kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+    except Exception:
+        logger.exception('Error in batch sub-request %s %s', spec['method'], spec['url'])
+        return HttpResponse(status=500)
+    return response
+
+
+def run_concurrently(request, specs):
+    """Run read sub-requests on a thread pool, each with its own connection."""
+    context = copy_context()
+
+    def run(spec):
+        try:
+            # Every task shares the batch's identity map
+            return context.copy().run(run_subrequest, request, spec)
+        finally:
+            connections.close_all()
+
+    workers = min(len(specs), settings.BATCH_MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        return list(executor.map(run, specs))
+
+
+def encode_response(response):
+    """Return the JSON of one sub-response, embedding its body as is."""
+    headers = {name: response[name] for name in RESPONSE_HEADERS if response.has_header(name)}
+    meta = FastJSONRenderer().render({'status': response.status_code, 'headers': headers})
+
+    content = response.content
+    if not content:
+        body = b'null'
+    elif 'json' in response.get('Content-Type', ''):
+        body = content
+    else:
+        body = FastJSONRenderer().render(content.decode(response.charset, 'replace'))
+    return meta[:-1] + b',"body":' + body + b'}'
+
+
+class BatchView(APIView):
+    """
+    API endpoint for running several API requests in one round trip.
+    """
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        specs = serializer.validated_data['requests']
+
+        with identity.identity_map():
+            if serializer.validated_data['parallel'] and all(
+                spec['method'] in SAFE_METHODS for spec in specs
+            ):
+                responses = run_concurrently(request, specs)
+            else:
+                responses = [run_subrequest(request, spec) for spec in specs]
+
+        content = b'{"responses":[' + b','.join(encode_response(r) for r in responses) + b']}'
+        return HttpResponse(content, content_type='application/json')
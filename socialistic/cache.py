@@ -0,0 +1,421 @@
+"""
+Two-tier cache backend: a bounded in-process LRU in front of a shared cache.
+
+Reads are served from the process-local tier when possible and fall back to
+the shared cache (Redis). Writes go to both tiers and are broadcast so that
+other processes drop their local copies. If the shared cache is unreachable
+the backend keeps working with the local tier only and retries the shared
+cache after ``RETRY_AFTER`` seconds. Local copies of shared hits expire
+with the shared entry when the shared cache tells its TTL (django-redis
+does), and after ``LOCAL_TIMEOUT`` at most.
+
+Configuration::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'socialistic.cache.TwoTierCache',
+            'LOCATION': 'default',
+            'OPTIONS': {
+                'SHARED': 'shared',             # alias of the shared cache
+                'LOCAL_MAX_ENTRIES': 5000,
+                'LOCAL_TIMEOUT': 60,            # seconds
+                'RETRY_AFTER': 30,              # seconds
+                'INVALIDATION': 'socialistic.cache.RedisInvalidation',
+            },
+        },
+        'shared': {'BACKEND': 'django_redis.cache.RedisCache', ...},
+    }
+
+``LocalInvalidation`` broadcasts within the process only, standing in for
+Redis pub/sub in tests and single-process setups.
+"""
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict, defaultdict
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.utils.module_loading import import_string
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover
+    RedisError = OSError
+
+try:
+    from django_redis.cache import RedisCache
+    from django_redis.exceptions import ConnectionInterrupted
+except ImportError:  # pragma: no cover
+    RedisCache = None
+    ConnectionInterrupted = OSError
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning the shared cache is unavailable, rather than a bug
+SHARED_CACHE_ERRORS = (ConnectionInterrupted, RedisError, OSError)
+
+# Stands for a missing value, since None can be cached
+MISSING = object()
+
+
+class LocalStore:
+    """
+    Thread-safe LRU of pickled values with a per-entry expiry time.
+
+    Values are pickled like LocMemCache does, so callers can't mutate the
+    cached copy.
+    """
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.shared_down_until = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        if timeout <= 0:
+            self.delete_many([key])
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, pickled)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def invalidate(self, keys):
+        """Apply an invalidation message: a list of keys, or None for all."""
+        if keys is None:
+            self.clear()
+        else:
+            self.delete_many(keys)
+
+
+class LocalInvalidation:
+    """Broadcasts invalidations to the other local stores of this process."""
+
+    _subscribers = defaultdict(weakref.WeakSet)
+
+    def __init__(self, options):
+        self.channel = options.get('CHANNEL', 'cache-invalidation')
+
+    def subscribe(self, store):
+        self._subscribers[self.channel].add(store)
+
+    def publish(self, store, keys):
+        for subscriber in list(self._subscribers[self.channel]):
+            if subscriber is not store:
+                subscriber.invalidate(keys)
+
+
+class RedisInvalidation:
+    """
+    Broadcasts invalidations to other processes over Redis pub/sub.
+
+    Each process listens on a daemon thread. Whenever it (re)subscribes,
+    for instance after Redis was unreachable, the local store is cleared
+    since messages may have been missed.
+    """
+
+    def __init__(self, options):
+        self.channel = options.get('CHANNEL', 'cache-invalidation')
+        self.alias = options.get('SHARED', 'shared')
+        self.retry_after = options.get('RETRY_AFTER', 30)
+        self.sender = f'{os.getpid()}:{uuid.uuid4().hex}'
+
+    def get_client(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection(self.alias)
+
+    def subscribe(self, store):
+        thread = threading.Thread(
+            target=self._listen, args=(weakref.ref(store),),
+            name='cache-invalidation', daemon=True
+        )
+        thread.start()
+
+    def _listen(self, store_ref):
+        while store_ref() is not None:
+            try:
+                pubsub = self.get_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                store_ref().clear()
+                for message in pubsub.listen():
+                    sender, keys = json.loads(message['data'])
+                    store = store_ref()
+                    if store is None:
+                        return
+                    if sender != self.sender:
+                        store.invalidate(keys)
+            except SHARED_CACHE_ERRORS:
+                logger.warning('Cache invalidation channel unavailable, retrying', exc_info=True)
+                time.sleep(self.retry_after)
+
+    def publish(self, store, keys):
+        self.get_client().publish(self.channel, json.dumps([self.sender, keys]))
+
+
+# Local stores are per process and shared by the per-thread cache instances
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class TwoTierCache(BaseCache):
+    """Cache backend with an in-process LRU in front of a shared cache."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED', 'shared')
+        self.retry_after = options.get('RETRY_AFTER', 30)
+
+        with _stores_lock:
+            if location not in _stores:
+                store = LocalStore(
+                    options.get('LOCAL_MAX_ENTRIES', 5000),
+                    options.get('LOCAL_TIMEOUT', 60)
+                )
+                invalidation_class = import_string(
+                    options.get('INVALIDATION', 'socialistic.cache.LocalInvalidation')
+                )
+                store.invalidation = invalidation_class(options)
+                store.invalidation.subscribe(store)
+                _stores[location] = store
+            self.store = _stores[location]
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _call_shared(self, method, *args, default=None, **kwargs):
+        """
+        Call the shared cache's ``method``, or ``method`` itself if it isn't
+        a name, returning ``default`` while the shared cache is unavailable.
+        """
+        if self.store.shared_down_until > time.monotonic():
+            return default
+        try:
+            if isinstance(method, str):
+                method = getattr(self.shared, method)
+            return method(*args, **kwargs)
+        except SHARED_CACHE_ERRORS:
+            logger.warning(
+                'Shared cache unavailable, using the local cache only for %ss',
+                self.retry_after, exc_info=True
+            )
+            self.store.shared_down_until = time.monotonic() + self.retry_after
+            return default
+
+    def _broadcast(self, keys):
+        if self.store.shared_down_until > time.monotonic():
+            return
+        try:
+            self.store.invalidation.publish(self.store, keys)
+        except SHARED_CACHE_ERRORS:
+            logger.warning('Could not broadcast cache invalidation', exc_info=True)
+            self.store.shared_down_until = time.monotonic() + self.retry_after
+
+    def _version(self, version):
+        return self.version if version is None else version
+
+    def _local_timeout(self, timeout):
+        """
+        Return the seconds an entry set with ``timeout`` lives locally. The
+        local store caps it at LOCAL_TIMEOUT, including None (never expire),
+        and drops entries whose timeout is 0 or less.
+        """
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _shared_ttls(self, keys, version):
+        """
+        Return the seconds ``keys`` have left in the shared cache, None for
+        those that never expire, so that their local copies don't outlive
+        them. Empty if the shared cache doesn't tell.
+        """
+        shared = self.shared
+        if RedisCache is not None and isinstance(shared, RedisCache):
+            # One round trip for all keys, rather than one ttl() call each
+            pipeline = shared.client.get_client(write=False).pipeline(transaction=False)
+            for key in keys:
+                pipeline.pttl(shared.client.make_key(key, version=version))
+            # PTTL is -1 for keys that never expire and -2 for missing ones
+            return {
+                key: None if ttl == -1 else max(ttl, 0) / 1000
+                for key, ttl in zip(keys, pipeline.execute())
+            }
+        if hasattr(shared, 'ttl'):
+            return {key: shared.ttl(key, version=version) for key in keys}
+        return {}
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self.store.get(local_key)
+        if value is MISSING:
+            version = self._version(version)
+            value = self._call_shared('get', key, MISSING, version=version, default=MISSING)
+            if value is MISSING:
+                return default
+            ttls = self._call_shared(self._shared_ttls, [key], version, default={})
+            self.store.set(local_key, value, ttls.get(key))
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = {}
+        for key in keys:
+            local_key = self.make_and_validate_key(key, version=version)
+            value = self.store.get(local_key)
+            if value is MISSING:
+                missing[key] = local_key
+            else:
+                found[key] = value
+
+        if missing:
+            version = self._version(version)
+            shared = self._call_shared('get_many', list(missing), version=version, default={})
+            ttls = self._call_shared(self._shared_ttls, list(shared), version, default={}) if shared else {}
+            for key, value in shared.items():
+                self.store.set(missing[key], value, ttls.get(key))
+                found[key] = value
+        return found
+
+    # The async variants serve local hits on the event loop and run the
+    # rest in a worker thread. The shared cache's client is thread-safe, so
+    # they don't queue behind the request's thread-sensitive sync calls.
+
+    async def aget(self, key, default=None, version=None):
+        value = self.store.get(self.make_and_validate_key(key, version=version))
+        if value is not MISSING:
+            return value
+        return await sync_to_async(self.get, thread_sensitive=False)(key, default, version)
+
+    async def aget_many(self, keys, version=None):
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.store.get(self.make_and_validate_key(key, version=version))
+            if value is MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+
+        if missing:
+            found.update(await sync_to_async(self.get_many, thread_sensitive=False)(missing, version))
+        return found
+
+    async def aset_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        return await sync_to_async(self.set_many, thread_sensitive=False)(data, timeout, version)
+
+    async def aadd(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return await sync_to_async(self.add, thread_sensitive=False)(key, value, timeout, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self._call_shared('set', key, value, timeout, version=self._version(version))
+        self.store.set(local_key, value, self._local_timeout(timeout))
+        self._broadcast([local_key])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        local_keys = []
+        local_timeout = self._local_timeout(timeout)
+        for key, value in data.items():
+            local_key = self.make_and_validate_key(key, version=version)
+            self.store.set(local_key, value, local_timeout)
+            local_keys.append(local_key)
+        self._call_shared('set_many', data, timeout, version=self._version(version))
+        self._broadcast(local_keys)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        if self.store.shared_down_until > time.monotonic():
+            added = self.store.get(local_key) is MISSING
+        else:
+            added = self._call_shared('add', key, value, timeout, version=self._version(version), default=MISSING)
+            if added is MISSING:
+                # The shared cache just went down
+                added = self.store.get(local_key) is MISSING
+        if added:
+            self.store.set(local_key, value, self._local_timeout(timeout))
+            self._broadcast([local_key])
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self.store.get(local_key)
+        if value is not MISSING:
+            self.store.set(local_key, value, self._local_timeout(timeout))
+        touched = self._call_shared('touch', key, timeout, version=self._version(version), default=False)
+        return touched or value is not MISSING
+
+    def delete(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self.store.delete_many([local_key])
+        deleted = self._call_shared('delete', key, version=self._version(version), default=False)
+        self._broadcast([local_key])
+        return bool(deleted)
+
+    def delete_many(self, keys, version=None):
+        local_keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        self.store.delete_many(local_keys)
+        self._call_shared('delete_many', list(keys), version=self._version(version))
+        self._broadcast(local_keys)
+
+    def has_key(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        if self.store.get(local_key) is not MISSING:
+            return True
+        return bool(self._call_shared('has_key', key, version=self._version(version), default=False))
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        if self.store.shared_down_until > time.monotonic():
+            value = self.store.get(local_key)
+            if value is MISSING:
+                raise ValueError("Key '%s' not found" % key)
+            value += delta
+        else:
+            value = self._call_shared('incr', key, delta, version=self._version(version), default=MISSING)
+            if value is MISSING:
+                return self.incr(key, delta, version)
+        self.store.set(local_key, value)
+        self._broadcast([local_key])
+        return value
+
+    def clear(self):
+        self.store.clear()
+        self._call_shared('clear')
+        self._broadcast(None)
+
+    def close(self, **kwargs):
+        self._call_shared('close', **kwargs)
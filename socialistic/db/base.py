@@ -0,0 +1,151 @@
+"""
+SQLite backend tuned for a web server's concurrent requests.
+
+On top of Django's SQLite backend, every connection gets
+
+* WAL journaling, so reads don't block on the writer and vice versa, with
+  ``synchronous=NORMAL``, which stays durable across crashes of the app;
+* a busy timeout, larger page cache, memory-mapped I/O and in-memory
+  temporary tables (see ``PRAGMAS``);
+* write transactions started with ``BEGIN IMMEDIATE``. A deferred
+  transaction that reads before it writes fails with "database is locked"
+  when another connection wrote meanwhile, whatever the busy timeout.
+
+``atomic()`` blocks of the connections of one process then wait their turn
+in a FIFO ``WriteQueue`` rather than polling SQLite's lock in the busy
+handler, which favours whoever retries at the right moment.
+
+Keep connections open across requests with ``CONN_MAX_AGE``. OPTIONS take
+``pragmas`` (merged into ``PRAGMAS``), ``transaction_mode`` and
+``write_queue`` besides the arguments of ``sqlite3.connect()``::
+
+    'default': {
+        'ENGINE': 'socialistic.db',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {'timeout': 20, 'pragmas': {'mmap_size': 0}},
+    }
+"""
+import threading
+from collections import deque
+
+from django.db.backends.sqlite3 import base
+from django.db.utils import OperationalError
+
+# Seconds a connection waits for the write lock before "database is locked"
+DEFAULT_TIMEOUT = 20
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,       # KiB
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+class WriteQueue:
+    """A lock handed to the threads waiting for it in arrival order."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locked = False
+        self._waiters = deque()
+
+    def acquire(self, timeout=None):
+        """Wait up to ``timeout`` seconds for the lock; return whether it was acquired."""
+        with self._lock:
+            if not self._locked:
+                self._locked = True
+                return True
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+
+        if waiter.wait(timeout):
+            return True
+        with self._lock:
+            # The lock may have been handed over as the wait timed out
+            if waiter.is_set():
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._locked = False
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(name):
+    """Return the process's write queue for the database file ``name``."""
+    with _queues_lock:
+        return _queues.setdefault(str(name), WriteQueue())
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, settings_dict, *args, **kwargs):
+        super().__init__(settings_dict, *args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = {**PRAGMAS, **options.get('pragmas', {})}
+        self.transaction_mode = options.get('transaction_mode', 'IMMEDIATE')
+        self.timeout = options.get('timeout', DEFAULT_TIMEOUT)
+        self.use_write_queue = options.get('write_queue', True)
+        self.write_queue = None
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        for name in ('pragmas', 'transaction_mode', 'write_queue'):
+            kwargs.pop(name, None)
+        kwargs['timeout'] = self.timeout
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        conn.execute(f'PRAGMA busy_timeout = {int(self.timeout * 1000)}')
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        # Tests run on in-memory databases inside a transaction per test,
+        # which would hold the queue for the whole test
+        if self.use_write_queue and self.write_queue is None and not self.is_in_memory_db():
+            queue = get_write_queue(self.settings_dict['NAME'])
+            if not queue.acquire(self.timeout):
+                raise OperationalError('database is locked')
+            self.write_queue = queue
+        try:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        except Exception:
+            self._release_write_queue()
+            raise
+
+    def _release_write_queue(self):
+        if self.write_queue is not None:
+            self.write_queue.release()
+            self.write_queue = None
+
+    def _commit(self):
+        # A failed commit is rolled back, which releases the queue
+        result = super()._commit()
+        self._release_write_queue()
+        return result
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._release_write_queue()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self._release_write_queue()
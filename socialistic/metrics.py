@@ -0,0 +1,236 @@
+"""
+Per-request SQL and latency instrumentation.
+
+For a sample of requests (``REQUEST_METRICS_SAMPLE_RATE``, from 0 to 1),
+``RequestMetricsMiddleware`` records the request's duration, its number
+of SQL queries and their time, how many queries repeated the SQL of an
+earlier one (the signature of N+1 queries), and the time spent
+serializing and rendering. Sampled responses carry the timings in a
+``Server-Timing`` header. Each process also aggregates them by URL name
+into histograms, served in the Prometheus text format at ``/metrics`` to
+the addresses in ``METRICS_ALLOWED_IPS``.
+
+Serializers, row encoders and the JSON renderer mark their work with
+``timed()``. With sampling off, the middleware calls the view directly and
+``timed()`` only checks a context variable.
+"""
+import random
+import threading
+import time
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+# The metrics of the current request, if it's sampled
+_current = ContextVar('request_metrics', default=None)
+# Sections timed by the enclosing timed() blocks
+_active = ContextVar('timed_sections', default=frozenset())
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class RequestMetrics:
+    """What one request spent, filled in while it runs."""
+
+    def __init__(self):
+        self.queries = 0
+        self.duplicates = 0
+        self.sql_time = 0.0
+        self.sections = {'serialize': 0.0, 'render': 0.0}
+        self._statements = set()
+        self._lock = threading.Lock()
+
+    def add_query(self, sql, duration):
+        # Batch sub-requests may run queries on several threads
+        with self._lock:
+            self.queries += 1
+            self.sql_time += duration
+            if sql in self._statements:
+                self.duplicates += 1
+            else:
+                self._statements.add(sql)
+
+    def add_time(self, section, duration):
+        with self._lock:
+            self.sections[section] += duration
+
+
+class timed(ContextDecorator):
+    """
+    Count the time spent in a block or function towards ``section`` of the
+    current request. Nested blocks of the same section count once.
+    """
+
+    def __init__(self, section):
+        self.section = section
+
+    def __enter__(self):
+        metrics = _current.get()
+        active = _active.get()
+        if metrics is None or self.section in active:
+            self.token = None
+            return self
+        self.token = _active.set(active | {self.section})
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.token is not None:
+            _current.get().add_time(self.section, time.perf_counter() - self.start)
+            _active.reset(self.token)
+        return False
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries of sampled requests."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - start)
+
+
+def instrument(connection):
+    if record_query not in connection.execute_wrappers:
+        # First, so execute_wrapper() blocks pop their own wrapper
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument(connection)
+
+
+class Histogram:
+    """A Prometheus histogram with one series per label value."""
+
+    def __init__(self, name, help, buckets, label='view'):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.label = label
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        with self._lock:
+            counts, total = self.series.get(label, ([0] * (len(self.buckets) + 1), 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self.series[label] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted(self.series.items())
+        for label, (counts, total) in series:
+            label = label.replace('\\', '\\\\').replace('"', '\\"')
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                lines.append(f'{self.name}_bucket{{{self.label}="{label}",le="{bound}"}} {count}')
+            lines.append(f'{self.name}_sum{{{self.label}="{label}"}} {total}')
+            lines.append(f'{self.name}_count{{{self.label}="{label}"}} {counts[-1]}')
+        return '\n'.join(lines)
+
+
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Time to respond to a request.', DURATION_BUCKETS
+)
+sql_queries = Histogram('http_request_sql_queries', 'SQL queries per request.', COUNT_BUCKETS)
+sql_duration = Histogram(
+    'http_request_sql_duration_seconds', 'Time spent in SQL queries per request.', DURATION_BUCKETS
+)
+duplicate_queries = Histogram(
+    'http_request_duplicate_queries', 'Queries repeating the SQL of an earlier query.', COUNT_BUCKETS
+)
+serialize_duration = Histogram(
+    'http_request_serialize_duration_seconds', 'Time spent serializing per request.', DURATION_BUCKETS
+)
+render_duration = Histogram(
+    'http_request_render_duration_seconds', 'Time spent rendering per request.', DURATION_BUCKETS
+)
+HISTOGRAMS = (
+    request_duration, sql_queries, sql_duration, duplicate_queries, serialize_duration, render_duration
+)
+
+
+class RequestMetricsMiddleware:
+    """Records the metrics of a sample of requests."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        if settings.REQUEST_METRICS_SAMPLE_RATE:
+            connection_created.connect(instrument_new_connection)
+
+    def start(self, request):
+        rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        if not rate or (rate < 1 and random.random() >= rate):
+            return None
+        for connection in connections.all(initialized_only=True):
+            instrument(connection)
+        return _current.set(RequestMetrics()), time.perf_counter()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = self.start(request)
+        if started is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics = _current.get()
+            _current.reset(started[0])
+        return self.finish(request, response, metrics, started[1])
+
+    async def __acall__(self, request):
+        started = self.start(request)
+        if started is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics = _current.get()
+            _current.reset(started[0])
+        return self.finish(request, response, metrics, started[1])
+
+    def finish(self, request, response, metrics, start):
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        view = (match.view_name or match._func_path) if match is not None else 'unresolved'
+        request_duration.observe(view, duration)
+        sql_queries.observe(view, metrics.queries)
+        sql_duration.observe(view, metrics.sql_time)
+        duplicate_queries.observe(view, metrics.duplicates)
+        serialize_duration.observe(view, metrics.sections['serialize'])
+        render_duration.observe(view, metrics.sections['render'])
+
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={metrics.sql_time * 1000:.1f};'
+            f'desc="{metrics.queries} queries ({metrics.duplicates} repeated)"',
+            f'serialize;dur={metrics.sections["serialize"] * 1000:.1f}',
+            f'render;dur={metrics.sections["render"] * 1000:.1f}',
+            f'total;dur={duration * 1000:.1f};desc="{view}"',
+        ])
+        return response
+
+
+def metrics_view(request):
+    """Serve the histograms of this process to the allowed addresses."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    content = '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+    return HttpResponse(content, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,198 @@
+"""
+N+1 query detection for development, staging and tests.
+
+With ``NPLUSONE_DETECTION`` set to ``'log'`` or ``'raise'``,
+``NPlusOneMiddleware`` watches the queries of each request. A query shape
+(its SQL with literals and the length of ``IN`` lists normalised away) run
+with ``NPLUSONE_THRESHOLD`` or more different parameters from the same
+place in the code is reported; repeating the very same query is a caching
+problem rather than N+1. The place is the serializer field being rendered when it ran,
+such as ``PostSerializer.is_liked``, and the innermost frame of project
+code. ``'log'`` logs a warning per shape; ``'raise'`` fails the request
+with ``NPlusOneError``.
+
+``detect_nplusone()`` does the same for a block of code outside requests.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.fields import Field
+from socialistic import metrics
+
+logger = logging.getLogger(__name__)
+
+_tracker = ContextVar('nplusone_tracker', default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+
+# Frames of these directories are never blamed
+_LIBRARY_DIRS = tuple(
+    os.path.dirname(path) + os.sep for path in (
+        os.__file__,
+        sys.modules['django'].__file__,
+        sys.modules['rest_framework'].__file__,
+    )
+)
+# Execute wrappers, which run inside every query
+_WRAPPER_FILES = {__file__, metrics.__file__}
+
+
+class NPlusOneError(Exception):
+    """Raised when a request runs the same query shape repeatedly."""
+
+
+def query_shape(sql):
+    """Return ``sql`` with the parts that vary between rows normalised."""
+    return _IN_LISTS.sub('(%s...)', _LITERALS.sub('?', sql))
+
+
+def is_project_frame(frame):
+    filename = frame.f_code.co_filename
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and not filename.startswith(_LIBRARY_DIRS)
+        and 'site-packages' not in filename
+        and filename not in _WRAPPER_FILES
+    )
+
+
+def find_origin(frame):
+    """Return the serializer field and project frame that ran a query."""
+    field = location = None
+    while frame is not None and (field is None or location is None):
+        owner = frame.f_locals.get('self')
+        if (
+            field is None
+            and isinstance(owner, Field)
+            and owner.field_name
+            and owner.parent is not None
+        ):
+            field = f'{type(owner.parent).__name__}.{owner.field_name}'
+        if location is None and is_project_frame(frame):
+            filename = os.path.relpath(frame.f_code.co_filename, settings.BASE_DIR)
+            location = f'{filename}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return field, location
+
+
+class QueryTracker:
+    """Counts the query shapes run from each place during a request."""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.params = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def add(self, sql, params, frame):
+        if sql.lstrip()[:6].upper() != 'SELECT':
+            return
+        key = (query_shape(sql), *find_origin(frame))
+        with self._lock:
+            self.params[key].add(repr(params))
+
+    def problems(self):
+        """Return (count, shape, field, location) for each repeated shape."""
+        problems = [
+            (len(params), shape, field, location)
+            for (shape, field, location), params in self.params.items()
+            if len(params) >= self.threshold
+        ]
+        return sorted(problems, key=lambda problem: -problem[0])
+
+    def report(self, label, mode):
+        problems = self.problems()
+        if not problems:
+            return
+        lines = [f'N+1 queries in {label}:'] + [
+            f'  {count}x {shape}\n'
+            f'     from {field or "no serializer field"} at {location or "unknown location"}'
+            for count, shape, field, location in problems
+        ]
+        message = '\n'.join(lines)
+        if mode == 'raise':
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+def track_query(execute, sql, params, many, context):
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.add(sql, params, sys._getframe(1))
+    return execute(sql, params, many, context)
+
+
+def instrument(connection):
+    if track_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, track_query)
+
+
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument(connection)
+
+
+def start_tracking(threshold=None):
+    connection_created.connect(instrument_new_connection)
+    for connection in connections.all(initialized_only=True):
+        instrument(connection)
+    tracker = QueryTracker(threshold or settings.NPLUSONE_THRESHOLD)
+    return tracker, _tracker.set(tracker)
+
+
+class detect_nplusone:
+    """
+    Report the N+1 queries run inside a block, raising ``NPlusOneError``
+    by default.
+    """
+
+    def __init__(self, mode='raise', threshold=None, label='block'):
+        self.mode = mode
+        self.threshold = threshold
+        self.label = label
+
+    def __enter__(self):
+        self.tracker, self.token = start_tracking(self.threshold)
+        return self.tracker
+
+    def __exit__(self, exc_type, *exc_info):
+        _tracker.reset(self.token)
+        if exc_type is None:
+            self.tracker.report(self.label, self.mode)
+        return False
+
+
+class NPlusOneMiddleware:
+    """Reports the N+1 queries of each request."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.NPLUSONE_DETECTION:
+            return self.get_response(request)
+        with detect_nplusone(settings.NPLUSONE_DETECTION, label=self.label(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not settings.NPLUSONE_DETECTION:
+            return await self.get_response(request)
+        with detect_nplusone(settings.NPLUSONE_DETECTION, label=self.label(request)):
+            return await self.get_response(request)
+
+    def label(self, request):
+        return f'{request.method} {request.path}'
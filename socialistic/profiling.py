@@ -0,0 +1,246 @@
+"""
+On-demand profiling of single requests, for staff.
+
+A request from a staff user carrying ``?profile=<mode>`` or an
+``X-Profile: <mode>`` header runs under a profiler:
+
+- ``cprofile``: deterministic, saved as ``<id>.prof`` for ``pstats``,
+  snakeviz or gprof2dot.
+- ``sample``: samples the thread's stack every ``PROFILING_SAMPLE_INTERVAL``
+  seconds, saved as ``<id>.collapsed`` for flamegraph.pl or speedscope.
+
+Each distinct SELECT the request issued is saved to ``<id>.sql.txt`` with
+how often it ran, its time and the database's query plan (``EXPLAIN QUERY
+PLAN`` on SQLite). Profiles go to ``PROFILING_DIR``; the response names
+the profile in an ``X-Profile-Id`` header, and staff download the files
+from ``/api/profiles/<file>``.
+
+Under ASGI the request is run from a ``sync_to_async`` thread, which then
+also runs the sync views, middleware and ORM calls of the request, and
+that thread is profiled. Code running on the event loop itself, like the
+async views' own frames, isn't.
+"""
+import cProfile
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, NotSupportedError, connections
+from django.db.backends.signals import connection_created
+from django.http import FileResponse, Http404
+from rest_framework import permissions
+from rest_framework.exceptions import APIException
+from rest_framework.views import APIView
+from users.authentication import JWTAuthentication
+
+MODES = ('cprofile', 'sample')
+PROFILE_FILE = re.compile(r'^[\w-]+\.(prof|collapsed|sql\.txt)$')
+
+# The queries of the request being profiled
+_queries = ContextVar('profiled_queries', default=None)
+
+
+class QueryLog:
+    """The distinct queries of a request, with their parameters and timings."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.durations = defaultdict(float)
+        self.params = {}
+
+    def add(self, alias, sql, params, duration):
+        key = (alias, sql)
+        self.counts[key] += 1
+        self.durations[key] += duration
+        self.params.setdefault(key, params)
+
+    def explain(self):
+        """Return the report of the queries, each with its query plan."""
+        lines = []
+        for (alias, sql), count in self.counts.most_common():
+            lines.append(
+                f'-- {count}x, {self.durations[alias, sql] * 1000:.2f} ms total, on {alias}\n{sql}'
+            )
+            if sql.lstrip()[:6].upper() == 'SELECT':
+                lines.extend(f'   {step}' for step in explain(alias, sql, self.params[alias, sql]))
+            lines.append('')
+        return '\n'.join(lines)
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    try:
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return [str(row[-1]) for row in cursor.fetchall()]
+    except (NotSupportedError, DatabaseError) as e:
+        return [f'(no plan: {e})']
+
+
+def log_query(execute, sql, params, many, context):
+    queries = _queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.add(context['connection'].alias, sql, params, time.perf_counter() - start)
+
+
+def instrument(connection):
+    if log_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_query)
+
+
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument(connection)
+
+
+class CProfiler:
+    extension = 'prof'
+
+    def start(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+
+class Sampler:
+    """Samples the stack of one thread from another thread."""
+    extension = 'collapsed'
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.running = threading.Event()
+        self.running.set()
+        self.thread = threading.Thread(target=self.run, name='profiling-sampler', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def stop(self):
+        self.running.clear()
+        self.thread.join()
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+def get_mode(request):
+    mode = request.GET.get('profile') or request.META.get('HTTP_X_PROFILE')
+    return mode if mode in MODES else None
+
+
+def is_staff(request):
+    """Whether the session or bearer token of ``request`` is a staff user's."""
+    if request.user.is_staff:
+        return True
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return authenticated is not None and authenticated[0].is_staff
+
+
+class ProfilingMiddleware:
+    """Profiles the requests of staff users who ask for it."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def start(self, mode):
+        connection_created.connect(instrument_new_connection)
+        for connection in connections.all(initialized_only=True):
+            instrument(connection)
+        if mode == 'sample':
+            profiler = Sampler(settings.PROFILING_SAMPLE_INTERVAL)
+        else:
+            profiler = CProfiler()
+        profiler.start()
+        return profiler, _queries.set(QueryLog())
+
+    def save(self, profiler, queries):
+        profile_id = f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}'
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        profiler.save(directory / f'{profile_id}.{profiler.extension}')
+        (directory / f'{profile_id}.sql.txt').write_text(queries.explain())
+        return profile_id
+
+    def profile(self, mode, get_response, request):
+        """Run ``get_response`` under the profiler, in this thread."""
+        profiler, token = self.start(mode)
+        try:
+            response = get_response(request)
+        finally:
+            profiler.stop()
+            queries = _queries.get()
+            _queries.reset(token)
+        response['X-Profile-Id'] = self.save(profiler, queries)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode = get_mode(request)
+        if mode is None or not is_staff(request):
+            return self.get_response(request)
+        return self.profile(mode, self.get_response, request)
+
+    async def __acall__(self, request):
+        mode = get_mode(request)
+        if mode is None or not await sync_to_async(is_staff)(request):
+            return await self.get_response(request)
+
+        # The thread-sensitive sync code that async_to_sync() reaches, sync
+        # views and database access included, runs in this same thread
+        return await sync_to_async(self.profile)(mode, async_to_sync(self.get_response), request)
+
+
+class ProfileFileView(APIView):
+    """
+    API endpoint for downloading the files of a request profile.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, filename):
+        if not PROFILE_FILE.match(filename):
+            raise Http404
+        path = Path(settings.PROFILING_DIR) / filename
+        if not path.is_file():
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
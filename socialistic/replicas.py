@@ -0,0 +1,217 @@
+"""
+Read replicas: routes the queries of read requests away from the primary.
+
+``ReplicaMiddleware`` picks one of ``settings.DATABASE_REPLICAS`` for each
+GET or HEAD request and ``ReplicaRouter`` sends that request's reads to it.
+Write requests, code outside requests and anything inside a transaction
+use the primary. So clients read their own writes, a client that wrote
+reads from the primary for ``REPLICA_STICKY_SECONDS`` afterwards; clients
+are told apart by the user id claimed by their token or by their session
+cookie.
+
+With ``SQLITE_REPLICAS=n`` the replicas are SQLite copies of the database,
+refreshed every ``REPLICA_SYNC_INTERVAL`` seconds by ``SQLiteReplicaCopier``
+for trying out replica lag locally.
+"""
+import base64
+import hashlib
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Apps whose rows must never be read stale
+PRIMARY_APPS = {'sessions', 'token_blacklist'}
+
+# The replica the current request reads from, if any
+_read_db = ContextVar('read_db', default=None)
+
+
+class ReplicaRouter:
+    """Sends reads to the replica chosen for the current request."""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_db.get()
+        if (
+            alias is None
+            or model._meta.app_label in PRIMARY_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema from the primary
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def pin_key(client):
+    return f'replica:pin:{client}'
+
+
+def get_token_user_id(request):
+    """
+    Return the user id claimed by the request's bearer token, unverified.
+    It only picks the database; authentication checks the token.
+    """
+    header = request.META.get(settings.SIMPLE_JWT.get('AUTH_HEADER_NAME', 'HTTP_AUTHORIZATION'), '')
+    parts = header.split()
+    if len(parts) != 2:
+        return None
+    try:
+        payload = parts[1].split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return claims.get(settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id'))
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+def get_clients(request):
+    """Return the keys identifying the client that sent ``request``."""
+    clients = []
+    user_id = get_token_user_id(request)
+    if user_id is not None:
+        clients.append(f'user:{user_id}')
+    session = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session:
+        clients.append('session:' + hashlib.md5(session.encode()).hexdigest())
+    return clients
+
+
+def get_writers(request, response):
+    """Return the client keys to pin after ``request``, if it wrote."""
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return []
+    clients = get_clients(request)
+    # The user DRF authenticated, without loading a session user
+    user = request.__dict__.get('user')
+    if user is not None and not isinstance(user, SimpleLazyObject) and user.is_authenticated:
+        clients.append(f'user:{user.pk}')
+    return clients
+
+
+class ReplicaMiddleware:
+    """Chooses the database the queries of each request read from."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        start_sqlite_copier()
+
+    def choose(self, request, pinned):
+        if request.method not in SAFE_METHODS or pinned:
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        clients = get_clients(request) if request.method in SAFE_METHODS else []
+        pinned = any(cache.get_many([pin_key(client) for client in clients]).values())
+        token = _read_db.set(self.choose(request, pinned))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_db.reset(token)
+
+        writers = get_writers(request, response)
+        if writers:
+            cache.set_many({pin_key(client): True for client in writers}, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        clients = get_clients(request) if request.method in SAFE_METHODS else []
+        pinned = any((await cache.aget_many([pin_key(client) for client in clients])).values())
+        token = _read_db.set(self.choose(request, pinned))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_db.reset(token)
+
+        writers = get_writers(request, response)
+        if writers:
+            await cache.aset_many({pin_key(client): True for client in writers}, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+
+class SQLiteReplicaCopier:
+    """Copies the primary SQLite database over its replicas periodically."""
+
+    def __init__(self, source, replicas, interval):
+        self.source = str(source)
+        self.replicas = [str(path) for path in replicas]
+        self.interval = interval
+
+    def sync(self):
+        """Copy the primary over every replica, each copy in one transaction."""
+        with closing(sqlite3.connect(self.source)) as source:
+            for path in self.replicas:
+                with closing(sqlite3.connect(path)) as replica:
+                    source.backup(replica)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sync()
+            except sqlite3.Error:
+                logger.warning('Could not copy the database to its replicas', exc_info=True)
+
+    def start(self):
+        self.sync()
+        thread = threading.Thread(target=self.run, name='sqlite-replica-copier', daemon=True)
+        thread.start()
+        return thread
+
+
+_copier = None
+_copier_lock = threading.Lock()
+
+
+def start_sqlite_copier():
+    """Start this process's copier if the replicas are SQLite copies."""
+    global _copier
+    if not settings.SQLITE_REPLICAS:
+        return
+    with _copier_lock:
+        if _copier is None:
+            _copier = SQLiteReplicaCopier(
+                settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'],
+                [settings.DATABASES[alias]['NAME'] for alias in settings.DATABASE_REPLICAS],
+                settings.REPLICA_SYNC_INTERVAL,
+            )
+            _copier.start()
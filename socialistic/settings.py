@@ -58,12 +58,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'socialistic.metrics.RequestMetricsMiddleware',  # First, so it times the whole request
+    'socialistic.nplusone.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware - should be placed before CommonMiddleware
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'socialistic.replicas.ReplicaMiddleware',
+    'socialistic.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -95,18 +99,59 @@ ASGI_APPLICATION = 'socialistic.asgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # SQLite with WAL and tuned pragmas; see socialistic/db/base.py
+        'ENGINE': 'socialistic.db',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '20')),
+        },
     }
 }
 
+# Read replicas (see socialistic/replicas.py). SQLITE_REPLICAS=n adds n
+# SQLite copies of the database, refreshed by a local copier.
+SQLITE_REPLICAS = int(os.getenv('SQLITE_REPLICAS', '0'))
+for n in range(1, SQLITE_REPLICAS + 1):
+    DATABASES[f'replica{n}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db.replica{n}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['socialistic.replicas.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+REPLICA_SYNC_INTERVAL = float(os.getenv('REPLICA_SYNC_INTERVAL', '1'))
+
+# Redis backs the shared cache and the channel layer. Without it, e.g. to
+# load test a local server, both are kept in process instead.
+USE_REDIS = os.getenv('USE_REDIS', 'True') == 'True'
+
 # Cache
 CACHES = {
+    # Per-process LRU in front of Redis; see socialistic/cache.py
     "default": {
+        "BACKEND": "socialistic.cache.TwoTierCache",
+        "LOCATION": "default",
+        "OPTIONS": {
+            "SHARED": "shared",
+            "LOCAL_MAX_ENTRIES": int(os.getenv('CACHE_LOCAL_MAX_ENTRIES', '5000')),
+            "LOCAL_TIMEOUT": int(os.getenv('CACHE_LOCAL_TIMEOUT', '60')),
+            "RETRY_AFTER": int(os.getenv('CACHE_RETRY_AFTER', '30')),
+            "INVALIDATION": (
+                "socialistic.cache.RedisInvalidation" if USE_REDIS
+                else "socialistic.cache.LocalInvalidation"
+            ),
+        }
+    },
+    "shared": {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "SOCKET_CONNECT_TIMEOUT": 1,
+            "SOCKET_TIMEOUT": 1,
         }
     }
 }
@@ -121,6 +166,10 @@ CHANNEL_LAYERS = {
     },
 }
 
+if not USE_REDIS:
+    CACHES['shared'] = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -148,16 +197,52 @@ AUTH_PASSWORD_VALIDATORS = [
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'users.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'ORDERING_PARAM': 'ordering',
+    # Token buckets of socialistic.throttling: per user, per endpoint scope,
+    # and for all writes of a user
+    'DEFAULT_THROTTLE_RATES': {
+        'likes': os.getenv('THROTTLE_RATE_LIKES', '120/min'),
+        'follows': os.getenv('THROTTLE_RATE_FOLLOWS', '60/min'),
+        'posts': os.getenv('THROTTLE_RATE_POSTS', '30/min'),
+        'collaboration': os.getenv('THROTTLE_RATE_COLLABORATION', '10/min'),
+        'writes': os.getenv('THROTTLE_RATE_WRITES', '300/min'),
+    },
 }
 
+# Where throttling buckets live: a cache alias, shared by all processes when
+# it is Redis, or 'local' for each process's memory
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'shared')
+
+# Batch API (/api/batch/)
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '20'))
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', '4'))
+
+# Request metrics: share of requests to instrument (0 to 1) and the
+# addresses allowed to read /metrics
+REQUEST_METRICS_SAMPLE_RATE = float(os.getenv('REQUEST_METRICS_SAMPLE_RATE', '0'))
+METRICS_ALLOWED_IPS = os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
+# N+1 query detection: '' (off), 'log' or 'raise', and how many runs of a
+# query shape from one place count as N+1
+NPLUSONE_DETECTION = os.getenv('NPLUSONE_DETECTION', '')
+NPLUSONE_THRESHOLD = int(os.getenv('NPLUSONE_THRESHOLD', '3'))
+
+# Staff request profiling (?profile=cprofile|sample): where profiles are
+# saved and how often the sampling profiler samples, in seconds
+PROFILING_DIR = Path(os.getenv('PROFILING_DIR', BASE_DIR / 'profiles'))
+PROFILING_SAMPLE_INTERVAL = float(os.getenv('PROFILING_SAMPLE_INTERVAL', '0.001'))
+
 # Simple JWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -172,8 +257,13 @@ SIMPLE_JWT = {
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    # Checks and revokes rotated tokens, see users/tokens.py
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.TokenRefreshSerializer',
 }
 
+# Revoked refresh tokens are purged once expired, this many rows per batch
+REVOKED_TOKENS_PURGE_BATCH_SIZE = int(os.getenv('REVOKED_TOKENS_PURGE_BATCH_SIZE', '1000'))
+
 # CORS settings - for development
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -223,3 +313,9 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'purge-revoked-tokens': {
+        'task': 'users.tasks.purge_revoked_tokens',
+        'schedule': timedelta(hours=1),
+    },
+}
@@ -0,0 +1,238 @@
+"""
+Token-bucket throttling of write endpoints.
+
+A throttled view names its ``throttle_scope``, and ``DEFAULT_THROTTLE_RATES``
+gives each scope a rate such as ``'60/min'``: a bucket of 60 tokens per
+user (per client address when anonymous), refilled at 60 a minute, so a
+client can burst up to the whole bucket and then goes at the rate. Every
+unsafe request takes a token from the bucket of its endpoint's scope and
+one from the user's ``writes`` bucket, shared by all write endpoints, or
+none at all if either is empty: the request is then answered 429 with a
+Retry-After of when it would be allowed. Reads aren't throttled. Views
+acting on several objects at once take a token per object instead, as
+returned by their ``get_throttle_cost()``.
+
+Buckets live in the shared cache when it is Redis, updated by a Lua script
+so concurrent requests of all processes take tokens atomically. Other
+caches have no atomic read-modify-write, so with them, with
+``THROTTLE_STORE = 'local'``, and while Redis is unreachable, each process
+keeps its own buckets.
+
+Responses of throttled views carry the ``RateLimit-Limit``,
+``RateLimit-Remaining``, ``RateLimit-Reset`` and ``RateLimit-Policy``
+headers of the IETF draft, for the bucket with the fewest tokens left.
+"""
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from socialistic.cache import SHARED_CACHE_ERRORS
+
+try:
+    from django_redis.cache import RedisCache
+    from django_redis import get_redis_connection
+except ImportError:  # pragma: no cover
+    RedisCache = None
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+# Seconds to keep buckets in process after Redis fails, before retrying it
+RETRY_AFTER = 30
+
+# Takes cost tokens from each bucket at KEYS, hashes of their tokens and
+# the time they were counted, if all have them. ARGV: now in seconds, the
+# cost, then the capacity and tokens per second of each bucket. Returns
+# whether tokens were taken and the tokens left in each bucket, as strings
+# since Redis truncates Lua numbers to integers.
+TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local capacities, rates, tokens = {}, {}, {}
+local taken = 1
+for i, key in ipairs(KEYS) do
+    capacities[i] = tonumber(ARGV[2 * i + 1])
+    rates[i] = tonumber(ARGV[2 * i + 2])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated')
+    local updated = tonumber(bucket[2]) or now
+    tokens[i] = math.min(capacities[i], (tonumber(bucket[1]) or capacities[i]) + math.max(0, now - updated) * rates[i])
+    if tokens[i] < cost then
+        taken = 0
+    end
+end
+local left = {}
+for i, key in ipairs(KEYS) do
+    tokens[i] = tokens[i] - taken * cost
+    redis.call('HSET', key, 'tokens', tostring(tokens[i]), 'updated', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil((capacities[i] - tokens[i]) / rates[i] * 1000) + 1000)
+    left[i] = tostring(tokens[i])
+end
+return {taken, left}
+"""
+
+
+def parse_rate(rate):
+    """Return the capacity and the refill per second of ``'<tokens>/<period>'``."""
+    tokens, period = rate.split('/')
+    return int(tokens), int(tokens) / PERIODS[period[0]]
+
+
+class LocalBuckets:
+    """Token buckets of this process."""
+
+    # Beyond this many buckets, full ones are dropped, as they would be
+    # recreated full anyway
+    MAX_BUCKETS = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets, cost=1):
+        """
+        Take ``cost`` tokens from each of ``buckets``, ``(key, capacity,
+        rate)`` triples, if all have them. Return whether tokens were taken
+        and the tokens left in each bucket.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens = []
+            for key, capacity, rate in buckets:
+                left, updated, _, _ = self._buckets.get(key, (capacity, now, capacity, rate))
+                tokens.append(min(capacity, left + (now - updated) * rate))
+            taken = all(left >= cost for left in tokens)
+            if taken:
+                tokens = [left - cost for left in tokens]
+            for (key, capacity, rate), left in zip(buckets, tokens):
+                self._buckets[key] = (left, now, capacity, rate)
+            if len(self._buckets) > self.MAX_BUCKETS:
+                self._buckets = {
+                    key: bucket for key, bucket in self._buckets.items()
+                    if bucket[0] + (now - bucket[1]) * bucket[3] < bucket[2]
+                }
+        return taken, tokens
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBuckets:
+    """Token buckets in a Redis cache, shared by all processes."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.script = None
+        self.down_until = 0
+
+    def take(self, buckets, cost=1):
+        if self.down_until > time.monotonic():
+            return local_buckets.take(buckets, cost)
+        cache = caches[self.alias]
+        args = [time.time(), cost]
+        for _, capacity, rate in buckets:
+            args += [capacity, rate]
+        try:
+            client = get_redis_connection(self.alias)
+            if self.script is None or self.script.registered_client is not client:
+                self.script = client.register_script(TAKE_SCRIPT)
+            taken, tokens = self.script(keys=[cache.make_key(key) for key, _, _ in buckets], args=args)
+        except SHARED_CACHE_ERRORS:
+            logger.warning(
+                'Throttle store unavailable, keeping buckets in process for %ss', RETRY_AFTER, exc_info=True
+            )
+            self.down_until = time.monotonic() + RETRY_AFTER
+            return local_buckets.take(buckets, cost)
+        return bool(taken), [float(left) for left in tokens]
+
+
+local_buckets = LocalBuckets()
+_redis_buckets = {}
+
+
+def get_buckets():
+    """Return the buckets of ``THROTTLE_STORE``."""
+    alias = settings.THROTTLE_STORE
+    if alias == 'local' or RedisCache is None or not isinstance(caches[alias], RedisCache):
+        return local_buckets
+    if alias not in _redis_buckets:
+        _redis_buckets[alias] = RedisBuckets(alias)
+    return _redis_buckets[alias]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttles unsafe requests by the bucket of the view's ``throttle_scope``
+    and the user's ``writes`` bucket, taking from both or neither.
+
+    A request takes as many tokens as the view's ``get_throttle_cost()``
+    returns, at most a whole bucket so that it can be allowed once full.
+    """
+    scopes = ('writes',)
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        scopes = [
+            scope for scope in (getattr(view, 'throttle_scope', None), *self.scopes)
+            if rates.get(scope)
+        ]
+        if not scopes:
+            return True
+
+        if request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        buckets = [(f'throttle:{scope}:{ident}', *parse_rate(rates[scope])) for scope in scopes]
+        cost = 1
+        if hasattr(view, 'get_throttle_cost'):
+            cost = min(view.get_throttle_cost(request), *(capacity for _, capacity, _ in buckets))
+        taken, tokens = get_buckets().take(buckets, cost)
+
+        # Refused requests wait for every bucket to refill to the cost
+        self.delay = 0 if taken else max(
+            (cost - left) / rate for (_, _, rate), left in zip(buckets, tokens) if left < cost
+        )
+        # The headers describe the bucket with the fewest tokens left
+        (_, capacity, rate), left = min(zip(buckets, tokens), key=lambda bucket: bucket[1])
+        view.rate_limit = {
+            'limit': capacity,
+            'remaining': math.floor(left),
+            'reset': math.ceil((capacity - left) / rate),
+            'policy': f'{capacity};w={round(capacity / rate)}',
+        }
+        return taken
+
+    def wait(self):
+        return self.delay
+
+
+class RateLimitedMixin:
+    """
+    Throttles the view's writes by its ``throttle_scope`` and the user's
+    write budget, and adds the rate limit headers to its responses.
+    """
+    throttle_classes = [TokenBucketThrottle]
+
+    def get_throttle_cost(self, request):
+        """Return the number of tokens the request takes from each bucket."""
+        return 1
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        limit = getattr(self, 'rate_limit', None)
+        if limit is not None:
+            response['RateLimit-Limit'] = limit['limit']
+            response['RateLimit-Remaining'] = limit['remaining']
+            response['RateLimit-Reset'] = limit['reset']
+            response['RateLimit-Policy'] = limit['policy']
+        return response
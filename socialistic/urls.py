@@ -22,6 +22,9 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from django.views.generic import RedirectView
+from socialistic.batch import BatchView
+from socialistic.metrics import metrics_view
+from socialistic.profiling import ProfileFileView
 
 # Swagger schema view
 schema_view = get_schema_view(
@@ -53,6 +56,10 @@ urlpatterns = [
     path('api/notifications/', include('notifications.urls')),
     path('api/search/', include('socialistic.urls_search')),
     path('api/programming-languages/', include('posts.urls_programming_languages')),
+    path('api/skills/', include('users.urls.skills')),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/profiles/<str:filename>', ProfileFileView.as_view(), name='profile-file'),
+    path('metrics', metrics_view, name='metrics'),
     
     # Frontend
     path('', RedirectView.as_view(url='/static/frontend/index.html'), name='home'),
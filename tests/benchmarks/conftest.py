@@ -0,0 +1,254 @@
+"""
+Microbenchmarks, in the style of pytest-benchmark.
+
+Run them with ``pytest tests/benchmarks --benchmarks``; without the flag they
+are skipped. Each benchmark runs against datasets generated by
+scripts/populate_db.py with ``--benchmark-sizes`` users (about 180 rows per
+user), built once per size for the session.
+
+A test receives the ``benchmark`` fixture and calls ``benchmark(function)``,
+or ``benchmark.pedantic(function, setup=...)`` to run ``setup`` untimed
+before every round. After a warm-up round, which also counts the queries of
+one call, rounds run until there were ``--benchmark-min-rounds`` of them and
+``--benchmark-max-time`` seconds passed.
+
+Every run is saved to ``.benchmarks/<machine>/<number>_<commit>.json`` and
+the terminal summary compares each median with the previous run on the same
+machine; ``--benchmark-compare-fail=PERCENT`` fails the run on slowdowns.
+"""
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from posts.models import Post
+from rest_framework.test import APIRequestFactory, force_authenticate
+from users.models import ProgrammingLanguage, Skill
+
+User = get_user_model()
+
+results_key = pytest.StashKey[list]()
+report_key = pytest.StashKey[tuple]()
+
+
+def load_populate_db():
+    spec = importlib.util.spec_from_file_location(
+        'populate_db', Path(settings.BASE_DIR) / 'scripts' / 'populate_db.py'
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_sizes(config):
+    return [int(size) for size in config.getoption('benchmark_sizes').split(',')]
+
+
+def pytest_generate_tests(metafunc):
+    if 'dataset' in metafunc.fixturenames:
+        metafunc.parametrize(
+            'dataset', get_sizes(metafunc.config), indirect=True, scope='session',
+            ids=lambda size: f'{size}users',
+        )
+
+
+def pytest_configure(config):
+    config.stash[results_key] = []
+
+
+class Dataset:
+    """A generated dataset, and the objects the benchmarks act as or on."""
+
+    def __init__(self, size):
+        self.size = size
+        # The most connected user sees the fullest feed
+        self.viewer = User.objects.annotate(
+            following_total=Count('following')
+        ).order_by('-following_total', 'id').first()
+        self.following_ids = list(self.viewer.following.values_list('following_id', flat=True))
+        self.search_term = Post.objects.order_by('id').values_list('content', flat=True)[0].split()[0]
+
+
+@pytest.fixture(scope='session')
+def dataset(request, django_db_setup, django_db_blocker):
+    """The dataset with ``request.param`` users, committed for the session."""
+    if not request.config.getoption('benchmarks'):
+        pytest.skip('Benchmarks run with --benchmarks')
+
+    populate_db = load_populate_db()
+    with django_db_blocker.unblock():
+        catalogs = set(Skill.objects.values_list('id', flat=True)), \
+            set(ProgrammingLanguage.objects.values_list('id', flat=True))
+        args = populate_db.get_parser().parse_args(['--users', str(request.param)])
+        populate_db.populate(args, log=lambda message: None)
+        yield Dataset(request.param)
+
+        # Deleting through the ORM would collect every row first
+        with connection.cursor() as cursor:
+            for model in reversed(populate_db.MODELS[1:]):
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+        User.objects.all().delete()
+        Skill.objects.exclude(id__in=catalogs[0]).delete()
+        ProgrammingLanguage.objects.exclude(id__in=catalogs[1]).delete()
+        cache.clear()
+
+
+@pytest.fixture
+def make_view():
+    """Return a factory of views set up to handle a GET from ``user``."""
+    def make_view(view_class, user, data=None):
+        request = APIRequestFactory().get('/', data)
+        force_authenticate(request, user=user)
+        view = view_class()
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        view.format_kwarg = None
+        return view
+    return make_view
+
+
+class Benchmark:
+    """Times a function over several rounds."""
+
+    def __init__(self, name, min_rounds, max_time):
+        self.name = name
+        self.min_rounds = min_rounds
+        self.max_time = max_time
+        self.stats = None
+
+    def __call__(self, function, *args, **kwargs):
+        return self.pedantic(function, args, kwargs)
+
+    def pedantic(self, target, args=(), kwargs=None, setup=None, rounds=None):
+        kwargs = kwargs or {}
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as queries:
+            result = target(*args, **kwargs)
+
+        timings = []
+        deadline = time.perf_counter() + self.max_time
+        while len(timings) < (rounds or self.min_rounds) or (
+            rounds is None and time.perf_counter() < deadline
+        ):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            target(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+
+        self.stats = {
+            'name': self.name,
+            'rounds': len(timings),
+            'queries': len(queries),
+            'min': min(timings),
+            'max': max(timings),
+            'mean': statistics.mean(timings),
+            'median': statistics.median(timings),
+            'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        }
+        self.stats['ops'] = 1 / self.stats['mean'] if self.stats['mean'] else None
+        return result
+
+
+@pytest.fixture
+def benchmark(request):
+    if not request.config.getoption('benchmarks'):
+        pytest.skip('Benchmarks run with --benchmarks')
+    benchmark = Benchmark(
+        request.node.nodeid,
+        request.config.getoption('benchmark_min_rounds'),
+        request.config.getoption('benchmark_max_time'),
+    )
+    yield benchmark
+    if benchmark.stats is not None:
+        request.config.stash[results_key].append(benchmark.stats)
+
+
+def machine_id():
+    return '-'.join((
+        platform.system(), platform.python_implementation(),
+        '.'.join(platform.python_version_tuple()[:2]), platform.machine(),
+    ))
+
+
+def get_commit():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if dirty else commit
+
+
+def previous_run(directory):
+    runs = sorted(directory.glob('*.json'))
+    if not runs:
+        return None, 0
+    return json.loads(runs[-1].read_text()), int(runs[-1].name.split('_')[0])
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    benchmarks = config.stash[results_key]
+    if not benchmarks:
+        return
+
+    directory = Path(config.rootpath) / config.getoption('benchmark_storage') / machine_id()
+    directory.mkdir(parents=True, exist_ok=True)
+    previous, number = previous_run(directory)
+    baseline = {stats['name']: stats for stats in previous['benchmarks']} if previous else {}
+
+    commit = get_commit()
+    run = {
+        'commit': commit,
+        'datetime': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': machine_id(),
+        'benchmarks': benchmarks,
+    }
+    path = directory / f'{number + 1:04d}_{commit}.json'
+    path.write_text(json.dumps(run, indent=2))
+
+    threshold = config.getoption('benchmark_compare_fail')
+    regressions = []
+    for stats in benchmarks:
+        before = baseline.get(stats['name'])
+        stats['change'] = (stats['median'] / before['median'] - 1) * 100 if before else None
+        if threshold is not None and stats['change'] is not None and stats['change'] > threshold:
+            regressions.append(stats['name'])
+    config.stash[report_key] = (path, previous and previous['commit'], regressions)
+    if regressions:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if report_key not in config.stash:
+        return
+    path, previous_commit, regressions = config.stash[report_key]
+    write = terminalreporter.write_line
+    terminalreporter.section('benchmarks')
+    write(f"{'benchmark':<72}{'median ms':>11}{'min ms':>9}{'rounds':>8}{'queries':>9}{'change':>9}")
+    for stats in config.stash[results_key]:
+        change = '' if stats['change'] is None else f"{stats['change']:+.1f}%"
+        write(
+            f"{stats['name'].split('::', 1)[-1]:<72}{stats['median'] * 1000:>11.3f}"
+            f"{stats['min'] * 1000:>9.3f}{stats['rounds']:>8}{stats['queries']:>9}{change:>9}"
+        )
+    if previous_commit:
+        write(f'Changes are against the previous run, at {previous_commit}')
+    write(f'Saved to {path}')
+    for name in regressions:
+        write(f'Regression beyond --benchmark-compare-fail: {name}', red=True)
@@ -0,0 +1,32 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS
+from posts.views.posts import PostListCreateView
+from posts.views.search import PostSearchView
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark]
+
+PAGE = 20
+
+
+class TestFeedBenchmarks:
+    """Benchmarks of building and running the feed and search queries."""
+
+    def test_feed_queryset_construction(self, benchmark, dataset, make_view):
+        view = make_view(PostListCreateView, dataset.viewer)
+
+        def build():
+            queryset = view.get_feed_queryset(dataset.following_ids)[:PAGE]
+            return queryset.query.get_compiler(DEFAULT_DB_ALIAS).as_sql()
+
+        sql, params = benchmark(build)
+        assert 'posts_post' in sql
+
+    def test_feed_page(self, benchmark, dataset, make_view):
+        view = make_view(PostListCreateView, dataset.viewer)
+        posts = benchmark(lambda: list(view.get_feed_queryset(dataset.following_ids)[:PAGE]))
+        assert posts
+
+    def test_search(self, benchmark, dataset, make_view):
+        view = make_view(PostSearchView, dataset.viewer, {'q': dataset.search_term})
+        posts = benchmark(lambda: list(view.get_queryset()[:PAGE]))
+        assert posts
@@ -0,0 +1,43 @@
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from notifications.models import Notification
+from notifications.signals import push_notifications
+from posts.models import Post
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark]
+
+
+@pytest.fixture
+def channel_layer(settings):
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@pytest.fixture
+def post(dataset):
+    return Post.objects.exclude(author=dataset.viewer).select_related('author').order_by('id').first()
+
+
+class TestNotificationBenchmarks:
+    """Benchmarks of creating notifications and pushing them to the channel layer."""
+
+    def test_create_notification(self, benchmark, dataset, channel_layer, post):
+        """Test creating a notification, with its post_save push."""
+        notification = benchmark(
+            Notification.objects.create,
+            recipient=post.author, sender=dataset.viewer, type='like',
+            content_type=ContentType.objects.get_for_model(Post), object_id=post.id,
+            text=f'{dataset.viewer.username} liked your post',
+        )
+        assert notification.pk
+
+    def test_push_notifications(self, benchmark, dataset, channel_layer, post):
+        """Test pushing a batch of notifications created in bulk."""
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                recipient=post.author, sender=dataset.viewer, type='comment',
+                content_type=ContentType.objects.get_for_model(Post), object_id=post.id,
+                text=f'{dataset.viewer.username} commented on your post',
+            )
+            for _ in range(20)
+        ])
+        benchmark(push_notifications, notifications)
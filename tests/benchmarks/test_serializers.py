@@ -0,0 +1,30 @@
+import pytest
+from posts.views.posts import PostListCreateView
+from projects.views.projects import ProjectListCreateView
+from users.views.users import UserListView
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark]
+
+PAGE = 20
+
+
+class TestSerializerBenchmarks:
+    """Benchmarks of serializing a page of each list, queries included."""
+
+    def serialize_page(self, view):
+        return view.get_serializer(view.get_queryset()[:PAGE], many=True).data
+
+    def test_post_serializer(self, benchmark, dataset, make_view):
+        view = make_view(PostListCreateView, dataset.viewer)
+        posts = benchmark(self.serialize_page, view)
+        assert posts and 'is_liked' in posts[0]
+
+    def test_user_serializer(self, benchmark, dataset, make_view):
+        view = make_view(UserListView, dataset.viewer)
+        users = benchmark(self.serialize_page, view)
+        assert users and 'followers_count' in users[0]
+
+    def test_project_serializer(self, benchmark, dataset, make_view):
+        view = make_view(ProjectListCreateView, dataset.viewer)
+        projects = benchmark(self.serialize_page, view)
+        assert projects and projects[0]['collaborators']
@@ -1,5 +1,6 @@
 import pytest
 from django.conf import settings
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from django.contrib.contenttypes.models import ContentType
@@ -7,12 +8,62 @@ from users.models import Skill, ProgrammingLanguage, Follow
 from posts.models import Post, Comment, PostLike, CommentLike
 from projects.models import Project, ProjectCollaborator, CollaborationRequest
 from notifications.models import Notification
+from socialistic.throttling import local_buckets
 from rest_framework_simplejwt.tokens import RefreshToken
 import datetime
 
 User = get_user_model()
 
 
+def pytest_addoption(parser):
+    # The benchmarks themselves are in tests/benchmarks/conftest.py
+    group = parser.getgroup('benchmarks')
+    group.addoption('--benchmarks', action='store_true',
+                    help='Run the microbenchmarks of tests/benchmarks (skipped otherwise)')
+    group.addoption('--benchmark-sizes', default='10,100,1000',
+                    help='Users in each generated dataset (default: 10,100,1000)')
+    group.addoption('--benchmark-min-rounds', type=int, default=5,
+                    help='Rounds each benchmark runs at least (default: 5)')
+    group.addoption('--benchmark-max-time', type=float, default=1.0,
+                    help='Seconds after which a benchmark stops adding rounds (default: 1.0)')
+    group.addoption('--benchmark-storage', default='.benchmarks',
+                    help='Directory the results of each run are saved to (default: .benchmarks)')
+    group.addoption('--benchmark-compare-fail', type=float, default=None, metavar='PERCENT',
+                    help='Fail if a median is slower than in the previous saved run by more than PERCENT')
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """Use an empty in-process two-tier cache for each test."""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'socialistic.cache.TwoTierCache',
+            'LOCATION': 'test',
+            'OPTIONS': {
+                'SHARED': 'shared',
+                'INVALIDATION': 'socialistic.cache.LocalInvalidation',
+            },
+        },
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    }
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def throttle_buckets():
+    """Start each test with full throttling buckets."""
+    local_buckets.clear()
+
+
+@pytest.fixture(autouse=True)
+def fail_on_nplusone(request, settings):
+    """Fail requests that run N+1 queries, unless the test allows them."""
+    if request.node.get_closest_marker('allow_nplusone'):
+        settings.NPLUSONE_DETECTION = 'log'
+    else:
+        settings.NPLUSONE_DETECTION = 'raise'
+
+
 @pytest.fixture
 def api_client():
     """Returns an authenticated API client."""
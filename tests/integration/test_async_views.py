@@ -0,0 +1,110 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from tests.factories import PostFactory
+
+pytestmark = [pytest.mark.django_db, pytest.mark.integration]
+
+
+@pytest.fixture
+def token(user):
+    return str(AccessToken.for_user(user))
+
+
+@pytest.fixture
+def token_client(token):
+    """A client authenticating with a bearer token, as the async views require."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def in_memory_channel_layer(settings):
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@pytest.fixture
+def read_urls(in_memory_channel_layer, user, another_user, follow_relationship, notification,
+              programming_language):
+    post = PostFactory(author=another_user, programming_language=programming_language)
+    return [
+        reverse('post-list'),
+        reverse('post-detail', kwargs={'pk': post.id}),
+        reverse('notification-list'),
+        reverse('notification-unread-count'),
+    ]
+
+
+def disable_sync_get(monkeypatch, url):
+    """Make the DRF view behind ``url`` fail GET requests."""
+    def fail(*args, **kwargs):
+        raise AssertionError('Served by the sync view')
+    monkeypatch.setattr(resolve(url).func.sync_view.cls, 'get', fail)
+
+
+class TestAsyncViews:
+    """Tests for the async read path of hot endpoints."""
+
+    def test_async_responses_match_sync_views(self, auth_client, token_client, read_urls, monkeypatch):
+        """Test that the async views render what the DRF views render."""
+        for url in read_urls:
+            expected = auth_client.get(url)
+            disable_sync_get(monkeypatch, url)
+            response = token_client.get(url)
+
+            assert response.status_code == status.HTTP_200_OK
+            assert response.content == expected.content
+            assert response['Content-Type'] == expected['Content-Type']
+            assert response.get('ETag') == expected.get('ETag')
+
+    def test_async_view_answers_conditional_get(self, token_client, read_urls, monkeypatch):
+        url = read_urls[1]
+        etag = token_client.get(url)['ETag']
+        disable_sync_get(monkeypatch, url)
+
+        response = token_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.parametrize('query', ['?fields=id,content', '?format=normalized'])
+    def test_other_shapes_fall_back_to_sync_view(self, auth_client, token_client, read_urls, query):
+        url = read_urls[0] + query
+        response = token_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == auth_client.get(url).content
+
+    def test_browsable_api_falls_back_to_sync_view(self, token_client, read_urls):
+        response = token_client.get(read_urls[0], HTTP_ACCEPT='text/html')
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('text/html')
+
+    def test_missing_post_falls_back_to_sync_view(self, token_client):
+        response = token_client.get(reverse('post-detail', kwargs={'pk': 999999}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_token_is_rejected(self, api_client, read_urls):
+        api_client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        response = api_client.get(read_urls[0])
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()['code'] == 'token_not_valid'
+
+    def test_writes_go_to_sync_view(self, token_client, user):
+        response = token_client.post(reverse('post-list'), {'content': 'Async'}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()['author']['id'] == user.id
+
+    def test_served_under_asgi(self, token, read_urls, monkeypatch):
+        """Test that the ASGI handler runs the async views natively."""
+        url = read_urls[3]
+        disable_sync_get(monkeypatch, url)
+
+        async def get():
+            return await AsyncClient().get(url, headers={'Authorization': f'Bearer {token}'})
+
+        response = async_to_sync(get)()
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'count': 1}
@@ -0,0 +1,125 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from posts.models import Post
+from tests.factories import PostFactory, ProjectFactory
+
+pytestmark = [pytest.mark.django_db, pytest.mark.integration]
+
+
+def profile_urls(user):
+    """The requests the frontend makes to show a profile page."""
+    return [
+        reverse('user-detail', kwargs={'pk': user.id}),
+        reverse('user-posts', kwargs={'pk': user.id}),
+        reverse('user-projects', kwargs={'pk': user.id}),
+        reverse('user-followers', kwargs={'pk': user.id}),
+        reverse('notification-unread-count'),
+    ]
+
+
+class TestBatchAPI:
+    """Tests for the batch endpoint."""
+
+    @pytest.fixture
+    def profile(self, user, another_user, follow_relationship):
+        PostFactory(author=another_user)
+        ProjectFactory(creator=another_user)
+        return another_user
+
+    def test_batch_matches_separate_requests(self, auth_client, profile):
+        """Test that each sub-response is what the request alone returns."""
+        urls = profile_urls(profile)
+        response = auth_client.post(reverse('batch'), {
+            'requests': [{'method': 'GET', 'url': url} for url in urls]
+        }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()['responses']
+        assert len(results) == len(urls)
+        for url, result in zip(urls, results):
+            expected = auth_client.get(url)
+            assert result['status'] == expected.status_code
+            assert result['body'] == expected.json()
+            assert result['headers']['Content-Type'] == 'application/json'
+
+    def test_batch_runs_writes_in_order(self, auth_client, user):
+        """Test that later sub-requests see the writes of earlier ones."""
+        response = auth_client.post(reverse('batch'), {
+            'requests': [
+                {'method': 'POST', 'url': reverse('post-list'), 'body': {'content': 'Batched'}},
+                {'method': 'GET', 'url': reverse('user-posts', kwargs={'pk': user.id})},
+                {'method': 'GET', 'url': '/api/missing/'},
+            ]
+        }, format='json')
+
+        created, listed, missing = response.json()['responses']
+        assert created['status'] == status.HTTP_201_CREATED
+        assert Post.objects.get(id=created['body']['id']).author == user
+        assert [post['content'] for post in listed['body']['results']] == ['Batched']
+        assert missing == {'status': 404, 'headers': {'Content-Type': 'text/html; charset=utf-8'}, 'body': None}
+
+    def test_batch_passes_conditional_headers(self, auth_client, post):
+        """Test that sub-requests can be answered with 304."""
+        url = reverse('post-detail', kwargs={'pk': post.id})
+        etag = auth_client.get(url)['ETag']
+
+        response = auth_client.post(reverse('batch'), {
+            'requests': [{'method': 'GET', 'url': url, 'headers': {'If-None-Match': etag}}]
+        }, format='json')
+        assert response.json()['responses'][0]['status'] == status.HTTP_304_NOT_MODIFIED
+
+    def test_batch_shares_identity_map(self, auth_client, profile, monkeypatch):
+        """Test that objects rendered by several sub-requests are fetched once."""
+        from users import fragments
+        keys = []
+        get_many = fragments.cache.get_many
+        monkeypatch.setattr(fragments.cache, 'get_many', lambda k: keys.extend(k) or get_many(k))
+        url = reverse('post-list')
+
+        auth_client.post(reverse('batch'), {
+            'requests': [{'method': 'GET', 'url': url}] * 3
+        }, format='json')
+        assert len(keys) == len(set(keys))
+
+    @pytest.mark.parametrize('spec', [
+        {'method': 'GET', 'url': '/api/batch/'},
+        {'method': 'GET', 'url': 'https://example.com/api/posts/'},
+        {'method': 'TRACE', 'url': '/api/posts/'},
+        {'method': 'GET', 'url': '/api/posts/', 'headers': {'Authorization': 'Bearer x'}},
+    ])
+    def test_batch_rejects_invalid_requests(self, auth_client, spec):
+        response = auth_client.post(reverse('batch'), {'requests': [spec]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_batch_size_is_limited(self, auth_client, settings):
+        settings.BATCH_MAX_REQUESTS = 2
+        response = auth_client.post(reverse('batch'), {
+            'requests': [{'method': 'GET', 'url': reverse('post-list')}] * 3
+        }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_batch_requires_authentication(self, api_client):
+        response = api_client.post(reverse('batch'), {
+            'requests': [{'method': 'GET', 'url': reverse('post-list')}]
+        }, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db(transaction=True)
+class TestParallelBatchAPI:
+    """Tests for batches of reads run concurrently."""
+
+    def test_parallel_reads(self, auth_client, user, another_user, follow_relationship):
+        PostFactory(author=another_user)
+        urls = profile_urls(another_user)
+        expected = [auth_client.get(url).json() for url in urls]
+
+        response = auth_client.post(reverse('batch'), {
+            'requests': [{'method': 'GET', 'url': url} for url in urls],
+            'parallel': True,
+        }, format='json')
+
+        results = response.json()['responses']
+        assert [result['status'] for result in results] == [200] * len(urls)
+        assert [result['body'] for result in results] == expected
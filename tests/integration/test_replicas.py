@@ -0,0 +1,121 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory
+from posts.models import Post
+from rest_framework_simplejwt.tokens import AccessToken
+from socialistic.replicas import ReplicaMiddleware, SQLiteReplicaCopier, _read_db
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica1']
+
+
+def token_for(user_id):
+    token = AccessToken()
+    token['user_id'] = user_id
+    return f'Bearer {token}'
+
+
+def request_db(method='get', status=200, **extra):
+    """Return the database a request's reads went to."""
+    used = []
+
+    def view(request):
+        used.append(router.db_for_read(Post))
+        return HttpResponse(status=status)
+
+    request = getattr(RequestFactory(), method)('/api/posts/', **extra)
+    ReplicaMiddleware(view)(request)
+    return used[0]
+
+
+class TestReplicaRouting:
+    """Tests for routing the reads of read requests to replicas."""
+
+    def test_reads_go_to_replica(self, replicas):
+        assert request_db() == 'replica1'
+        assert request_db('head') == 'replica1'
+
+    def test_write_requests_read_from_primary(self, replicas):
+        assert request_db('post') == 'default'
+
+    def test_reads_outside_requests_use_primary(self, replicas):
+        assert router.db_for_read(Post) == 'default'
+        assert router.db_for_write(Post) == 'default'
+
+    def test_no_replicas_configured(self, settings):
+        settings.DATABASE_REPLICAS = []
+        assert request_db() == 'default'
+
+    def test_writer_reads_own_writes(self, replicas):
+        """Test that a client reads from the primary for a while after writing."""
+        request_db('post', status=201, HTTP_AUTHORIZATION=token_for(1))
+
+        assert request_db(HTTP_AUTHORIZATION=token_for(1)) == 'default'
+        assert request_db(HTTP_AUTHORIZATION=token_for(2)) == 'replica1'
+        assert request_db() == 'replica1'
+
+    def test_failed_writes_dont_pin(self, replicas):
+        request_db('post', status=400, HTTP_AUTHORIZATION=token_for(1))
+        assert request_db(HTTP_AUTHORIZATION=token_for(1)) == 'replica1'
+
+    def test_session_clients_are_pinned(self, replicas):
+        request_db('post', status=302, HTTP_COOKIE='sessionid=abc')
+
+        assert request_db(HTTP_COOKIE='sessionid=abc') == 'default'
+        assert request_db(HTTP_COOKIE='sessionid=xyz') == 'replica1'
+
+    def test_migrations_skip_replicas(self, replicas):
+        assert router.allow_migrate('replica1', 'posts') is False
+        assert router.allow_migrate('default', 'posts') is True
+
+
+# Reads inside a transaction go to the primary anyway
+@pytest.mark.django_db(transaction=True)
+class TestFragmentLoads:
+    """Tests that cached fragments are loaded from the primary."""
+
+    def test_fragments_skip_replica(self, replicas, post):
+        from posts.encoders import load_post_fragments
+        from users.encoders import load_user_fragments
+        token = _read_db.set('replica1')
+        try:
+            assert router.db_for_read(Post) == 'replica1'
+            assert set(load_post_fragments([post.id])) == {post.id}
+            assert set(load_user_fragments([post.author_id])) == {post.author_id}
+        finally:
+            _read_db.reset(token)
+
+
+class TestSQLiteReplicaCopier:
+    """Tests for the local copier keeping SQLite replicas in sync."""
+
+    def test_sync_copies_primary(self, tmp_path):
+        primary = tmp_path / 'db.sqlite3'
+        replicas = [tmp_path / 'db.replica1.sqlite3', tmp_path / 'db.replica2.sqlite3']
+        copier = SQLiteReplicaCopier(primary, replicas, interval=1)
+
+        with closing(sqlite3.connect(primary)) as db:
+            db.execute('CREATE TABLE post (content TEXT)')
+            db.execute("INSERT INTO post VALUES ('first')")
+            db.commit()
+        copier.sync()
+
+        with closing(sqlite3.connect(primary)) as db:
+            db.execute("INSERT INTO post VALUES ('second')")
+            db.commit()
+        for path in replicas:
+            with closing(sqlite3.connect(path)) as db:
+                assert db.execute('SELECT content FROM post').fetchall() == [('first',)]
+
+        copier.sync()
+        for path in replicas:
+            with closing(sqlite3.connect(path)) as db:
+                assert db.execute('SELECT count(*) FROM post').fetchone() == (2,)
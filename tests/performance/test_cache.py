@@ -0,0 +1,137 @@
+import time
+
+import pytest
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from socialistic.cache import TwoTierCache
+
+pytestmark = [pytest.mark.unit, pytest.mark.performance]
+
+INVALIDATION = 'socialistic.cache.LocalInvalidation'
+
+
+def two_tier(location, shared='shared', **options):
+    """A TwoTierCache with its own local store, standing in for one process."""
+    return TwoTierCache(location, {
+        'OPTIONS': {'SHARED': shared, 'INVALIDATION': INVALIDATION, **options}
+    })
+
+
+class ExpiringLocMemCache(LocMemCache):
+    """LocMemCache telling the seconds keys have left, like django-redis."""
+
+    def ttl(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if self._has_expired(key):
+                return 0
+            expires_at = self._expire_info.get(key)
+        return None if expires_at is None else expires_at - time.time()
+
+
+class TestTwoTierCache:
+    """Tests for the two-tier cache backend."""
+
+    def test_reads_are_served_locally(self):
+        """Test that a value read once is served without the shared cache."""
+        cache = two_tier('reads')
+        cache.set('key', {'value': 1})
+        caches['shared'].delete('key')
+
+        assert cache.get('key') == {'value': 1}
+        assert cache.get_many(['key', 'other']) == {'key': {'value': 1}}
+
+    def test_misses_fill_local_tier(self):
+        """Test that values written by another process are read through."""
+        first, second = two_tier('fill-1'), two_tier('fill-2')
+        first.set('key', 'value')
+
+        assert second.get('key') == 'value'
+        assert second.get('missing', 'default') == 'default'
+        assert second.get_many(['key', 'missing']) == {'key': 'value'}
+
+    def test_writes_invalidate_other_processes(self):
+        """Test that writes and deletes drop the other processes' copies."""
+        first, second = two_tier('invalidate-1'), two_tier('invalidate-2')
+        first.set('key', 'old')
+        assert second.get('key') == 'old'
+
+        first.set('key', 'new')
+        assert second.get('key') == 'new'
+
+        first.set_many({'key': 'newer', 'other': 1})
+        assert second.get_many(['key', 'other']) == {'key': 'newer', 'other': 1}
+
+        first.delete_many(['key'])
+        assert second.get('key') is None
+
+        first.clear()
+        assert second.get('other') is None
+
+    def test_local_tier_is_bounded(self):
+        """Test that the least recently used entries are evicted."""
+        cache = two_tier('bounded', LOCAL_MAX_ENTRIES=2)
+        cache.set_many({'a': 1, 'b': 2})
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert set(cache.store._data) == {cache.make_key('a'), cache.make_key('c')}
+
+    def test_local_tier_honours_short_timeouts(self, monkeypatch):
+        """Test that entries expire locally with their timeout when below LOCAL_TIMEOUT."""
+        now = [1000.0]
+        monkeypatch.setattr('socialistic.cache.time.monotonic', lambda: now[0])
+        cache = two_tier('timeouts', LOCAL_TIMEOUT=60)
+        cache.set('short', 'value', 1)
+        cache.set_many({'many': 'value'}, 1)
+        cache.set('expired', 'value', 0)
+        caches['shared'].delete_many(['short', 'many'])
+
+        assert cache.get('short') == 'value'
+        assert cache.get('expired') is None
+        now[0] += 1.5
+        assert cache.get('short') is None
+        assert cache.get('many') is None
+
+    def test_shared_cache_outage_degrades_to_local(self, settings):
+        """Test that an unreachable Redis leaves the local tier working."""
+        settings.CACHES = {
+            **settings.CACHES,
+            'unreachable': {
+                'BACKEND': 'django_redis.cache.RedisCache',
+                'LOCATION': 'redis://127.0.0.1:1/0',
+                'OPTIONS': {'SOCKET_CONNECT_TIMEOUT': 0.1, 'SOCKET_TIMEOUT': 0.1},
+            },
+        }
+        cache = two_tier('outage', shared='unreachable', RETRY_AFTER=60)
+
+        cache.set('key', 'value')
+        assert cache.get('key') == 'value'
+        assert cache.get('missing') is None
+        assert cache.add('key', 'other') is False
+        assert cache.add('counter', 1) is True
+        assert cache.incr('counter') == 2
+        cache.delete('key')
+        assert cache.get('key') is None
+
+    def test_shared_hits_expire_with_shared_entry(self, settings, monkeypatch):
+        """Test that local copies of shared hits don't outlive the shared entry."""
+        settings.CACHES = {
+            **settings.CACHES,
+            'expiring': {'BACKEND': 'tests.performance.test_cache.ExpiringLocMemCache'},
+        }
+        now = [1000.0]
+        monkeypatch.setattr('socialistic.cache.time.monotonic', lambda: now[0])
+        cache = two_tier('shared-ttl', shared='expiring', LOCAL_TIMEOUT=60)
+        caches['expiring'].set_many({'short': 'value', 'many': 'value'}, 5)
+        caches['expiring'].set('forever', 'value', None)
+
+        assert cache.get('short') == 'value'
+        assert cache.get_many(['many', 'forever']) == {'many': 'value', 'forever': 'value'}
+        caches['expiring'].delete_many(['short', 'many', 'forever'])
+        now[0] += 4
+        assert cache.get_many(['short', 'many', 'forever']) == {
+            'short': 'value', 'many': 'value', 'forever': 'value'
+        }
+        now[0] += 2
+        assert cache.get_many(['short', 'many', 'forever']) == {'forever': 'value'}
@@ -0,0 +1,44 @@
+import argparse
+
+import pytest
+from load_tester import DEFAULT_MIX, Recorder, parse_mix, percentile, summarize
+
+pytestmark = pytest.mark.performance
+
+
+class TestLoadTesterReport:
+    """Tests for the statistics of the load generator."""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([7], 95) == 7
+        assert percentile([], 50) is None
+
+    def test_summarize(self):
+        stats = summarize([0.3, 0.1, 0.2, 0.4], errors=1, elapsed=2)
+        assert stats['requests'] == 4
+        assert stats['error_rate'] == 0.25
+        assert stats['throughput_rps'] == 2
+        assert stats['p50_ms'] == 200
+        assert stats['max_ms'] == 400
+
+    def test_warmup_is_not_recorded(self):
+        recorder = Recorder()
+        recorder.add('feed', 1.0)
+        recorder.recording = True
+        recorder.add('feed', 0.01)
+        recorder.add('like', 0.02, error='500')
+
+        report = recorder.report(elapsed=1)
+
+        assert report['requests']['feed']['requests'] == 1
+        assert report['overall']['errors'] == 1
+        assert report['errors'] == {'like': {'500': 1}}
+
+    def test_parse_mix(self):
+        assert parse_mix('feed=5,search') == {'feed': 5, 'search': 1}
+        assert set(DEFAULT_MIX) >= set(parse_mix('like=1'))
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix('explode=1')
@@ -0,0 +1,103 @@
+import re
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from socialistic.metrics import RequestMetricsMiddleware, request_duration, sql_queries, timed
+
+pytestmark = [pytest.mark.django_db, pytest.mark.performance]
+
+User = get_user_model()
+
+
+@pytest.fixture
+def sampled(settings):
+    settings.REQUEST_METRICS_SAMPLE_RATE = 1
+
+
+def server_timing(response):
+    """Parse a Server-Timing header into {metric: (duration, description)}."""
+    timings = {}
+    for metric in response['Server-Timing'].split(', '):
+        name, *params = metric.split(';')
+        params = dict(param.split('=', 1) for param in params)
+        timings[name] = (float(params['dur']), params.get('desc', '').strip('"'))
+    return timings
+
+
+def run(view):
+    return RequestMetricsMiddleware(view)(RequestFactory().get('/'))
+
+
+class TestRequestMetrics:
+    """Tests for the per-request SQL and latency instrumentation."""
+
+    def test_counts_queries(self, sampled, user, another_user):
+        def view(request):
+            list(User.objects.all())
+            User.objects.filter(pk=user.pk).exists()
+            return HttpResponse()
+
+        sql, description = server_timing(run(view))['sql']
+        assert description == '2 queries (0 repeated)'
+        assert sql >= 0
+
+    def test_counts_repeated_queries(self, sampled, user, another_user):
+        """Test that the N+1 pattern shows up as duplicate queries."""
+        def view(request):
+            for pk in (user.pk, another_user.pk):
+                User.objects.get(pk=pk)
+            return HttpResponse()
+
+        assert server_timing(run(view))['sql'][1] == '2 queries (1 repeated)'
+
+    def test_times_sections_once(self, sampled):
+        @timed('serialize')
+        def serialize():
+            with timed('serialize'):
+                pass
+
+        def view(request):
+            serialize()
+            with timed('render'):
+                pass
+            return HttpResponse()
+
+        timings = server_timing(run(view))
+        assert set(timings) == {'sql', 'serialize', 'render', 'total'}
+        assert timings['total'][1] == 'unresolved'
+
+    def test_unsampled_requests_have_no_header(self, settings):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 0
+        assert not run(lambda request: HttpResponse()).has_header('Server-Timing')
+
+    def test_api_requests_are_labelled_by_url_name(self, sampled, auth_client, post):
+        count = request_duration.series.get('post-list', ([0],))[0][-1]
+        response = auth_client.get(reverse('post-list'))
+
+        timings = server_timing(response)
+        assert timings['total'][1] == 'post-list'
+        assert int(re.match(r'\d+', timings['sql'][1]).group()) > 0
+        assert {'serialize', 'render'} <= set(timings)
+        assert request_duration.series['post-list'][0][-1] == count + 1
+        assert 'post-list' in sql_queries.series
+
+
+class TestMetricsView:
+    """Tests for the Prometheus endpoint."""
+
+    def test_serves_histograms(self, sampled, client):
+        client.get(reverse('home'))
+        response = client.get(reverse('metrics'))
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        content = response.content.decode()
+        assert '# TYPE http_request_duration_seconds histogram' in content
+        assert 'http_request_duration_seconds_count{view="home"}' in content
+
+    def test_hidden_from_other_addresses(self, client):
+        response = client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.5')
+        assert response.status_code == 404
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory
+from posts.serializers import PostSerializer
+from socialistic.nplusone import NPlusOneError, NPlusOneMiddleware, detect_nplusone, query_shape
+from tests.factories import PostFactory
+
+pytestmark = [pytest.mark.django_db, pytest.mark.performance]
+
+User = get_user_model()
+
+
+@pytest.fixture
+def posts(user):
+    return PostFactory.create_batch(3, author=user)
+
+
+class TestNPlusOneDetection:
+    """Tests for detecting and attributing N+1 queries."""
+
+    def test_query_shape(self):
+        assert query_shape("SELECT 1 FROM t WHERE a = %s AND b = 'x' LIMIT 21") == \
+            'SELECT ? FROM t WHERE a = %s AND b = ? LIMIT ?'
+        assert query_shape('SELECT * FROM t WHERE id IN (%s, %s, %s)') == \
+            query_shape('SELECT * FROM t WHERE id IN (%s)')
+
+    def test_reports_serializer_field(self, user, posts):
+        """Test that per-row queries are blamed on the field that ran them."""
+        request = RequestFactory().get('/')
+        request.user = user
+
+        with pytest.raises(NPlusOneError) as error:
+            with detect_nplusone():
+                PostSerializer(posts, many=True, context={'request': request}).data
+
+        message = str(error.value)
+        assert '3x SELECT' in message
+        assert 'PostSerializer.is_liked at posts/serializers.py' in message
+
+    def test_repeated_identical_queries_are_not_nplusone(self, user):
+        with detect_nplusone() as tracker:
+            for _ in range(5):
+                User.objects.filter(pk=user.pk).exists()
+        assert tracker.problems() == []
+
+    def test_different_call_sites_are_counted_apart(self, user, another_user, admin_user):
+        with detect_nplusone() as tracker:
+            User.objects.filter(pk=user.pk).exists()
+            User.objects.filter(pk=another_user.pk).exists()
+            User.objects.filter(pk=admin_user.pk).exists()
+        assert tracker.problems() == []
+
+    def test_middleware_logs(self, settings, caplog, user, another_user, admin_user):
+        settings.NPLUSONE_DETECTION = 'log'
+
+        def view(request):
+            for pk in (user.pk, another_user.pk, admin_user.pk):
+                User.objects.get(pk=pk)
+            return HttpResponse()
+
+        with caplog.at_level(logging.WARNING, logger='socialistic.nplusone'):
+            response = NPlusOneMiddleware(view)(RequestFactory().get('/api/users/'))
+
+        assert response.status_code == 200
+        assert 'N+1 queries in GET /api/users/' in caplog.text
+        assert 'tests/performance/test_nplusone.py' in caplog.text
+
+    def test_middleware_raises(self, settings, user, another_user, admin_user):
+        settings.NPLUSONE_DETECTION = 'raise'
+
+        def view(request):
+            for pk in (user.pk, another_user.pk, admin_user.pk):
+                User.objects.get(pk=pk)
+            return HttpResponse()
+
+        with pytest.raises(NPlusOneError):
+            NPlusOneMiddleware(view)(RequestFactory().get('/'))
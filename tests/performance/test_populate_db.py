@@ -0,0 +1,67 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from notifications.models import Notification
+from posts.models import Comment, Post, PostLike
+from users.models import Follow
+
+pytestmark = [pytest.mark.django_db, pytest.mark.performance]
+
+User = get_user_model()
+
+
+@pytest.fixture(scope='module')
+def populate_db():
+    spec = importlib.util.spec_from_file_location(
+        'populate_db', Path(settings.BASE_DIR) / 'scripts' / 'populate_db.py'
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def arguments(populate_db, *argv):
+    return populate_db.get_parser().parse_args(['--users', '40', '--chunk-size', '50', *argv])
+
+
+class TestPopulateDB:
+    """Tests for the synthetic dataset generator."""
+
+    def test_populate(self, populate_db):
+        totals = populate_db.populate(arguments(populate_db), log=lambda message: None)
+
+        assert User.objects.count() == 41  # With the admin
+        assert Follow.objects.count() == totals['users_follow'] > 0
+        assert Post.objects.count() == totals['posts_post'] > 0
+        assert Comment.objects.count() == totals['posts_comment']
+        assert PostLike.objects.count() == totals['posts_postlike']
+        assert Notification.objects.count() == totals['notifications_notification']
+        assert not Follow.objects.filter(follower=F('following')).exists()
+        assert not PostLike.objects.filter(user=F('post__author')).exists()
+        # Activity happens after the users join and the posts are created
+        assert not Post.objects.filter(created_at__lt=F('author__created_at')).exists()
+        assert not Comment.objects.filter(created_at__lt=F('post__created_at')).exists()
+
+    def test_same_seed_same_data(self, populate_db):
+        """Test that the plan and the rows depend on the seed only."""
+        def generate(*argv):
+            plan = populate_db.Plan(
+                arguments(populate_db, *argv),
+                bases=dict.fromkeys(populate_db.get_bases(), 1),
+                skill_ids=[1, 2, 3], language_ids=[1, 2], content_types={User: 1},
+            )
+            users = populate_db.generate_users(plan, 0, 40)[User]
+            follows = populate_db.generate_follows(plan, 0, 20)[Follow]
+            return (
+                plan.usernames, plan.posts, plan.likes,
+                [(user.username, user.bio) for user in users],
+                [(follow.follower_id, follow.following_id) for follow in follows],
+            )
+
+        assert generate() == generate()
+        assert generate() != generate('--seed', '7')
+
@@ -0,0 +1,110 @@
+import pstats
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from tests.factories import PostFactory
+
+pytestmark = [pytest.mark.django_db, pytest.mark.performance]
+
+
+@pytest.fixture
+def profiles(settings, tmp_path):
+    settings.PROFILING_DIR = tmp_path
+    return tmp_path
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+@pytest.fixture
+def staff_client(admin_user):
+    return token_client(admin_user)
+
+
+class TestProfilingMiddleware:
+    """Tests for profiling the requests of staff users."""
+
+    def test_cprofile(self, profiles, staff_client, user):
+        PostFactory.create_batch(2, author=user)
+        response = staff_client.get(reverse('post-search'), {'q': 'post', 'profile': 'cprofile'})
+
+        assert response.status_code == status.HTTP_200_OK
+        profile_id = response['X-Profile-Id']
+        stats = pstats.Stats(str(profiles / f'{profile_id}.prof'))
+        assert any(function == 'get' for _, _, function in stats.stats)
+
+        queries = (profiles / f'{profile_id}.sql.txt').read_text()
+        assert 'FROM "posts_post"' in queries
+        assert 'SCAN' in queries or 'SEARCH' in queries
+
+    @pytest.mark.parametrize('url_name, package, table', [
+        ('project-list', 'projects', 'projects_project'),
+        ('post-list', 'posts', 'posts_post'),
+    ])
+    def test_cprofile_under_asgi(self, profiles, admin_user, user, url_name, package, table):
+        """Test that the request's sync code is profiled when served from the event loop."""
+        PostFactory.create_batch(2, author=user)
+        token = AccessToken.for_user(admin_user)
+
+        async def get():
+            return await AsyncClient().get(
+                reverse(url_name), {'profile': 'cprofile'},
+                headers={'Authorization': f'Bearer {token}'},
+            )
+        response = async_to_sync(get)()
+
+        assert response.status_code == status.HTTP_200_OK
+        profile_id = response['X-Profile-Id']
+        stats = pstats.Stats(str(profiles / f'{profile_id}.prof'))
+        assert any(f'{package}/' in filename for filename, _, _ in stats.stats)
+        assert f'FROM "{table}"' in (profiles / f'{profile_id}.sql.txt').read_text()
+
+    def test_sampling_profiler(self, profiles, staff_client, settings):
+        settings.PROFILING_SAMPLE_INTERVAL = 0.0001
+        response = staff_client.get(reverse('project-list'), HTTP_X_PROFILE='sample')
+
+        stacks = (profiles / f'{response["X-Profile-Id"]}.collapsed').read_text().splitlines()
+        assert stacks
+        stack, count = stacks[0].rsplit(' ', 1)
+        assert ';' in stack and int(count) > 0
+
+    def test_other_users_are_not_profiled(self, profiles, user):
+        response = token_client(user).get(reverse('post-list'), {'profile': 'cprofile'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.has_header('X-Profile-Id')
+        assert not any(profiles.iterdir())
+
+    def test_unknown_mode_is_ignored(self, profiles, staff_client):
+        response = staff_client.get(reverse('post-list'), {'profile': 'yes'})
+        assert not response.has_header('X-Profile-Id')
+
+
+class TestProfileFileView:
+    """Tests for downloading profiles."""
+
+    def test_staff_download_profiles(self, profiles, staff_client):
+        profile_id = staff_client.get(reverse('post-list'), {'profile': 'cprofile'})['X-Profile-Id']
+
+        response = staff_client.get(reverse('profile-file', kwargs={'filename': f'{profile_id}.sql.txt'}))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert b'SELECT' in b''.join(response.streaming_content)
+
+    def test_others_cannot_download(self, profiles, auth_client):
+        (profiles / 'x.sql.txt').write_text('SELECT 1')
+        response = auth_client.get(reverse('profile-file', kwargs={'filename': 'x.sql.txt'}))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_only_profile_files_are_served(self, profiles, staff_client):
+        (profiles / 'x.txt').write_text('secret')
+        response = staff_client.get(reverse('profile-file', kwargs={'filename': 'x.txt'}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
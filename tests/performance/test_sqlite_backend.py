@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+from django.db import connection
+from socialistic.db.base import DatabaseWrapper, WriteQueue
+
+pytestmark = [pytest.mark.unit, pytest.mark.performance]
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Settings of a file database using the tuned backend."""
+    return {
+        **connection.settings_dict,
+        'ENGINE': 'socialistic.db',
+        'NAME': str(tmp_path / 'db.sqlite3'),
+        'OPTIONS': {'timeout': 1},
+    }
+
+
+class TestWriteQueue:
+    """Tests for the FIFO lock serializing write transactions."""
+
+    def test_waiters_acquire_in_arrival_order(self):
+        queue = WriteQueue()
+        queue.acquire()
+        order = []
+
+        def wait(n):
+            queue.acquire()
+            order.append(n)
+            queue.release()
+
+        threads = []
+        for n in range(5):
+            threads.append(threading.Thread(target=wait, args=(n,)))
+            threads[-1].start()
+            time.sleep(0.01)
+        queue.release()
+        for thread in threads:
+            thread.join()
+        assert order == [0, 1, 2, 3, 4]
+
+    def test_acquire_times_out(self):
+        queue = WriteQueue()
+        queue.acquire()
+        assert queue.acquire(timeout=0.01) is False
+        queue.release()
+        assert queue.acquire(timeout=0.01) is True
+
+
+@pytest.mark.django_db
+class TestSQLiteBackend:
+    """Tests for the tuned SQLite backend."""
+
+    def test_pragmas_are_applied(self, database):
+        db = DatabaseWrapper(database, alias='tuned')
+        with db.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone() == ('wal',)
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone() == (1,)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone() == (1000,)
+        db.close()
+
+    def test_write_transactions_are_serialized(self, database):
+        """Test that a second write transaction waits for the first to commit."""
+        first = DatabaseWrapper(database, alias='first')
+        with first.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (n INTEGER)')
+
+        first._start_transaction_under_autocommit()
+        first.cursor().execute('INSERT INTO item VALUES (1)')
+        seen = []
+
+        def write():
+            second = DatabaseWrapper(database, alias='second')
+            second._start_transaction_under_autocommit()
+            seen.append(second.cursor().execute('SELECT count(*) FROM item').fetchone()[0])
+            second.cursor().execute('INSERT INTO item VALUES (2)')
+            second.commit()
+            second.close()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        time.sleep(0.05)
+        assert seen == []
+        first.commit()
+        thread.join()
+
+        assert seen == [1]
+        assert first.cursor().execute('SELECT count(*) FROM item').fetchone() == (2,)
+        first.close()
@@ -0,0 +1,186 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from socialistic import throttling
+from socialistic.throttling import LocalBuckets, parse_rate
+from tests.factories import UserFactory
+
+pytestmark = [pytest.mark.django_db, pytest.mark.performance]
+
+
+@pytest.fixture(autouse=True)
+def in_memory_channel_layer(settings):
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@pytest.fixture
+def rates(settings):
+    """Set throttle rates for the test, e.g. ``rates(likes='2/min')``."""
+    def rates(**scopes):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **scopes
+            },
+        }
+    return rates
+
+
+def like(client, post):
+    return client.post(reverse('post-like', kwargs={'pk': post.pk}))
+
+
+def unlike(client, post):
+    return client.delete(reverse('post-unlike', kwargs={'pk': post.pk}))
+
+
+class TestTokenBuckets:
+    """Tests for the token buckets themselves."""
+
+    def test_parse_rate(self):
+        assert parse_rate('60/min') == (60, 1)
+        assert parse_rate('10/s') == (10, 10)
+        assert parse_rate('3600/hour') == (3600, 1)
+
+    def test_refills_at_rate(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: now[0])
+        buckets = LocalBuckets()
+
+        bucket = [('key', 2, 1)]
+
+        assert buckets.take(bucket) == (True, [1])
+        assert buckets.take(bucket) == (True, [0])
+        assert buckets.take(bucket) == (False, [0])
+        now[0] += 1.5
+        assert buckets.take(bucket) == (True, [0.5])
+        now[0] += 60
+        assert buckets.take(bucket) == (True, [1])
+
+    def test_takes_from_all_buckets_or_none(self, monkeypatch):
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: 1000.0)
+        buckets = LocalBuckets()
+
+        assert buckets.take([('scope', 1, 1), ('writes', 3, 1)]) == (True, [0, 2])
+        assert buckets.take([('scope', 1, 1), ('writes', 3, 1)]) == (False, [0, 2])
+        assert buckets.take([('other', 1, 1), ('writes', 3, 1)]) == (True, [0, 1])
+
+    def test_takes_cost_tokens(self, monkeypatch):
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: 1000.0)
+        buckets = LocalBuckets()
+
+        assert buckets.take([('scope', 5, 1), ('writes', 10, 1)], 3) == (True, [2, 7])
+        assert buckets.take([('scope', 5, 1), ('writes', 10, 1)], 3) == (False, [2, 7])
+        assert buckets.take([('scope', 5, 1), ('writes', 10, 1)], 2) == (True, [0, 5])
+
+    def test_drops_full_buckets_beyond_limit(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(LocalBuckets, 'MAX_BUCKETS', 2)
+        buckets = LocalBuckets()
+
+        buckets.take([('a', 10, 1)])
+        buckets.take([('b', 10, 1)])
+        now[0] += 60
+        buckets.take([('c', 10, 1)])
+        assert list(buckets._buckets) == ['c']
+
+
+class TestWriteThrottling:
+    """Tests for the throttling of write endpoints."""
+
+    def test_throttles_after_budget(self, rates, auth_client, post):
+        rates(likes='2/min')
+
+        assert like(auth_client, post).status_code == status.HTTP_201_CREATED
+        assert unlike(auth_client, post).status_code == status.HTTP_204_NO_CONTENT
+        response = like(auth_client, post)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 0 < int(response['Retry-After']) <= 30
+        assert response['RateLimit-Remaining'] == '0'
+
+    def test_rate_limit_headers(self, rates, auth_client, post):
+        rates(likes='10/min', writes='100/min')
+
+        response = like(auth_client, post)
+
+        assert response['RateLimit-Limit'] == '10'
+        assert response['RateLimit-Remaining'] == '9'
+        assert response['RateLimit-Reset'] == '6'
+        assert response['RateLimit-Policy'] == '10;w=60'
+
+    def test_reads_not_throttled(self, rates, auth_client, post):
+        rates(posts='1/min')
+
+        for _ in range(3):
+            response = auth_client.get(reverse('post-list'))
+            assert response.status_code == status.HTTP_200_OK
+            assert 'RateLimit-Limit' not in response
+
+    def test_budgets_per_user(self, rates, auth_client, another_user, post):
+        rates(likes='1/min')
+        other_client = APIClient()
+        other_client.force_authenticate(user=another_user)
+
+        assert like(auth_client, post).status_code == status.HTTP_201_CREATED
+        assert unlike(auth_client, post).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert like(other_client, post).status_code == status.HTTP_201_CREATED
+
+    def test_budgets_per_endpoint(self, rates, auth_client, another_user, post):
+        rates(likes='1/min')
+
+        assert like(auth_client, post).status_code == status.HTTP_201_CREATED
+        response = auth_client.post(reverse('user-follow', kwargs={'pk': another_user.pk}))
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_refused_requests_take_no_tokens(self, rates, auth_client, another_user, post):
+        rates(likes='1/min', writes='5/min')
+
+        assert like(auth_client, post).status_code == status.HTTP_201_CREATED
+        assert unlike(auth_client, post).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        response = auth_client.post(reverse('user-follow', kwargs={'pk': another_user.pk}))
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response['RateLimit-Limit'] == '5'
+        assert response['RateLimit-Remaining'] == '3'
+
+    def test_shared_write_budget(self, rates, auth_client, another_user, post):
+        rates(writes='2/min')
+
+        assert like(auth_client, post).status_code == status.HTTP_201_CREATED
+        response = auth_client.post(reverse('user-follow', kwargs={'pk': another_user.pk}))
+        assert response.status_code == status.HTTP_201_CREATED
+        response = auth_client.post(reverse('post-list'), {'content': 'Throttled'})
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response['RateLimit-Limit'] == '2'
+
+    def test_bulk_follow_takes_token_per_user(self, rates, auth_client, another_user):
+        rates(follows='3/min', writes='100/min')
+        others = UserFactory.create_batch(3)
+
+        response = auth_client.post(
+            reverse('user-bulk-follow'), {'user_ids': [u.id for u in others[:2]]}, format='json'
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response['RateLimit-Remaining'] == '1'
+
+        # Single and bulk follows drain the same bucket
+        response = auth_client.post(reverse('user-follow', kwargs={'pk': another_user.pk}))
+        assert response.status_code == status.HTTP_201_CREATED
+        response = auth_client.post(
+            reverse('user-bulk-unfollow'), {'user_ids': [others[0].id]}, format='json'
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_bulk_follow_cost_capped_at_bucket(self, rates, auth_client):
+        rates(follows='2/min', writes='100/min')
+        others = UserFactory.create_batch(3)
+
+        response = auth_client.post(
+            reverse('user-bulk-follow'), {'user_ids': [u.id for u in others]}, format='json'
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response['RateLimit-Remaining'] == '0'
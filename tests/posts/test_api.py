@@ -65,6 +65,30 @@ class TestPostListCreateAPI:
         assert post.content == 'Test post content'
         assert post.author == user
 
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_create_post_validates_language_from_catalog(self, auth_client, programming_language):
+        """Test that the programming language is checked without querying it."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('post-list')
+        auth_client.get(reverse('programming-language-list'))
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = auth_client.post(url, {
+                'content': 'Typed post', 'programming_language_id': programming_language.id
+            })
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['programming_language']['name'] == programming_language.name
+        assert not any(
+            query['sql'].startswith('SELECT') and 'users_programminglanguage' in query['sql']
+            for query in queries
+        )
+        
+        response = auth_client.post(url, {'content': 'Typed post', 'programming_language_id': 999})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'programming_language_id' in response.data
+
     @pytest.mark.api
     @pytest.mark.integration
     def test_create_post_without_authentication(self, api_client):
@@ -94,6 +118,280 @@ class TestPostListCreateAPI:
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_list_posts_normalized(self, auth_client, user, another_user):
+        """Test that the normalized format returns each author once."""
+        PostFactory.create_batch(2, author=user)
+        PostFactory(author=another_user)
+        
+        url = reverse('post-list')
+        response = auth_client.get(url, {'format': 'normalized'})
+        
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()['results']
+        assert len(results) == 3
+        assert all('author' not in post for post in results)
+        assert {post['author_id'] for post in results} == {user.id, another_user.id}
+        
+        users = response.json()['users']
+        assert set(users) == {str(user.id), str(another_user.id)}
+        assert users[str(user.id)]['username'] == user.username
+
+
+class TestPostRowEncoderAPI:
+    """Tests for serializing post lists from .values() rows."""
+    
+    @pytest.fixture
+    def posts(self, user, another_user, skills_set, follow_relationship):
+        another_user.skills.set(skills_set[:2])
+        language = ProgrammingLanguageFactory()
+        liked = PostFactory(author=another_user, programming_language=language)
+        PostLike.objects.create(user=user, post=liked)
+        CommentFactory(post=liked, author=user)
+        PostFactory(author=user, content='Line\u2028separator and caf\u00e9')
+        PostFactory(author=another_user, code_snippet=None)
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    @pytest.mark.parametrize('url_name, kwargs', [
+        ('post-list', {}),
+        ('post-search', {}),
+        ('user-posts', None),
+    ])
+    def test_row_encoders_match_serializer_output(self, auth_client, another_user, posts,
+                                                  monkeypatch, url_name, kwargs):
+        """Test that the fast read path renders the same bytes as the serializers."""
+        from posts.views.posts import PostGraphMixin
+        url = reverse(url_name, kwargs=kwargs if kwargs is not None else {'pk': another_user.id})
+        
+        fast = auth_client.get(url)
+        monkeypatch.setattr(PostGraphMixin, 'use_row_encoders', False)
+        slow = auth_client.get(url)
+        
+        assert fast.status_code == status.HTTP_200_OK
+        assert fast.content == slow.content
+    
+    @pytest.mark.api
+    @pytest.mark.performance
+    def test_list_reuses_cached_fragments(self, auth_client, posts):
+        """Test that a repeated list only runs the per-viewer and paging queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('post-list')
+        
+        with CaptureQueriesContext(connection) as cold:
+            first = auth_client.get(url)
+        with CaptureQueriesContext(connection) as warm:
+            second = auth_client.get(url)
+        
+        assert second.content == first.content
+        assert len(warm) < len(cold)
+        assert not any('users_skill' in query['sql'] for query in warm)
+        assert not any('users_programminglanguage' in query['sql'] for query in warm)
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_fragments_follow_changes(self, auth_client, user, another_user):
+        """Test that saved posts, likes and profile edits show up in cached lists."""
+        post = PostFactory(author=another_user)
+        url = reverse('post-list')
+        auth_client.get(url)
+        
+        post.programming_language.name = 'Renamed Language'
+        post.programming_language.save()
+        PostLike.objects.create(user=another_user, post=post)
+        post.content = 'Edited'
+        post.save()
+        another_user.full_name = 'Renamed User'
+        another_user.save()
+        
+        response = auth_client.get(url)
+        data = response.data['results'][0]
+        assert data['content'] == 'Edited'
+        assert data['likes_count'] == 1
+        assert data['is_liked'] is False
+        assert data['author']['full_name'] == 'Renamed User'
+        assert data['programming_language']['name'] == 'Renamed Language'
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_fragments_keep_viewer_fields_separate(self, api_client, user, another_user):
+        """Test that viewers sharing cached fragments get their own is_liked."""
+        post = PostFactory(author=user)
+        PostLike.objects.create(user=another_user, post=post)
+        url = reverse('post-list')
+        
+        api_client.force_authenticate(user=another_user)
+        assert api_client.get(url).data['results'][0]['is_liked'] is True
+        api_client.force_authenticate(user=user)
+        assert api_client.get(url).data['results'][0]['is_liked'] is False
+
+
+class TestPostQueryCountAPI:
+    """Tests that post and comment lists don't query per row."""
+    
+    @pytest.fixture
+    def create_posts(self, user, another_user):
+        def create_posts(count):
+            for post in PostFactory.create_batch(count, author=another_user):
+                PostLike.objects.create(user=user, post=post)
+                Comment.objects.create(author=another_user, post=post, content='Comment')
+        return create_posts
+    
+    @pytest.mark.api
+    @pytest.mark.performance
+    @pytest.mark.parametrize('params', [
+        {'format': 'normalized'},
+        {'fields': 'id,likes_count,is_liked'},
+        {'fields': 'id,comments_count'},
+    ])
+    def test_post_list_query_count_is_constant(self, auth_client, create_posts,
+                                               django_assert_max_num_queries, params):
+        """Test that the serializer read path annotates counts and likes instead of querying per post."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('post-list')
+        create_posts(2)
+        with CaptureQueriesContext(connection) as small_page:
+            auth_client.get(url, params)
+        
+        create_posts(18)
+        with django_assert_max_num_queries(len(small_page)):
+            response = auth_client.get(url, params)
+        posts = response.json()['results']
+        assert len(posts) == 20
+        assert all(post.get('is_liked', True) and post.get('likes_count', 1) == 1 for post in posts)
+        assert all(post.get('comments_count', 1) == 1 for post in posts)
+
+    @pytest.mark.api
+    @pytest.mark.performance
+    def test_post_list_skips_unselected_counts(self, auth_client, create_posts):
+        """Test that counts and likes left out by ?fields= aren't computed."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        create_posts(2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = auth_client.get(reverse('post-list'), {'fields': 'id,content'})
+        assert response.status_code == status.HTTP_200_OK
+        assert not any('posts_postlike' in q['sql'] or 'posts_comment' in q['sql'] for q in queries)
+
+    @pytest.mark.api
+    @pytest.mark.performance
+    def test_comment_list_query_count_is_constant(self, auth_client, user, post,
+                                                  django_assert_max_num_queries):
+        """Test that comment likes are annotated instead of queried per comment."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('post-comments', kwargs={'pk': post.id})
+        
+        def create_comments(count):
+            for i in range(count):
+                comment = Comment.objects.create(author=user, post=post, content=f'Comment {i}')
+                CommentLike.objects.create(user=user, comment=comment)
+        
+        create_comments(2)
+        with CaptureQueriesContext(connection) as small_page:
+            auth_client.get(url)
+        
+        create_comments(8)
+        with django_assert_max_num_queries(len(small_page)):
+            response = auth_client.get(url)
+        assert len(response.data['results']) == 10
+        assert all(c['is_liked'] and c['likes_count'] == 1 for c in response.data['results'])
+
+
+class TestConditionalGetAPI:
+    """Tests for ETag and Last-Modified validation of post reads."""
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_post_detail_not_modified(self, auth_client, user, another_user, post):
+        """Test that an unchanged post is answered with 304 until it changes."""
+        url = reverse('post-detail', kwargs={'pk': post.id})
+        response = auth_client.get(url)
+        etag = response['ETag']
+        assert response.status_code == status.HTTP_200_OK
+        assert 'Last-Modified' in response
+        
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert not response.content
+        
+        # Counters and related users change the post without touching it
+        PostLike.objects.create(user=another_user, post=post)
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['likes_count'] == 1
+        
+        etag = response['ETag']
+        user.full_name = 'Renamed User'
+        user.save()
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_validators_depend_on_viewer_and_query(self, api_client, user, another_user, post):
+        """Test that viewers and query strings get their own validators."""
+        url = reverse('post-detail', kwargs={'pk': post.id})
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(url)['ETag']
+        
+        assert api_client.get(url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+        api_client.force_authenticate(user=another_user)
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_missing_post_is_not_validated(self, auth_client):
+        """Test that conditional GETs of missing posts still get a 404."""
+        url = reverse('post-detail', kwargs={'pk': 999})
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_feed_not_modified(self, auth_client, user, post):
+        """Test that the feed is validated by the versions of its page."""
+        url = reverse('post-list')
+        etag = auth_client.get(url)['ETag']
+        
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        
+        PostFactory(author=user)
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 2
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_programming_languages_not_modified(self, api_client, programming_language):
+        """Test that the language list is served and validated from memory."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('programming-language-list')
+        response = api_client.get(url)
+        etag = response['ETag']
+        assert response.json()['results'][0]['name'] == programming_language.name
+        assert 'max-age' in response['Cache-Control']
+        
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.get(url).content == response.content
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert len(queries) == 0
+        
+        programming_language.name = 'Renamed'
+        programming_language.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'][0]['name'] == 'Renamed'
+
 
 class TestPostDetailAPI:
     """Tests for post detail API."""
@@ -112,6 +410,21 @@ class TestPostDetailAPI:
         assert response.data['content'] == post.content
         assert response.data['author']['id'] == user.id
 
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_retrieve_post_normalized(self, auth_client, user):
+        """Test that a normalized single post is wrapped with its users."""
+        post = PostFactory(author=user)
+        
+        url = reverse('post-detail', kwargs={'pk': post.id})
+        response = auth_client.get(url, {'format': 'normalized'})
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['data']['id'] == post.id
+        assert data['data']['author_id'] == user.id
+        assert list(data['users']) == [str(user.id)]
+
     @pytest.mark.api
     @pytest.mark.integration
     def test_update_own_post(self, auth_client, user):
@@ -2,7 +2,7 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 from projects.models import Project, ProjectCollaborator, CollaborationRequest
-from tests.factories import ProjectFactory, SkillFactory, UserFactory
+from tests.factories import ProjectFactory, SkillFactory, UserFactory, ProjectCollaboratorFactory
 
 pytestmark = pytest.mark.django_db
 
@@ -195,6 +195,29 @@ class TestProjectDetailAPI:
         
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_project_detail_not_modified(self, auth_client, user):
+        """Test that a project is answered with 304 until it or its collaborators change."""
+        project = ProjectFactory(creator=user)
+        url = reverse('project-detail', kwargs={'pk': project.id})
+        etag = auth_client.get(url)['ETag']
+        
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        
+        ProjectCollaboratorFactory(project=project)
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['collaborators_count'] == 2
+        
+        etag = response['ETag']
+        user.full_name = 'Renamed Creator'
+        user.save()
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['creator']['full_name'] == 'Renamed Creator'
+
 
 class TestProjectTechStackAPI:
     """Tests for project tech stack API."""
@@ -551,4 +574,306 @@ class TestProjectCollaboratorsAPI:
         
         response = auth_client.delete(url)
         
-        assert response.status_code == status.HTTP_403_FORBIDDEN 
\ No newline at end of file
+        assert response.status_code == status.HTTP_403_FORBIDDEN 
+
+class TestProjectCollaboratorGraphAPI:
+    """Tests for batched loading of project collaborators."""
+    
+    def _create_projects(self, count):
+        for _ in range(count):
+            project = ProjectFactory()
+            for _ in range(3):
+                ProjectCollaboratorFactory(project=project)
+    
+    @pytest.mark.api
+    @pytest.mark.performance
+    def test_project_list_query_count_is_constant(self, auth_client, django_assert_max_num_queries):
+        """Test that listing projects doesn't issue queries per project or collaborator."""
+        self._create_projects(2)
+        url = reverse('project-list')
+        
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as small_page:
+            response = auth_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        
+        self._create_projects(8)
+        with django_assert_max_num_queries(len(small_page)):
+            response = auth_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 10
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_project_list_collaborators_limit(self, auth_client, user):
+        """Test that collaborators_limit returns only the first collaborators."""
+        project = ProjectFactory(creator=user)
+        ProjectCollaboratorFactory(project=project)
+        ProjectCollaboratorFactory(project=project)
+        
+        url = reverse('project-list')
+        response = auth_client.get(url, {'collaborators_limit': 1})
+        
+        assert response.status_code == status.HTTP_200_OK
+        project_data = response.data['results'][0]
+        assert project_data['collaborators_count'] == 3
+        assert project_data['is_collaborator'] is True
+        assert [c['user']['id'] for c in project_data['collaborators']] == [user.id]
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_project_detail_normalized(self, auth_client, user):
+        """Test that the normalized format side-loads creators and collaborators."""
+        project = ProjectFactory(creator=user)
+        collaborator = ProjectCollaboratorFactory(project=project).user
+        
+        url = reverse('project-detail', kwargs={'pk': project.id})
+        response = auth_client.get(url, {'format': 'normalized'})
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['data']['creator_id'] == user.id
+        assert {c['user_id'] for c in data['data']['collaborators']} == {user.id, collaborator.id}
+        assert set(data['users']) == {str(user.id), str(collaborator.id)}
+
+
+class TestProjectSparseFieldsAPI:
+    """Tests for the fields and expand query parameters on projects."""
+    
+    @pytest.mark.api
+    @pytest.mark.performance
+    def test_sparse_fields_skip_unrequested_queries(self, auth_client, user):
+        """Test that only the requested fields are rendered and loaded."""
+        project = ProjectFactory(creator=user)
+        ProjectCollaboratorFactory(project=project)
+        
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('project-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = auth_client.get(url, {'fields': 'id,title'})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == [{'id': project.id, 'title': project.title}]
+        assert not any(
+            'projects_projectcollaborator' in query['sql'] for query in queries
+        )
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_nested_fields_and_expand(self, auth_client, user, skill):
+        """Test dotted field paths and collapsing relations to ids."""
+        project = ProjectFactory(creator=user)
+        project.tech_stack.add(skill)
+        collaborator = ProjectCollaboratorFactory(project=project)
+        
+        url = reverse('project-detail', kwargs={'pk': project.id})
+        response = auth_client.get(url, {
+            'fields': 'creator.username,tech_stack,collaborators.role',
+            'expand': 'creator,collaborators'
+        })
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['creator'] == {'username': user.username}
+        assert skill.id in response.data['tech_stack']
+        assert {'role': collaborator.role} in response.data['collaborators']
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_fields_ignored_on_write(self, auth_client, user, skill):
+        """Test that write requests validate and return every field."""
+        url = reverse('project-list')
+        response = auth_client.post(url + '?fields=id', {
+            'title': 'Sparse',
+            'description': 'A sparse project',
+            'tech_stack_ids': [skill.id]
+        })
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['title'] == 'Sparse'
+        assert response.data['creator']['id'] == user.id
+
+
+class TestProjectMatchingAPI:
+    """Tests for skill-based project recommendations and collaborator matching."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_matcher(self):
+        from projects.matching import matcher
+        matcher.invalidate()
+        yield
+        matcher.invalidate()
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_recommended_projects(self, auth_client, user, another_user):
+        """Test that projects are ranked by how well they match the user's skills."""
+        python, django, react = SkillFactory(), SkillFactory(), SkillFactory()
+        user.skills.add(python, django)
+        
+        exact = ProjectFactory(creator=another_user, tech_stack=[python, django])
+        partial = ProjectFactory(creator=another_user, tech_stack=[python, react])
+        ProjectFactory(creator=another_user, tech_stack=[react])
+        ProjectFactory(creator=user, tech_stack=[python, django])
+        
+        url = reverse('project-recommended')
+        response = auth_client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert [p['id'] for p in response.data] == [exact.id, partial.id]
+        assert response.data[0]['match_score'] == 1.0
+        assert response.data[1]['match_score'] == 0.5
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_recommendations_follow_skill_changes(self, auth_client, user, another_user,
+                                                  django_capture_on_commit_callbacks):
+        """Test that the index picks up changes to user skills and tech stacks."""
+        python, react = SkillFactory(), SkillFactory()
+        project = ProjectFactory(creator=another_user, tech_stack=[react])
+        user.skills.add(python)
+        
+        url = reverse('project-recommended')
+        assert auth_client.get(url).data == []
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            project.tech_stack.add(python)
+        assert [p['id'] for p in auth_client.get(url).data] == [project.id]
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            user.skills.remove(python)
+        assert auth_client.get(url).data == []
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_rolled_back_changes_not_indexed(self, auth_client, user, another_user):
+        """Test that the index only picks up committed changes."""
+        from django.db import transaction
+        python = SkillFactory()
+        project = ProjectFactory(creator=another_user)
+        user.skills.add(python)
+        
+        url = reverse('project-recommended')
+        assert auth_client.get(url).data == []
+        
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                project.tech_stack.add(python)
+                raise RuntimeError
+        assert auth_client.get(url).data == []
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_exclusions_do_not_shrink_recommendations(self, auth_client, user, another_user, monkeypatch):
+        """Test that joined projects filling the memoized top matches still leave others recommended."""
+        monkeypatch.setattr('projects.matching.TOP_MATCHES', 2)
+        python, react = SkillFactory(), SkillFactory()
+        user.skills.add(python)
+        for _ in range(3):
+            joined = ProjectFactory(creator=another_user, tech_stack=[python])
+            ProjectCollaboratorFactory(user=user, project=joined)
+        partial = ProjectFactory(creator=another_user, tech_stack=[python, react])
+        
+        url = reverse('project-recommended')
+        response = auth_client.get(url)
+        
+        assert [p['id'] for p in response.data] == [partial.id]
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_find_collaborators(self, auth_client, user, another_user):
+        """Test that users matching a project's tech stack are suggested."""
+        python, django = SkillFactory(), SkillFactory()
+        project = ProjectFactory(creator=user, tech_stack=[python, django])
+        user.skills.add(python, django)
+        another_user.skills.add(python)
+        UserFactory()
+        
+        url = reverse('project-find-collaborators', kwargs={'pk': project.id})
+        response = auth_client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert [u['id'] for u in response.data] == [another_user.id]
+        assert response.data[0]['match_score'] == round(1 / 2 ** 0.5, 4)
+
+
+class TestProjectFacetedSearchAPI:
+    """Tests for facet counts on project search."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_facets(self):
+        from projects.facets import facets
+        facets.invalidate()
+        yield
+        facets.invalidate()
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_search_returns_facet_counts(self, auth_client, user):
+        """Test that search results include counts per skill and status."""
+        python, react = SkillFactory(name='Python'), SkillFactory(name='React')
+        ProjectFactory(creator=user, title='Web app', tech_stack=[python, react])
+        ProjectFactory(creator=user, title='Web api', tech_stack=[python], status='completed')
+        ProjectFactory(creator=user, title='Game', tech_stack=[react])
+        
+        url = reverse('search-projects')
+        response = auth_client.get(url, {'search': 'web'})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+        facets = response.data['facets']
+        assert facets['tech_stack'] == [
+            {'id': python.id, 'name': 'Python', 'count': 2},
+            {'id': react.id, 'name': 'React', 'count': 1},
+        ]
+        assert {f['value']: f['count'] for f in facets['status']} == {
+            'active': 1, 'completed': 1, 'on_hold': 0
+        }
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_facet_counts_follow_filters_and_updates(self, auth_client, user,
+                                                     django_capture_on_commit_callbacks):
+        """Test that each facet honours the other filters and later changes."""
+        python, react = SkillFactory(name='Python'), SkillFactory(name='React')
+        project = ProjectFactory(creator=user, tech_stack=[python])
+        ProjectFactory(creator=user, tech_stack=[react], status='on_hold')
+        
+        url = reverse('search-projects')
+        response = auth_client.get(url, {'skill': python.id})
+        facets = response.data['facets']
+        assert response.data['count'] == 1
+        assert {f['name']: f['count'] for f in facets['tech_stack']} == {'Python': 1, 'React': 1}
+        assert {f['value']: f['count'] for f in facets['status']}['on_hold'] == 0
+        
+        # The index is updated in place when project changes commit
+        with django_capture_on_commit_callbacks(execute=True):
+            project.tech_stack.add(react)
+            project.status = 'on_hold'
+            project.save()
+        
+        response = auth_client.get(url, {'status': 'on_hold'})
+        facets = response.data['facets']
+        assert response.data['count'] == 2
+        assert {f['name']: f['count'] for f in facets['tech_stack']} == {'React': 2, 'Python': 1}
+        assert {f['value']: f['count'] for f in facets['status']}['on_hold'] == 2
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_queryset_filters_outside_list(self, user):
+        """Test that the filters apply wherever the queryset is built, not only when listing."""
+        from rest_framework.test import APIRequestFactory, force_authenticate
+        from projects.views.search import ProjectSearchView
+        python = SkillFactory(name='Python')
+        project = ProjectFactory(creator=user, tech_stack=[python])
+        ProjectFactory(creator=user, tech_stack=[python], status='completed')
+        ProjectFactory(creator=user)
+        
+        request = APIRequestFactory().get('/', {'skill': python.id, 'status': 'active'})
+        force_authenticate(request, user=user)
+        view = ProjectSearchView()
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        
+        assert [p.id for p in view.get_queryset()] == [project.id]
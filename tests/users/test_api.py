@@ -190,6 +190,112 @@ class TestUserProfileAPI:
         # The test is adjusted to match the current implementation.
         # assert 'email' not in response.data
 
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_view_user_profile_sparse_fields(self, auth_client, another_user):
+        """Test that only the requested profile fields are returned."""
+        url = reverse('user-detail', kwargs={'pk': another_user.id})
+        
+        response = auth_client.get(url, {'fields': 'id,username,followers_count'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            'id': another_user.id,
+            'username': another_user.username,
+            'followers_count': 0,
+        }
+
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_user_profile_not_modified(self, auth_client, user, another_user):
+        """Test that a profile is answered with 304 until its data changes."""
+        url = reverse('user-detail', kwargs={'pk': another_user.id})
+        etag = auth_client.get(url)['ETag']
+        
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        
+        Follow.objects.create(follower=user, following=another_user)
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['is_following'] is True
+        assert response.data['followers_count'] == 1
+
+
+class TestUserListAPI:
+    """Tests for user lists served from cached fragments."""
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_list_users_matches_serializer(self, auth_client, user, another_user, skills_set):
+        """Test that cached user fragments render like UserSerializer."""
+        from users.serializers import UserSerializer
+        another_user.skills.set(skills_set)
+        Follow.objects.create(follower=user, following=another_user)
+        url = reverse('user-list')
+        
+        auth_client.get(url)
+        response = auth_client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        expected = UserSerializer(
+            User.objects.with_profile_data(user), many=True,
+            context={'request': response.wsgi_request}
+        ).data
+        assert response.json()['results'] == [dict(item) for item in expected]
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_follow_counts_refresh(self, auth_client, user, another_user):
+        """Test that following a user updates their cached follower count."""
+        url = reverse('user-following', kwargs={'pk': user.id})
+        
+        Follow.objects.create(follower=user, following=another_user)
+        response = auth_client.get(url)
+        assert response.data['results'][0]['followers_count'] == 1
+        
+        Follow.objects.create(follower=UserFactory(), following=another_user)
+        response = auth_client.get(url)
+        assert response.data['results'][0]['followers_count'] == 2
+
+
+class TestSkillCatalogAPI:
+    """Tests for the in-memory skill catalog."""
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_list_skills(self, api_client):
+        """Test that skills are listed by name and follow admin edits."""
+        skill = SkillFactory(name='Rust')
+        SkillFactory(name='Django')
+        url = reverse('skill-list')
+        
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['name'] for item in response.json()['results']] == ['Django', 'Rust']
+        assert response.json()['results'][1] == {'id': skill.id, 'name': 'Rust', 'category': skill.category}
+        
+        skill.name = 'Zig'
+        skill.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['name'] for item in response.json()['results']] == ['Django', 'Zig']
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_project_tech_stack_validated_from_catalog(self, auth_client):
+        """Test that unknown tech stack ids are rejected."""
+        skill = SkillFactory()
+        url = reverse('project-list')
+        data = {'title': 'Catalog', 'description': 'Project', 'tech_stack_ids': [skill.id]}
+        
+        response = auth_client.post(url, data, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [item['id'] for item in response.data['tech_stack']] == [skill.id]
+        
+        response = auth_client.post(url, {**data, 'tech_stack_ids': [skill.id, 999]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'tech_stack_ids' in response.data
+
 
 class TestUserSkillsAPI:
     """Tests for user skills API."""
@@ -322,4 +428,124 @@ class TestFollowAPI:
         response = auth_client.get(url)
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == 1
-        assert response.data[0]['username'] == another_user.username 
\ No newline at end of file
+        assert response.data[0]['username'] == another_user.username
+
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_list_followers_cursor_pagination(self, auth_client, user):
+        """Test that followers are paged by cursor, newest follow first."""
+        followers = [UserFactory() for _ in range(25)]
+        for follower in followers:
+            Follow.objects.create(follower=follower, following=user)
+
+        url = reverse('user-followers', kwargs={'pk': user.id})
+
+        response = auth_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        first_page = [item['username'] for item in response.data['results']]
+        assert len(first_page) == 20
+        assert first_page[0] == followers[-1].username
+
+        response = auth_client.get(response.data['next'])
+        assert response.status_code == status.HTTP_200_OK
+        second_page = [item['username'] for item in response.data['results']]
+        assert len(second_page) == 5
+        assert response.data['next'] is None
+        assert set(first_page) | set(second_page) == {f.username for f in followers}
+
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_list_following_returns_followed_users(self, auth_client, user, another_user):
+        """Test that the following list contains the followed users."""
+        Follow.objects.create(follower=user, following=another_user)
+
+        url = reverse('user-following', kwargs={'pk': user.id})
+
+        response = auth_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['username'] for item in response.data['results']] == [another_user.username]
+
+
+class TestBulkFollowAPI:
+    """Tests for bulk follow and unfollow API."""
+    
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_bulk_follow_users(self, auth_client, user, another_user,
+                               django_capture_on_commit_callbacks, monkeypatch):
+        """Test that several users can be followed in one request."""
+        from notifications.models import Notification
+        others = [UserFactory() for _ in range(3)]
+        Follow.objects.create(follower=user, following=another_user)
+        pushed = []
+        monkeypatch.setattr('users.views.users.push_notifications', pushed.append)
+        
+        url = reverse('user-bulk-follow')
+        data = {'user_ids': [another_user.id] + [u.id for u in others] + [999999]}
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auth_client.post(url, data, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['followed'] == sorted(u.id for u in others)
+        assert response.data['already_following'] == [another_user.id]
+        assert response.data['not_found'] == [999999]
+        
+        # Follows and notifications are only created for new targets
+        assert user.following.count() == 4
+        assert Notification.objects.filter(sender=user, type='follow').count() == 3
+        # The WebSocket push is made once for the whole batch
+        assert len(pushed) == 1
+        assert len(pushed[0]) == 3
+
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_bulk_follow_skips_concurrent_follows(self, auth_client, user, another_user, monkeypatch):
+        """Test that a follow made while the request runs isn't notified twice."""
+        from django.utils import timezone
+        from notifications.models import Notification
+        other = UserFactory()
+        # Both requests create their follows at the same instant
+        now = timezone.now()
+        monkeypatch.setattr(timezone, 'now', lambda: now)
+        bulk_create = Follow.objects.bulk_create
+        
+        def follow_meanwhile(objs, **kwargs):
+            Follow.objects.get_or_create(follower=user, following=another_user)
+            return bulk_create(objs, **kwargs)
+        monkeypatch.setattr(Follow.objects, 'bulk_create', follow_meanwhile)
+        
+        url = reverse('user-bulk-follow')
+        response = auth_client.post(url, {'user_ids': [another_user.id, other.id]}, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['followed'] == [other.id]
+        assert response.data['already_following'] == [another_user.id]
+        assert list(
+            Notification.objects.filter(sender=user, type='follow').values_list('recipient_id', flat=True)
+        ) == [other.id]
+
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_bulk_follow_rejects_self(self, auth_client, user, another_user):
+        """Test that bulk follow fails when the user's own id is included."""
+        url = reverse('user-bulk-follow')
+        
+        response = auth_client.post(url, {'user_ids': [user.id, another_user.id]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Follow.objects.filter(follower=user).exists()
+
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_bulk_unfollow_users(self, auth_client, user, another_user):
+        """Test that several users can be unfollowed in one request."""
+        other = UserFactory()
+        Follow.objects.create(follower=user, following=another_user)
+        Follow.objects.create(follower=user, following=other)
+        
+        url = reverse('user-bulk-unfollow')
+        
+        response = auth_client.post(url, {'user_ids': [another_user.id, other.id]}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['unfollowed'] == sorted([another_user.id, other.id])
+        assert not Follow.objects.filter(follower=user).exists()
@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.principals import principals
+
+pytestmark = [pytest.mark.django_db, pytest.mark.api]
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+def user_queries(queries):
+    return [query['sql'] for query in queries if 'FROM "users_user"' in query['sql']]
+
+
+class TestPrincipalCache:
+    """Tests for authenticating from cached user principals."""
+
+    def test_login_returns_user_and_caches_principal(self, api_client, user):
+        response = api_client.post(reverse('login'), {'email': user.email, 'password': 'password'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['user']['username'] == user.username
+        assert response.data['access'] and response.data['refresh']
+
+        cached, _ = principals.get(user.pk)
+        assert cached.pk == user.pk and cached.email == user.email
+        assert cached.get_deferred_fields() == {'password', 'last_login'}
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('user-me'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['full_name'] == user.full_name
+        assert user_queries(queries) == []
+
+    def test_first_request_caches_principal(self, user):
+        client = token_client(user)
+        client.get(reverse('notification-unread-count'))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('notification-unread-count'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert user_queries(queries) == []
+
+    def test_deactivation_invalidates(self, user):
+        client = token_client(user)
+        client.get(reverse('notification-unread-count'))
+
+        user.is_active = False
+        user.save()
+
+        response = client.get(reverse('notification-unread-count'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_update_and_password_change_invalidate(self, auth_client, user):
+        principals.set(user)
+        auth_client.patch(reverse('user-me'), {'bio': 'New bio'})
+        assert principals.get(user.pk) is None
+
+        principals.set(user)
+        user.set_password('new-password-123')
+        user.save()
+        assert principals.get(user.pk) is None
+
+    def test_login_keeps_principal(self, api_client, user):
+        principals.set(user)
+        api_client.post(reverse('login'), {'email': user.email, 'password': 'password'})
+        user.refresh_from_db()
+        assert user.last_login is not None
+
+        # Only the login's update of last_login happened, so the principal stays
+        assert principals.get(user.pk) is not None
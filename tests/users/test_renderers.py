@@ -0,0 +1,44 @@
+import datetime
+import decimal
+import uuid
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.renderers import JSONRenderer
+from users.renderers import FastJSONRenderer
+
+
+class TestFastJSONRenderer:
+    """Tests for the orjson-based JSON renderer."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('data', [
+        {'id': 1, 'title': 'caf\u00e9 \U0001f600', 'tags': ['a', 'b'], 'empty': None},
+        [{'line': 'one\u2028two\u2029three', 'control': '\x00\x1f"\\'}],
+        {1: 'integer key', 'nested': {'ok': True, 'score': 0.1234}},
+        {
+            'created_at': timezone.now(),
+            'date': datetime.date(2024, 1, 2),
+            'time': datetime.time(12, 30, 15, 123456),
+            'duration': datetime.timedelta(hours=1),
+            'price': decimal.Decimal('1.50'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': _('Frontend'),
+        },
+        {'huge': 2 ** 70},
+    ])
+    def test_output_matches_json_renderer(self, data):
+        """Test that the output is byte-for-byte the same as JSONRenderer's."""
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.unit
+    def test_indented_output_falls_back(self):
+        """Test that indented output is left to JSONRenderer."""
+        data = {'id': 1, 'items': [1, 2]}
+        media_type = 'application/json; indent=4'
+        assert FastJSONRenderer().render(data, media_type) == JSONRenderer().render(data, media_type)
+
+    @pytest.mark.unit
+    def test_none_renders_empty(self):
+        assert FastJSONRenderer().render(None) == b''
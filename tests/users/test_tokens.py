@@ -0,0 +1,62 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from users.models import RevokedToken
+from users.tokens import RefreshToken, purge_expired_tokens
+
+pytestmark = [pytest.mark.django_db, pytest.mark.api]
+
+
+class TestTokenRevocation:
+    """Tests for revoking refresh tokens on rotation and logout."""
+
+    def test_rotation_revokes_refresh_token(self, api_client, user):
+        refresh = str(RefreshToken.for_user(user))
+
+        response = api_client.post(reverse('token_refresh'), {'refresh': refresh})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['refresh'] != refresh
+        assert RevokedToken.objects.count() == 1
+
+        response = api_client.post(reverse('token_refresh'), {'refresh': refresh})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_logout_revokes_refresh_token(self, auth_client, user):
+        refresh = str(RefreshToken.for_user(user))
+
+        response = auth_client.post(reverse('logout'), {'refresh': refresh})
+        assert response.status_code == status.HTTP_205_RESET_CONTENT
+
+        response = auth_client.post(reverse('logout'), {'refresh': refresh})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = auth_client.post(reverse('token_refresh'), {'refresh': refresh})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestPurgeRevokedTokens:
+    """Tests for purging the revocations of expired tokens."""
+
+    @pytest.fixture
+    def revocations(self):
+        now = timezone.now()
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=f'expired-{i}', expires_at=now - timedelta(minutes=i + 1)) for i in range(5)]
+            + [RevokedToken(jti='live', expires_at=now + timedelta(days=1))]
+        )
+
+    def test_purge_in_batches(self, revocations):
+        assert purge_expired_tokens(batch_size=2, max_batches=2) == 4
+        assert purge_expired_tokens(batch_size=2) == 1
+        assert list(RevokedToken.objects.values_list('jti', flat=True)) == ['live']
+
+    def test_command(self, revocations):
+        out = StringIO()
+        call_command('purge_revoked_tokens', '--batch-size', '2', stdout=out)
+        assert 'Purged 5' in out.getvalue()
+        assert RevokedToken.objects.count() == 1
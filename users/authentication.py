@@ -0,0 +1,84 @@
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from users.principals import principals
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    simplejwt's JWTAuthentication, plus ``aauthenticate()`` for the async
+    views in ``users.views.asynchronous``, which loads the user through the
+    async ORM.
+
+    Users are read from the primary database, so new users can authenticate
+    right away and deactivation takes effect before replicas catch up, and
+    their principals are cached (see ``users.principals``), so most requests
+    authenticate without a query.
+    """
+
+    def get_users(self):
+        return self.user_model._default_manager.db_manager(router.db_for_write(self.user_model))
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        principal = principals.get(user_id)
+        if principal is not None:
+            return self.check_user(*principal, validated_token)
+
+        try:
+            user = self.get_users().get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        principals.set(user)
+        return self.check_user(user, get_md5_hash_password(user.password), validated_token)
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        principal = await principals.aget(user_id)
+        if principal is not None:
+            return self.check_user(*principal, validated_token)
+
+        try:
+            user = await self.get_users().aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        await principals.aset(user)
+        return self.check_user(user, get_md5_hash_password(user.password), validated_token)
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_user(self, user, password_hash, validated_token):
+        """
+        Return ``user`` if the token may still authenticate them, given the
+        digest of their password hash.
+        """
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,169 @@
+"""
+Versioned in-memory copies of small reference tables.
+
+Programming languages and skills change only through the admin, but are
+read on every page load and validated on every post and project write.
+Each process keeps a snapshot of such a table with its serialized data and
+reloads it when the catalog's version, shared through the cache, changes.
+Saving or deleting a row bumps the version.
+"""
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import router
+from rest_framework import serializers
+from users.encoders import RowEncoder
+from users.serializers import ProgrammingLanguageSerializer, SkillSerializer
+from users.versions import now_and_on_commit
+
+
+class CatalogSnapshot:
+    """The rows of a catalog at one version, with their serialized data."""
+
+    def __init__(self, version, rows, items):
+        self.version = version
+        self.rows = {row['id']: row for row in rows}
+        self.items = items
+        self.by_id = {item['id']: item for item in items}
+        # Rendered list pages, filled in by CatalogListMixin
+        self.rendered = {}
+
+
+class Catalog:
+    """
+    In-memory copy of ``serializer_class``'s model, in ``ordering`` order.
+
+    ``url_fields`` are the file fields whose URLs ``get_many()`` makes
+    absolute; the snapshot keeps them relative so it can serve any host.
+    """
+
+    def __init__(self, name, serializer_class, ordering=('name',), url_fields=()):
+        self.model = serializer_class.Meta.model
+        self.encoder = RowEncoder(serializer_class)
+        self.ordering = ordering
+        self.url_fields = tuple(url_fields)
+        self.version_key = f'catalog:{name}:version'
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Serializer fields are deep-copied per serializer; share the catalog
+        return self
+
+    def version(self):
+        """Return the current version, starting a new one if it was lost."""
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, time.time(), None)
+            version = cache.get(self.version_key)
+        return version
+
+    async def aversion(self):
+        version = await cache.aget(self.version_key)
+        if version is None:
+            await cache.aadd(self.version_key, time.time(), None)
+            version = await cache.aget(self.version_key)
+        return version
+
+    def bump(self):
+        """Start a new version, so every process reloads its snapshot."""
+        now_and_on_commit(lambda: cache.set(self.version_key, time.time(), None))
+
+    def snapshot(self, refresh=False):
+        """Return the snapshot of the current version, loading it if needed."""
+        version = self.version()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version or refresh:
+            snapshot = self._reload(version, refresh)
+        return snapshot
+
+    async def asnapshot(self, refresh=False):
+        version = await self.aversion()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version or refresh:
+            snapshot = await sync_to_async(self._reload)(version, refresh)
+        return snapshot
+
+    def _reload(self, version, refresh):
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version or refresh:
+                snapshot = self._snapshot = self.load(version)
+        return snapshot
+
+    def load(self, version):
+        fields = [field.attname for field in self.model._meta.concrete_fields]
+        rows = list(self.model.objects.order_by(*self.ordering).values(*fields))
+        return CatalogSnapshot(version, rows, self.encoder.encode(rows))
+
+    def __contains__(self, pk):
+        return pk in self.snapshot().rows
+
+    def instance(self, pk):
+        """Return a model instance for ``pk`` without a query, or None."""
+        row = self.snapshot().rows.get(pk)
+        if row is None:
+            return None
+        db = router.db_for_write(self.model)
+        return self.model.from_db(db, list(row), list(row.values()))
+
+    def absolute(self, items, request=None):
+        """Return copies of serialized ``items`` with absolute URLs."""
+        if request is None or not self.url_fields:
+            return [dict(item) for item in items]
+        data = []
+        for item in items:
+            item = dict(item)
+            for name in self.url_fields:
+                if item[name] is not None:
+                    item[name] = request.build_absolute_uri(item[name])
+            data.append(item)
+        return data
+
+    def get_many(self, ids, request=None):
+        """Return ``{id: data}`` for the given ids, as the serializer renders them."""
+        snapshot = self.snapshot()
+        # Rows referenced from the database may be newer than the snapshot
+        if any(pk not in snapshot.by_id for pk in ids):
+            snapshot = self.snapshot(refresh=True)
+        return self._select(snapshot, ids, request)
+
+    async def aget_many(self, ids, request=None):
+        snapshot = await self.asnapshot()
+        if any(pk not in snapshot.by_id for pk in ids):
+            snapshot = await self.asnapshot(refresh=True)
+        return self._select(snapshot, ids, request)
+
+    def _select(self, snapshot, ids, request):
+        items = [snapshot.by_id[pk] for pk in ids if pk in snapshot.by_id]
+        return {item['id']: item for item in self.absolute(items, request)}
+
+
+class CatalogPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField that validates against a Catalog in memory."""
+
+    def __init__(self, catalog, **kwargs):
+        self.catalog = catalog
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        return self.catalog.model.objects.all()
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        instance = self.catalog.instance(pk)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+
+language_catalog = Catalog('language', ProgrammingLanguageSerializer, url_fields=['icon'])
+skill_catalog = Catalog('skill', SkillSerializer)
@@ -0,0 +1,163 @@
+"""
+Fast read path serializing ``.values()`` rows instead of model instances.
+
+A RowEncoder is compiled once from a serializer class and renders rows with
+the same output as the serializer renders the corresponding instances,
+without building model instances or going through each field's
+``get_attribute()``. Fields the serializer computes per instance (nested
+serializers and method fields) are declared as ``computed`` and read from
+row keys of the same name, which the caller fills in, or ``omit``-ted and
+added later (see ``users.fragments``).
+"""
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+from rest_framework import serializers
+from socialistic.metrics import timed
+from users.fragments import FragmentCache
+from users.models import Skill, Follow
+from users.serializers import UserSerializer, SkillSerializer
+
+User = get_user_model()
+
+# Fields whose to_representation() returns values from the database as is
+PLAIN_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class RowEncoder:
+    """Renders ``.values()`` rows like ``serializer_class`` renders instances."""
+
+    def __init__(self, serializer_class, computed=(), omit=()):
+        self.serializer_class = serializer_class
+        self.field_names = []
+        self.columns = []
+        self.steps = []
+
+        model = serializer_class.Meta.model
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            self.field_names.append(name)
+            if name in omit:
+                continue
+            if name in computed:
+                self.steps.append((name, name, None))
+                continue
+            if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField,
+                                  serializers.ManyRelatedField)):
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{name} can't be read from a column "
+                    f"and must be listed in 'computed'."
+                )
+
+            if isinstance(field, serializers.FileField):
+                convert = (field, model._meta.get_field(field.source))
+            elif isinstance(field, PLAIN_FIELDS):
+                convert = None
+            else:
+                convert = field.to_representation
+            self.columns.append(field.source)
+            self.steps.append((name, field.source, convert))
+
+    def _file_converter(self, field, model_field, request):
+        use_url = getattr(field, 'use_url', True)
+
+        def convert(name):
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = model_field.attr_class(None, model_field, name).url
+            return request.build_absolute_uri(url) if request is not None else url
+        return convert
+
+    @timed('serialize')
+    def encode(self, rows, request=None):
+        """Return the serialized data of ``rows``."""
+        steps = [
+            (name, key, self._file_converter(*convert, request) if isinstance(convert, tuple) else convert)
+            for name, key, convert in self.steps
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for name, key, convert in steps:
+                value = row[key]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+
+user_encoder = RowEncoder(UserSerializer, computed=['skills'], omit=['is_following'])
+skill_encoder = RowEncoder(SkillSerializer)
+
+
+def load_user_fragments(user_ids):
+    """
+    Load and encode the fragments of the given users in two queries, from
+    the primary since they are cached well past any replica lag.
+    """
+    users = list(User.objects.using(DEFAULT_DB_ALIAS).filter(id__in=user_ids).with_profile_data(
+        skills=False
+    ).order_by().values(*user_encoder.columns))
+
+    skills = {}
+    rows = list(Skill.objects.using(DEFAULT_DB_ALIAS).filter(users__in=user_ids).values(
+        *skill_encoder.columns, skill_user_id=F('users')
+    ))
+    for row, data in zip(rows, skill_encoder.encode(rows)):
+        skills.setdefault(row['skill_user_id'], []).append(data)
+
+    for row in users:
+        row['skills'] = skills.get(row['id'], [])
+    return {user['id']: user for user in user_encoder.encode(users)}
+
+
+user_fragments = FragmentCache(
+    'user', user_encoder, load_user_fragments, url_fields=['profile_image']
+)
+
+
+def encode_users(user_ids, request=None):
+    """
+    Return ``{id: data}`` for the given users as UserSerializer renders
+    them, from cached fragments plus one query for ``is_following``.
+    """
+    fragments = user_fragments.get_many(user_ids)
+
+    viewer = getattr(request, 'user', None)
+    following = set()
+    if viewer is not None and viewer.is_authenticated:
+        following = set(Follow.objects.filter(
+            follower=viewer, following_id__in=fragments
+        ).values_list('following_id', flat=True))
+
+    return {
+        pk: user_fragments.assemble(fragment, request, is_following=pk in following)
+        for pk, fragment in fragments.items()
+    }
+
+
+
+async def aencode_users(user_ids, request=None):
+    """Async ``encode_users()``."""
+    fragments = await user_fragments.aget_many(user_ids)
+
+    viewer = getattr(request, 'user', None)
+    following = set()
+    if viewer is not None and viewer.is_authenticated:
+        following = {pk async for pk in Follow.objects.filter(
+            follower=viewer, following_id__in=fragments
+        ).values_list('following_id', flat=True)}
+
+    return {
+        pk: user_fragments.assemble(fragment, request, is_following=pk in following)
+        for pk, fragment in fragments.items()
+    }
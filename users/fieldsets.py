@@ -0,0 +1,80 @@
+"""
+Sparse fieldsets and expansion control for API responses.
+
+``?fields=id,title,creator.username`` limits a response to the listed fields,
+with dotted paths selecting fields of nested objects. ``?expand=creator``
+lists the relations rendered as nested objects; when given, every other
+relation is rendered as its primary key(s). Without either parameter all
+fields are returned and all relations are nested.
+"""
+
+
+def parse_paths(value):
+    """Parse ``"a,b.c,b.d"`` into ``{'a': {}, 'b': {'c': {}, 'd': {}}}``."""
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+class FieldSelection:
+    """
+    The fields and expanded relations selected at one level of a response.
+
+    ``fields`` and ``expand`` are trees as returned by ``parse_paths``, or
+    None to select all fields or expand all relations.
+    """
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields or None
+        self.expand = expand
+
+    @classmethod
+    def from_query_params(cls, query_params):
+        fields = query_params.get('fields')
+        expand = query_params.get('expand')
+        return cls(
+            parse_paths(fields) if fields else None,
+            parse_paths(expand) if expand is not None else None
+        )
+
+    @property
+    def is_default(self):
+        return self.fields is None and self.expand is None
+
+    def includes(self, name):
+        """Whether the field ``name`` is rendered."""
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        """Whether the relation ``name`` is rendered as nested objects."""
+        return self.includes(name) and (self.expand is None or name in self.expand)
+
+    def nested(self, name):
+        """Return the selection for the nested object in ``name``."""
+        return FieldSelection(
+            None if self.fields is None else self.fields.get(name),
+            None if self.expand is None else self.expand.get(name, {})
+        )
+
+    def _resolve(self, path):
+        *parents, name = path.split('.')
+        selection = self
+        for parent in parents:
+            if not selection.expands(parent):
+                return None, name
+            selection = selection.nested(parent)
+        return selection, name
+
+    def includes_path(self, path):
+        """Like ``includes()`` for a dotted path into nested objects."""
+        selection, name = self._resolve(path)
+        return selection is not None and selection.includes(name)
+
+    def expands_path(self, path):
+        """Like ``expands()`` for a dotted path into nested objects."""
+        selection, name = self._resolve(path)
+        return selection is not None and selection.expands(name)
@@ -0,0 +1,44 @@
+"""
+Identity map shared by the sub-requests of a batch (see ``socialistic.batch``).
+
+Inside ``identity_map()``, values read through ``users.fragments`` and
+``users.versions`` are remembered by cache key, so the sub-requests of a
+batch that render the same users or posts fetch them from the cache once.
+Writes in the batch drop the keys they invalidate. Outside a batch every
+function here is a no-op.
+"""
+import contextvars
+from contextlib import contextmanager
+
+_identity_map = contextvars.ContextVar('identity_map', default=None)
+
+
+@contextmanager
+def identity_map():
+    """Share values read by cache key until the block exits."""
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+def get_many(keys):
+    """Return ``{key: value}`` for the given keys found in the identity map."""
+    values = _identity_map.get()
+    if not values:
+        return {}
+    return {key: values[key] for key in keys if key in values}
+
+
+def set_many(data):
+    values = _identity_map.get()
+    if values is not None:
+        values.update(data)
+
+
+def discard(keys):
+    values = _identity_map.get()
+    if values:
+        for key in keys:
+            values.pop(key, None)
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from users.tokens import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete the revocations of expired refresh tokens in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.REVOKED_TOKENS_PURGE_BATCH_SIZE,
+                            help='rows deleted per transaction')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='stop after this many batches')
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_tokens(options['batch_size'], options['max_batches'])
+        self.stdout.write(f'Purged {deleted} expired token revocations')
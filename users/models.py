@@ -1,9 +1,50 @@
 from django.db import models
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
 
-class UserManager(BaseUserManager):
+def _follow_count(field):
+    """Subquery counting Follow rows whose ``field`` is the outer user."""
+    follows = Follow.objects.filter(**{field: OuterRef('pk')}).order_by()
+    return Coalesce(
+        Subquery(follows.values(field).annotate(count=Count('pk')).values('count')),
+        0
+    )
+
+
+class UserQuerySet(models.QuerySet):
+    """QuerySet with helpers for loading what UserSerializer reads."""
+    
+    def with_profile_data(self, viewer=None, skills=True, counts=True):
+        """
+        Annotate follow counts and whether ``viewer`` follows each user, and
+        prefetch skills, so serializing the users needs no per-row queries.
+        
+        ``skills=False`` and ``counts=False`` skip loading data the response
+        doesn't include.
+        """
+        queryset = self
+        if counts:
+            queryset = queryset.annotate(
+                followers_count=_follow_count('following'),
+                following_count=_follow_count('follower'),
+            )
+        if skills:
+            queryset = queryset.prefetch_related('skills')
+        
+        if viewer is not None and viewer.is_authenticated:
+            queryset = queryset.annotate(
+                viewer_is_following=Exists(
+                    Follow.objects.filter(follower=viewer, following=OuterRef('pk'))
+                )
+            )
+        
+        return queryset
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Custom user manager for email-based authentication."""
     
     def create_user(self, email, username, password=None, **extra_fields):
@@ -70,14 +111,27 @@ class User(AbstractUser):
         """Unfollow another user."""
         Follow.objects.filter(follower=self, following=user).delete()
     
+    # Counts annotated by UserQuerySet.with_profile_data() take precedence
     @property
     def followers_count(self):
+        if hasattr(self, '_followers_count'):
+            return self._followers_count
         return self.followers.count()
     
+    @followers_count.setter
+    def followers_count(self, value):
+        self._followers_count = value
+    
     @property
     def following_count(self):
+        if hasattr(self, '_following_count'):
+            return self._following_count
         return self.following.count()
     
+    @following_count.setter
+    def following_count(self, value):
+        self._following_count = value
+    
     class Meta:
         ordering = ['-date_joined']
 
@@ -123,6 +177,25 @@ class Follow(models.Model):
     class Meta:
         unique_together = ('follower', 'following')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['following', '-created_at', '-id']),
+            models.Index(fields=['follower', '-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.follower.username} follows {self.following.username}"
+
+
+class RevokedToken(models.Model):
+    """
+    A refresh token revoked before it expires, by logout or rotation.
+    
+    Only the token's id and expiry are kept, and rows are purged once the
+    token would have expired anyway (see ``users.tokens``).
+    """
+    
+    jti = models.CharField(_('token id'), max_length=255, primary_key=True)
+    expires_at = models.DateTimeField(_('expires at'), db_index=True)
+    
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class FollowCursorPagination(CursorPagination):
+    """
+    Keyset pagination over follow relationships.
+
+    Pages are addressed by the position of the last ``Follow`` row instead of
+    an OFFSET, so deep pages of large follower lists cost the same as the
+    first one. ``id`` breaks ties between follows created at the same time.
+    """
+    ordering = ('-created_at', '-id')
+
+
+class SkillPagination(PageNumberPagination):
+    """
+    Pagination for the skill catalog, which fits on a page or two.
+    """
+    page_size = 100
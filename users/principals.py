@@ -0,0 +1,90 @@
+"""
+Cached principals of authenticated users.
+
+JWT authentication needs the user of every request, and reading the row
+from the primary database would cost each request a query. A principal is
+the user's row without ``password`` and ``last_login``, cached as a tuple
+of values under a key stamped with the field names, so principals of an
+older shape are never read after a deploy adds a field. ``get()`` rebuilds
+a User from it with those two fields deferred: views use it as usual, and
+the rare code reading them loads them from the database.
+
+The principal also carries the digest of the password hash that tokens are
+checked against when ``CHECK_REVOKE_TOKEN`` is on. Signal handlers delete
+the principal of a user who is saved or deleted, which covers updates,
+deactivation and password changes; logins, which only save
+``last_login``, leave it in place.
+"""
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from users.versions import now_and_on_commit
+
+# Principals expire after this many seconds even if no change deletes them,
+# which bounds how long a change bypassing signals, like
+# QuerySet.update(), goes unnoticed
+PRINCIPAL_TIMEOUT = 60 * 15
+
+# Fields not cached, loaded when read
+DEFERRED_FIELDS = ('password', 'last_login')
+
+
+class PrincipalCache:
+    """Cached principals of the users of ``model``, keyed by id."""
+
+    def __init__(self, model, timeout=PRINCIPAL_TIMEOUT):
+        self.model = model
+        self.timeout = timeout
+        self.fields = [
+            field for field in model._meta.concrete_fields if field.attname not in DEFERRED_FIELDS
+        ]
+        self.field_names = [field.attname for field in self.fields]
+        stamp = hashlib.md5(','.join(self.field_names).encode()).hexdigest()[:8]
+        self.prefix = f'principal:{stamp}'
+
+    def key(self, pk):
+        return f'{self.prefix}:{pk}'
+
+    def pack(self, user):
+        return (
+            tuple(field.get_prep_value(getattr(user, field.attname)) for field in self.fields),
+            get_md5_hash_password(user.password),
+        )
+
+    def unpack(self, principal):
+        """Return the user and the password digest of a cached principal."""
+        values, password_hash = principal
+        # Principals stand for rows of the primary database, which users
+        # are authenticated against
+        user = self.model.from_db(router.db_for_write(self.model), self.field_names, values)
+        return user, password_hash
+
+    def get(self, pk):
+        """Return ``(user, password digest)``, or None if not cached."""
+        principal = cache.get(self.key(pk))
+        return None if principal is None else self.unpack(principal)
+
+    async def aget(self, pk):
+        """Async ``get()``."""
+        principal = await cache.aget(self.key(pk))
+        return None if principal is None else self.unpack(principal)
+
+    def set(self, user):
+        """Cache the principal of ``user``, a full row of the database."""
+        cache.set(self.key(user.pk), self.pack(user), self.timeout)
+
+    async def aset(self, user):
+        """Async ``set()``."""
+        await cache.aset(self.key(user.pk), self.pack(user), self.timeout)
+
+    def invalidate(self, ids):
+        """Delete the principals of the given users."""
+        keys = [self.key(pk) for pk in ids]
+        if keys:
+            now_and_on_commit(lambda: cache.delete_many(keys))
+
+
+principals = PrincipalCache(get_user_model())
@@ -0,0 +1,58 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from socialistic.metrics import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer encoding with orjson when it's installed.
+
+    Produces the same bytes as JSONRenderer with the default compact,
+    unicode output. Indented output (e.g. for the browsable API) and data
+    orjson can't encode fall back to JSONRenderer.
+    """
+    encoder = JSONEncoder()
+
+    def can_use_orjson(self, accepted_media_type, renderer_context):
+        return (
+            orjson is not None
+            and self.encoder_class is JSONEncoder
+            and self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+
+    @timed('render')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not self.can_use_orjson(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Pass datetimes through to the DRF encoder, which formats them
+            # differently from orjson
+            ret = orjson.dumps(
+                data,
+                default=self.encoder.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            )
+        except TypeError:
+            # e.g. integers over 64 bits or lone surrogates
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # JSONRenderer escapes these for compatibility with JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class NormalizedJSONRenderer(FastJSONRenderer):
+    """
+    JSON renderer selected with ``?format=normalized``.
+
+    Views supporting the format replace nested users with their ids and
+    return each referenced user once in a top-level ``users`` map.
+    """
+    format = 'normalized'
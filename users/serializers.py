@@ -1,18 +1,73 @@
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
+from socialistic.metrics import timed
 from .models import Skill, ProgrammingLanguage, Follow
+from .tokens import RefreshToken
 
 User = get_user_model()
 
+# Serializer context key holding the FieldSelection of a read request
+FIELD_SELECTION = 'field_selection'
 
-class SkillSerializer(serializers.ModelSerializer):
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin applying the ``?fields=`` and ``?expand=`` selection.
+    
+    Fields that aren't selected are dropped before serialization, and nested
+    serializers that aren't expanded are replaced by their primary key(s).
+    Nested serializers find their part of the selection from the names of
+    the fields they're bound to.
+    """
+    
+    def get_field_selection(self):
+        selection = self.context.get(FIELD_SELECTION)
+        if selection is None:
+            return None
+        
+        path = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                path.append(node.field_name)
+            node = node.parent
+        for name in reversed(path):
+            selection = selection.nested(name)
+        return selection
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.get_field_selection()
+        if selection is None or selection.is_default:
+            return fields
+        
+        selected = {}
+        for name, field in fields.items():
+            if not selection.includes(name):
+                continue
+            if isinstance(field, serializers.BaseSerializer) and not selection.expands(name):
+                kwargs = {'read_only': True}
+                if field.source is not None:
+                    kwargs['source'] = field.source
+                many = isinstance(field, serializers.ListSerializer)
+                field = serializers.PrimaryKeyRelatedField(many=many, **kwargs)
+            selected[name] = field
+        return selected
+    
+    @timed('serialize')
+    def to_representation(self, instance):
+        return super().to_representation(instance)
+
+
+class SkillSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Skill
         fields = ['id', 'name', 'category']
 
 
-class ProgrammingLanguageSerializer(serializers.ModelSerializer):
+class ProgrammingLanguageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for programming languages."""
     
     class Meta:
@@ -20,7 +75,7 @@ class ProgrammingLanguageSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'icon']
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     skills = SkillSerializer(many=True, read_only=True)
     followers_count = serializers.IntegerField(read_only=True)
     following_count = serializers.IntegerField(read_only=True)
@@ -36,12 +91,73 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'email', 'created_at']
     
     def get_is_following(self, obj):
+        # Annotated by UserQuerySet.with_profile_data()
+        if hasattr(obj, 'viewer_is_following'):
+            return obj.viewer_is_following
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Follow.objects.filter(follower=request.user, following=obj).exists()
         return False
 
 
+class BulkFollowSerializer(serializers.Serializer):
+    """Validates the target users of a bulk follow or unfollow request."""
+    
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+
+
+# Serializer context key holding the ids of users to side-load
+SIDELOADED_USERS = 'sideloaded_users'
+
+
+class SideloadedUserField(serializers.Field):
+    """Represents a related user by id and records it for side-loading."""
+    
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        self.context[SIDELOADED_USERS].add(value)
+        return value
+
+
+class SideloadUsersMixin:
+    """
+    Serializer mixin for the normalized response format.
+    
+    When the context holds a ``sideloaded_users`` set, nested UserSerializer
+    fields are replaced by ``<field>_id`` and the referenced user ids are
+    collected, so the view can serialize each user once. The users are never
+    loaded while serializing the rows.
+    """
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if SIDELOADED_USERS not in self.context:
+            return fields
+        
+        sideloaded = {}
+        for name, field in fields.items():
+            if isinstance(field, UserSerializer):
+                source = f'{field.source or name}_id'
+                kwargs = {} if source == f'{name}_id' else {'source': source}
+                sideloaded[f'{name}_id'] = SideloadedUserField(**kwargs)
+        normalized = {}
+        for name, field in fields.items():
+            if isinstance(field, UserSerializer):
+                name = f'{name}_id'
+                normalized[name] = sideloaded[name]
+            elif name not in sideloaded:
+                normalized[name] = field
+        return normalized
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     confirm_password = serializers.CharField(write_only=True)
@@ -124,4 +240,9 @@ class UserUpdateSerializer(serializers.ModelSerializer):
             instance.skills.set(skills)
         
         # Update the rest of the fields
-        return super().update(instance, validated_data) 
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """simplejwt's refresh serializer, checking and revoking tokens in ``RevokedToken``."""
+    token_class = RefreshToken
@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .catalog import language_catalog, skill_catalog
+from .encoders import user_fragments
+from .models import Follow, ProgrammingLanguage, Skill
+from .principals import principals
+
+User = get_user_model()
+
+M2M_CHANGES = ('post_add', 'post_remove', 'post_clear')
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    """
+    Drop the cached fragment and principal of a changed user.
+    """
+    # Logins only save last_login, which neither of them holds
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    user_fragments.invalidate([instance.pk])
+    principals.invalidate([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    """
+    Drop the fragments whose follower and following counts changed.
+    """
+    user_fragments.invalidate([instance.follower_id, instance.following_id])
+
+
+@receiver(m2m_changed, sender=Skill.users.through)
+def user_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Drop the fragments of users whose skills changed.
+    """
+    # Skill.users is the forward side, so user.skills changes are reverse
+    if reverse:
+        if action in M2M_CHANGES:
+            user_fragments.invalidate([instance.pk])
+    elif action == 'pre_clear':
+        # pk_set isn't given when a skill is cleared from every user
+        user_fragments.invalidate(list(instance.users.values_list('pk', flat=True)))
+    elif action in M2M_CHANGES and pk_set:
+        user_fragments.invalidate(list(pk_set))
+
+
+@receiver([post_save, pre_delete], sender=Skill)
+def skill_changed(sender, instance, created=False, **kwargs):
+    """
+    Drop the fragments of the users listing a renamed or deleted skill.
+    """
+    if not created:
+        user_fragments.invalidate(list(
+            Skill.users.through.objects.filter(skill=instance).values_list('user_id', flat=True)
+        ))
+
+
+@receiver([post_save, post_delete], sender=ProgrammingLanguage)
+def language_changed(sender, instance, **kwargs):
+    """
+    Start a new version of the language catalog.
+    """
+    language_catalog.bump()
+
+
+@receiver([post_save, post_delete], sender=Skill)
+def skill_catalog_changed(sender, instance, **kwargs):
+    """
+    Start a new version of the skill catalog.
+    """
+    skill_catalog.bump()
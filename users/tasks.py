@@ -0,0 +1,9 @@
+from celery import shared_task
+from django.conf import settings
+from users.tokens import purge_expired_tokens
+
+
+@shared_task(ignore_result=True)
+def purge_revoked_tokens():
+    """Delete the revocations of expired refresh tokens, run hourly by Celery beat."""
+    return purge_expired_tokens(batch_size=settings.REVOKED_TOKENS_PURGE_BATCH_SIZE)
@@ -0,0 +1,84 @@
+"""
+Revocation of refresh tokens.
+
+simplejwt's token_blacklist app records every refresh token it issues and
+keeps both its outstanding and blacklisted tables until someone flushes
+them, so with rotation they grow with every refresh. Here only revoked
+tokens are recorded, as their id and expiry in ``RevokedToken``:
+
+- Logout and rotation insert one row keyed by the token's id, and checking
+  a refresh token is a primary key lookup, whatever the table's size.
+- A token is only worth recording until it expires, so
+  ``purge_expired_tokens()`` deletes the rows of expired tokens in bounded
+  batches. It runs periodically as a Celery task, or as
+  ``manage.py purge_revoked_tokens``.
+
+Revocations are read from the primary database, so a token can't be
+reused while replicas catch up.
+"""
+from django.db import IntegrityError, router, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from users.models import RevokedToken
+
+
+def revoked_tokens():
+    return RevokedToken.objects.db_manager(router.db_for_write(RevokedToken))
+
+
+class RevocationMixin:
+    """
+    Makes tokens fail verification once revoked, with the method names of
+    simplejwt's BlacklistMixin so simplejwt's views and serializers use it.
+    """
+
+    def verify(self, *args, **kwargs):
+        self.check_blacklist()
+        super().verify(*args, **kwargs)
+
+    def check_blacklist(self):
+        """Raise TokenError if this token was revoked."""
+        if revoked_tokens().filter(jti=self.payload[api_settings.JTI_CLAIM]).exists():
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """
+        Revoke this token. Raise TokenError if it was revoked already, for
+        instance by a concurrent refresh rotating it.
+        """
+        try:
+            with transaction.atomic(using=router.db_for_write(RevokedToken)):
+                return revoked_tokens().create(
+                    jti=self.payload[api_settings.JTI_CLAIM],
+                    expires_at=datetime_from_epoch(self.payload['exp']),
+                )
+        except IntegrityError:
+            raise TokenError(_("Token is blacklisted"))
+
+
+class RefreshToken(RevocationMixin, tokens.RefreshToken):
+    pass
+
+
+def purge_expired_tokens(batch_size=1000, max_batches=None):
+    """
+    Delete the revocations of expired tokens, ``batch_size`` rows per
+    transaction, stopping after ``max_batches`` batches. Returns the number
+    of rows deleted.
+    """
+    now = timezone.now()
+    deleted = batches = 0
+    while max_batches is None or batches < max_batches:
+        jtis = list(
+            revoked_tokens().filter(expires_at__lt=now).order_by('expires_at')
+            .values_list('jti', flat=True)[:batch_size]
+        )
+        if not jtis:
+            break
+        deleted += revoked_tokens().filter(jti__in=jtis).delete()[0]
+        batches += 1
+    return deleted
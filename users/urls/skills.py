@@ -0,0 +1,6 @@
+from django.urls import path
+from users.views.skills import SkillListView
+
+urlpatterns = [
+    path('', SkillListView.as_view(), name='skill-list'),
+]
@@ -1,13 +1,16 @@
 from django.urls import path
 from users.views.users import (
     UserListView, UserDetailView, UserPostsView, UserProjectsView,
-    UserFollowView, UserUnfollowView, UserFollowersView, UserFollowingView
+    UserFollowView, UserUnfollowView, UserFollowersView, UserFollowingView,
+    UserBulkFollowView, UserBulkUnfollowView
 )
 from users.views.auth import UserMe
 
 urlpatterns = [
     path('', UserListView.as_view(), name='user-list'),
     path('me/', UserMe.as_view(), name='user-me'),
+    path('bulk-follow/', UserBulkFollowView.as_view(), name='user-bulk-follow'),
+    path('bulk-unfollow/', UserBulkUnfollowView.as_view(), name='user-bulk-unfollow'),
     path('<int:pk>/', UserDetailView.as_view(), name='user-detail'),
     path('<int:pk>/posts/', UserPostsView.as_view(), name='user-posts'),
     path('<int:pk>/projects/', UserProjectsView.as_view(), name='user-projects'),
@@ -0,0 +1,90 @@
+"""
+Per-object change timestamps, used to validate conditional GETs.
+
+A version is the time an object's serialized data last changed, including
+changes to counters and related rows that don't touch its ``updated_at``.
+Signal handlers ``touch()`` the objects they change; views combine the
+versions of everything a response renders into its ETag and Last-Modified
+without building the body (see ``users.views.mixins.ConditionalGetMixin``).
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from users import identity
+
+# Versions expire after this many seconds even if nothing changes
+VERSION_TIMEOUT = 60 * 60 * 24
+
+
+def now_and_on_commit(function):
+    """
+    Call ``function`` now and again once the current transaction commits.
+
+    Caches of database rows are invalidated this way: a read between the
+    write and the commit still sees the old rows and may cache them again,
+    which the second call undoes.
+    """
+    function()
+    transaction.on_commit(function)
+
+
+class VersionCache:
+    """Change timestamps of one kind of object, keyed by id."""
+
+    def __init__(self, name, timeout=VERSION_TIMEOUT):
+        self.prefix = f'version:{name}'
+        self.timeout = timeout
+
+    def key(self, pk):
+        return f'{self.prefix}:{pk}'
+
+    def get_many(self, ids):
+        """Return ``{id: version}`` in the order of ``ids``, starting unknown versions now."""
+        keys = {self.key(pk): pk for pk in ids}
+        found = identity.get_many(keys)
+        uncached = [key for key in keys if key not in found]
+        if uncached:
+            found.update(cache.get_many(uncached))
+        versions = {keys[key]: version for key, version in found.items()}
+
+        # A lost version restarts at the current time rather than at any
+        # earlier value, so it can't validate a copy from before a change.
+        # add() leaves a version touched meanwhile in place.
+        for key, pk in keys.items():
+            if pk not in versions:
+                now = time.time()
+                if not cache.add(key, now, self.timeout):
+                    now = cache.get(key, now)
+                versions[pk] = now
+        identity.set_many({key: versions[pk] for key, pk in keys.items()})
+        return {pk: versions[pk] for pk in keys.values()}
+
+    async def aget_many(self, ids):
+        """Async ``get_many()``."""
+        keys = {self.key(pk): pk for pk in ids}
+        found = identity.get_many(keys)
+        uncached = [key for key in keys if key not in found]
+        if uncached:
+            found.update(await cache.aget_many(uncached))
+        versions = {keys[key]: version for key, version in found.items()}
+
+        for key, pk in keys.items():
+            if pk not in versions:
+                now = time.time()
+                if not await cache.aadd(key, now, self.timeout):
+                    now = await cache.aget(key, now)
+                versions[pk] = now
+        identity.set_many({key: versions[pk] for key, pk in keys.items()})
+        return {pk: versions[pk] for pk in keys.values()}
+
+    def touch(self, ids):
+        """Mark the given objects changed."""
+        keys = [self.key(pk) for pk in ids]
+        if keys:
+            identity.discard(keys)
+            now_and_on_commit(lambda: self._touch(keys))
+
+    def _touch(self, keys):
+        now = time.time()
+        cache.set_many({key: now for key in keys}, self.timeout)
@@ -0,0 +1,90 @@
+"""
+Async-native GET handling for the hottest read endpoints.
+
+Under ASGI, Django runs sync views one at a time per process on a shared
+thread, so a slow request holds up every other one. ``AsyncGetView``
+serves GET requests to a DRF view with its ``aget()`` coroutine instead,
+which reads through the async ORM and cache, and hands everything else to
+the DRF view itself, run in that thread.
+"""
+from asgiref.sync import sync_to_async
+from django.views import View
+from rest_framework.renderers import JSONRenderer
+
+
+class AsyncGetView(View):
+    """
+    Serves GET and HEAD requests with ``sync_view.cls.aget()``.
+
+    ``aget(request, *args, **kwargs)`` is called on a DRF view instance set
+    up as for ``dispatch()``: the request is authenticated with the
+    authenticators' ``aauthenticate()``, and has passed the permission and
+    throttle checks and content negotiation. It returns a Response, or None
+    to have ``sync_view`` answer the request. ``sync_view`` also answers
+    requests that aren't for plain JSON or don't authenticate with an
+    async-capable authenticator, so errors and other formats are rendered
+    exactly as before.
+    """
+    view_is_async = True
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # The DRF view does its own CSRF checks, for session authentication
+        view.csrf_exempt = True
+        # Callers dispatching requests synchronously use the DRF view
+        view.sync_view = initkwargs['sync_view']
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            response = await self.aget(request, *args, **kwargs)
+            if response is not None:
+                return response
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    async def aauthenticate(self, view, request):
+        """Return ``(user, auth)`` for ``request``, or None to fall back."""
+        for authenticator in view.get_authenticators():
+            if not hasattr(authenticator, 'aauthenticate'):
+                return None
+            try:
+                user_auth = await authenticator.aauthenticate(request)
+            except Exception:
+                # The sync view reports the error
+                return None
+            if user_auth is not None:
+                return user_auth
+        return None
+
+    def is_plain_json(self, request):
+        renderer = request.accepted_renderer
+        return isinstance(renderer, JSONRenderer) and request.accepted_media_type == renderer.media_type
+
+    async def aget(self, request, *args, **kwargs):
+        view = self.sync_view.cls(**self.sync_view.initkwargs)
+        user_auth = await self.aauthenticate(view, request)
+        if user_auth is None:
+            return None
+
+        view.args, view.kwargs = args, kwargs
+        request = view.initialize_request(request, *args, **kwargs)
+        request.user, request.auth = user_auth
+        view.request = request
+        view.headers = view.default_response_headers
+
+        try:
+            view.initial(request, *args, **kwargs)
+            if not self.is_plain_json(request):
+                return None
+            response = await view.aget(request, *args, **kwargs)
+            if response is None:
+                return None
+        except Exception as exc:
+            response = view.handle_exception(exc)
+
+        response = view.finalize_response(request, response, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
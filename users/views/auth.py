@@ -2,12 +2,12 @@ from rest_framework import status, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import get_user_model
+from users.principals import principals
 from users.serializers import UserCreateSerializer, UserSerializer
-
-User = get_user_model()
+from users.tokens import RefreshToken
+from users.views.mixins import FieldSelectionMixin
 
 
 class RegisterView(generics.CreateAPIView):
@@ -51,7 +51,7 @@ class LogoutView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserMe(generics.RetrieveUpdateAPIView):
+class UserMe(FieldSelectionMixin, generics.RetrieveUpdateAPIView):
     """
     API endpoint to get or update the authenticated user.
     """
@@ -67,13 +67,18 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     Custom JWT token view that returns user data with tokens.
     """
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        
+        # The serializer authenticated the user, so there's no need to
+        # look them up again; their first requests will find them cached
+        user = serializer.user
+        principals.set(user)
         
-        if response.status_code == status.HTTP_200_OK:
-            # Get user from the provided credentials
-            user = User.objects.get(email=request.data['email'])
-            
-            # Add user data to the response
-            response.data['user'] = UserSerializer(user, context={'request': request}).data
-            
-        return response 
\ No newline at end of file
+        # Add user data to the response
+        data = dict(serializer.validated_data)
+        data['user'] = UserSerializer(user, context={'request': request}).data
+        return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,247 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from users.encoders import encode_users
+from users.fieldsets import FieldSelection
+from users.renderers import NormalizedJSONRenderer
+from users.serializers import UserSerializer, SIDELOADED_USERS, FIELD_SELECTION
+
+User = get_user_model()
+
+# Seconds clients and shared caches may reuse a catalog list unvalidated
+CATALOG_MAX_AGE = 60 * 60
+
+
+class FieldSelectionMixin:
+    """
+    Adds the ``?fields=`` and ``?expand=`` query parameters to a generic view.
+    
+    The selection is passed to serializers using SparseFieldsMixin, and
+    ``get_queryset()`` implementations use it to skip loading data that
+    won't be rendered. It only applies to reads: write requests validate
+    and return every field.
+    """
+    
+    def get_field_selection(self):
+        if not hasattr(self, '_field_selection'):
+            if self.request.method in SAFE_METHODS:
+                self._field_selection = FieldSelection.from_query_params(self.request.query_params)
+            else:
+                self._field_selection = FieldSelection()
+        return self._field_selection
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        selection = self.get_field_selection()
+        if not selection.is_default:
+            context[FIELD_SELECTION] = selection
+        return context
+    
+    def get_profile_data_options(self, *paths):
+        """
+        Return ``UserQuerySet.with_profile_data()`` arguments loading only
+        what the selection renders of the users at the given paths, or of
+        the listed users themselves when no path is given.
+        """
+        selection = self.get_field_selection()
+        
+        def selected(name):
+            return any(
+                selection.includes_path(f'{path}.{name}' if path else name)
+                for path in paths or ('',)
+            )
+        
+        return {
+            'viewer': self.request.user if selected('is_following') else None,
+            'skills': selected('skills'),
+            'counts': selected('followers_count') or selected('following_count'),
+        }
+    
+    def get_user_queryset(self, queryset=None):
+        """Return the listed users with the profile data the selection renders."""
+        if queryset is None:
+            queryset = User.objects.all()
+        return queryset.with_profile_data(**self.get_profile_data_options())
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests with 304 Not Modified when the client's copy is
+    current, without building the body.
+    
+    Views call ``not_modified()`` with the versions (see ``users.versions``)
+    of everything the response renders, plus any other values it depends
+    on such as the ids of a page. The ETag is a digest of those, the viewer,
+    the request's path and the negotiated media type; Last-Modified is the
+    latest version.
+    """
+    
+    def not_modified(self, versions, *parts):
+        """Return a 304 response if the client's copy is current, else None."""
+        request = self.request
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        
+        versions = list(versions)
+        digest = hashlib.md5(repr((
+            request.user.pk, request.get_full_path(), request.accepted_media_type,
+            versions, parts,
+        )).encode()).hexdigest()
+        last_modified = int(max(versions)) if versions else None
+        self.validators = (quote_etag(digest), last_modified)
+        return get_conditional_response(request, etag=self.validators[0], last_modified=last_modified)
+    
+    def get_page_links(self):
+        """Return the pagination links of the current page, if paginated."""
+        if getattr(self.paginator, 'page', None) is None:
+            return None
+        return self.paginator.get_next_link(), self.paginator.get_previous_link()
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        
+        validators = getattr(self, 'validators', None)
+        if validators is not None and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class CatalogListMixin(ConditionalGetMixin):
+    """
+    Serves a list view from an in-memory ``users.catalog.Catalog``.
+    
+    JSON pages are rendered once per catalog version, host and page and
+    kept as bytes on the catalog snapshot. Responses may be cached for
+    ``cache_max_age`` seconds and are validated by the catalog version.
+    """
+    catalog = None
+    cache_max_age = CATALOG_MAX_AGE
+    
+    def list(self, request, *args, **kwargs):
+        snapshot = self.catalog.snapshot()
+        items = self.paginate_queryset(snapshot.items)
+        not_modified = self.not_modified([snapshot.version], self.get_page_links())
+        if not_modified is not None:
+            return not_modified
+        
+        # Only keep pages whose URL has nothing but the page number
+        renderer = request.accepted_renderer
+        if (
+            not isinstance(renderer, JSONRenderer)
+            or request.accepted_media_type != renderer.media_type
+            or not set(request.query_params) <= {self.paginator.page_query_param}
+        ):
+            return self.get_paginated_response(self.catalog.absolute(items, request))
+        
+        key = (request.build_absolute_uri('/'), self.paginator.page.number)
+        content = snapshot.rendered.get(key)
+        if content is None:
+            response = self.get_paginated_response(self.catalog.absolute(items, request))
+            content = renderer.render(response.data, renderer.media_type, self.get_renderer_context())
+            snapshot.rendered[key] = content
+        return HttpResponse(content, content_type=renderer.media_type)
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        
+        if request.method in SAFE_METHODS and response.status_code in (200, 304):
+            patch_cache_control(response, public=True, max_age=self.cache_max_age)
+            patch_vary_headers(response, ['Accept'])
+        return response
+
+
+class UserFragmentsMixin(FieldSelectionMixin):
+    """
+    Serves UserSerializer lists in the default shape from cached user
+    fragments, serializing only the users missing from the cache.
+    """
+    
+    def get_page_user_ids(self, page):
+        return [row['id'] for row in page]
+    
+    def get_list_rows(self):
+        return self.filter_queryset(self.get_queryset()).prefetch_related(None).values('id')
+    
+    def list(self, request, *args, **kwargs):
+        if not self.get_field_selection().is_default:
+            return super().list(request, *args, **kwargs)
+        
+        rows = self.get_list_rows()
+        page = self.paginate_queryset(rows)
+        user_ids = self.get_page_user_ids(page if page is not None else rows)
+        users = encode_users(user_ids, request)
+        data = [users[user_id] for user_id in user_ids if user_id in users]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class NormalizedUsersMixin(FieldSelectionMixin):
+    """
+    Adds the opt-in normalized response format to a generic view.
+    
+    With ``?format=normalized``, serializers using SideloadUsersMixin emit
+    ``<field>_id`` instead of nested users, and the referenced users are
+    loaded in one query and serialized once into a top-level ``users`` map
+    keyed by id. Paginated responses get the map next to ``results``;
+    other responses are wrapped as ``{"data": ..., "users": ...}``.
+    """
+    renderer_classes = list(api_settings.DEFAULT_RENDERER_CLASSES) + [NormalizedJSONRenderer]
+    
+    def is_normalized(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return isinstance(renderer, NormalizedJSONRenderer)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.is_normalized():
+            if not hasattr(self, 'sideloaded_users'):
+                self.sideloaded_users = set()
+            context[SIDELOADED_USERS] = self.sideloaded_users
+        return context
+    
+    def prefetch_users(self, queryset, *names):
+        """
+        Prefetch the nested users in the ``names`` relations with the profile
+        data the selection renders. Users that are side-loaded or collapsed
+        to their ids aren't loaded with the rows.
+        """
+        if self.is_normalized():
+            return queryset
+        
+        selection = self.get_field_selection()
+        for name in names:
+            if selection.expands(name):
+                users = User.objects.with_profile_data(**self.get_profile_data_options(name))
+                queryset = queryset.prefetch_related(Prefetch(name, queryset=users))
+        return queryset
+    
+    def get_sideloaded_users(self, user_ids):
+        users = User.objects.with_profile_data(self.request.user).filter(id__in=user_ids)
+        serializer = UserSerializer(users, many=True, context={'request': self.request})
+        return {str(user['id']): user for user in serializer.data}
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        
+        user_ids = getattr(self, 'sideloaded_users', None)
+        if user_ids is None or response.status_code >= 400 or response.data is None:
+            return response
+        
+        users = self.get_sideloaded_users(user_ids)
+        if isinstance(response.data, dict) and 'results' in response.data:
+            response.data['users'] = users
+        else:
+            response.data = {'data': response.data, 'users': users}
+        return response
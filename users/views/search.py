@@ -3,12 +3,13 @@ from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 from users.serializers import UserSerializer
-from users.models import Skill
+from users.catalog import skill_catalog
+from users.views.mixins import UserFragmentsMixin
 
 User = get_user_model()
 
 
-class UserSearchView(generics.ListAPIView):
+class UserSearchView(UserFragmentsMixin, generics.ListAPIView):
     """
     API endpoint for searching users.
     """
@@ -18,16 +19,12 @@ class UserSearchView(generics.ListAPIView):
     search_fields = ['username', 'full_name', 'bio']
     
     def get_queryset(self):
-        queryset = User.objects.all()
+        queryset = self.get_user_queryset()
         
         # Filter by skill if provided
-        skill_id = self.request.query_params.get('skill')
-        if skill_id:
-            try:
-                skill = Skill.objects.get(id=skill_id)
-                queryset = queryset.filter(skills=skill)
-            except Skill.DoesNotExist:
-                pass
+        skill_id = self.request.query_params.get('skill', '')
+        if skill_id.isdigit() and int(skill_id) in skill_catalog:
+            queryset = queryset.filter(skills=int(skill_id))
         
         # Filter by GitHub profile if provided
         has_github = self.request.query_params.get('has_github')
@@ -0,0 +1,18 @@
+from rest_framework import generics
+from rest_framework.permissions import AllowAny
+from users.catalog import skill_catalog
+from users.models import Skill
+from users.pagination import SkillPagination
+from users.serializers import SkillSerializer
+from users.views.mixins import CatalogListMixin
+
+
+class SkillListView(CatalogListMixin, generics.ListAPIView):
+    """
+    API endpoint to list all skills.
+    """
+    queryset = Skill.objects.all().order_by('name')
+    serializer_class = SkillSerializer
+    permission_classes = [AllowAny]
+    pagination_class = SkillPagination
+    catalog = skill_catalog
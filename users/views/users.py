@@ -4,34 +4,57 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from users.serializers import UserSerializer
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from users.models import Follow
+from users.serializers import UserSerializer, BulkFollowSerializer
+from users.pagination import FollowCursorPagination
+from users.views.mixins import ConditionalGetMixin, FieldSelectionMixin, UserFragmentsMixin
+from users.encoders import user_fragments
 from posts.serializers import PostSerializer
+from posts.views.posts import PostGraphMixin
 from projects.serializers import ProjectSerializer
+from projects.views.projects import ProjectGraphMixin
 from django.contrib.contenttypes.models import ContentType
 from notifications.models import Notification
+from notifications.signals import push_notifications
+from socialistic.throttling import RateLimitedMixin
 
 User = get_user_model()
 
 
-class UserListView(generics.ListAPIView):
+class UserListView(UserFragmentsMixin, generics.ListAPIView):
     """
     API endpoint for listing users.
     """
-    queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return self.get_user_queryset()
 
 
-class UserDetailView(generics.RetrieveAPIView):
+class UserDetailView(ConditionalGetMixin, FieldSelectionMixin, generics.RetrieveAPIView):
     """
     API endpoint for retrieving a user.
     """
-    queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return self.get_user_queryset()
+    
+    def retrieve(self, request, *args, **kwargs):
+        # The cached fragment tells whether the user exists
+        pk = kwargs['pk']
+        if pk in user_fragments.get_many([pk]):
+            not_modified = self.not_modified(user_fragments.versions.get_many([pk]).values())
+            if not_modified is not None:
+                return not_modified
+        return super().retrieve(request, *args, **kwargs)
 
 
-class UserPostsView(generics.ListAPIView):
+class UserPostsView(PostGraphMixin, generics.ListAPIView):
     """
     API endpoint for listing a user's posts.
     """
@@ -40,10 +63,10 @@ class UserPostsView(generics.ListAPIView):
     
     def get_queryset(self):
         user = get_object_or_404(User, pk=self.kwargs['pk'])
-        return user.posts.all()
+        return self.get_post_queryset(user.posts.all())
 
 
-class UserProjectsView(generics.ListAPIView):
+class UserProjectsView(ProjectGraphMixin, generics.ListAPIView):
     """
     API endpoint for listing a user's projects.
     """
@@ -52,14 +75,15 @@ class UserProjectsView(generics.ListAPIView):
     
     def get_queryset(self):
         user = get_object_or_404(User, pk=self.kwargs['pk'])
-        return user.created_projects.all()
+        return self.get_project_queryset(user.created_projects.all())
 
 
-class UserFollowView(APIView):
+class UserFollowView(RateLimitedMixin, APIView):
     """
     API endpoint for following a user.
     """
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'follows'
     
     def post(self, request, pk):
         user_to_follow = get_object_or_404(User, pk=pk)
@@ -87,11 +111,12 @@ class UserFollowView(APIView):
         return Response(status=status.HTTP_201_CREATED)
 
 
-class UserUnfollowView(APIView):
+class UserUnfollowView(RateLimitedMixin, APIView):
     """
     API endpoint for unfollowing a user.
     """
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'follows'
     
     def delete(self, request, pk):
         user_to_unfollow = get_object_or_404(User, pk=pk)
@@ -102,25 +127,160 @@ class UserUnfollowView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class UserFollowersView(generics.ListAPIView):
+class BulkFollowMixin(RateLimitedMixin):
     """
-    API endpoint for listing a user's followers.
+    Throttles bulk follow changes by the ``follows`` bucket of single ones,
+    taking a token per target user.
+    """
+    throttle_scope = 'follows'
+    
+    def get_throttle_cost(self, request):
+        serializer = BulkFollowSerializer(data=request.data)
+        if not serializer.is_valid():
+            return 1
+        return len(set(serializer.validated_data['user_ids']))
+
+
+class UserBulkFollowView(BulkFollowMixin, APIView):
+    """
+    API endpoint for following several users in one request.
     """
-    serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     
-    def get_queryset(self):
-        user = get_object_or_404(User, pk=self.kwargs['pk'])
-        return User.objects.filter(following__following=user)
+    def post(self, request):
+        serializer = BulkFollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_ids = set(serializer.validated_data['user_ids'])
+        
+        # Can't follow yourself
+        if request.user.id in user_ids:
+            return Response(
+                {"detail": "You cannot follow yourself."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        found_ids = set(
+            User.objects.filter(id__in=user_ids).values_list('id', flat=True)
+        )
+        already_following = set(
+            request.user.following.filter(
+                following_id__in=found_ids
+            ).values_list('following_id', flat=True)
+        )
+        
+        new_ids = []
+        with transaction.atomic():
+            # Each follow is inserted in its own savepoint, so that one made
+            # meanwhile by another request fails on the unique constraint
+            # and only the rows inserted here are notified
+            for user_id in sorted(found_ids - already_following):
+                try:
+                    with transaction.atomic():
+                        Follow.objects.bulk_create([
+                            Follow(follower=request.user, following_id=user_id)
+                        ])
+                except IntegrityError:
+                    already_following.add(user_id)
+                else:
+                    new_ids.append(user_id)
+            
+            # bulk_create skips post_save, so drop the stale follow counts here
+            user_fragments.invalidate([request.user.id, *new_ids])
+            
+            # bulk_create skips post_save, so push the batch once committed
+            notifications = Notification.objects.bulk_create([
+                Notification(
+                    recipient_id=user_id,
+                    sender=request.user,
+                    type='follow',
+                    content_type=ContentType.objects.get_for_model(User),
+                    object_id=user_id,
+                    text=f"{request.user.username} started following you"
+                )
+                for user_id in new_ids
+            ])
+            transaction.on_commit(lambda: push_notifications(notifications))
+        
+        return Response({
+            'followed': new_ids,
+            'already_following': sorted(already_following),
+            'not_found': sorted(user_ids - found_ids),
+        }, status=status.HTTP_201_CREATED)
 
 
-class UserFollowingView(generics.ListAPIView):
+class UserBulkUnfollowView(BulkFollowMixin, APIView):
     """
-    API endpoint for listing users that a user is following.
+    API endpoint for unfollowing several users in one request.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = BulkFollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        follows = request.user.following.filter(
+            following_id__in=serializer.validated_data['user_ids']
+        )
+        unfollowed = sorted(follows.values_list('following_id', flat=True))
+        follows.delete()
+        
+        return Response({'unfollowed': unfollowed}, status=status.HTTP_200_OK)
+
+
+class FollowListView(UserFragmentsMixin, generics.ListAPIView):
+    """
+    Base view for listing one side of a user's follow relationships.
+
+    Pages over ``Follow`` rows with keyset pagination and serializes the
+    user on the other side of each relationship.
     """
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = FollowCursorPagination
+    
+    # Field on Follow that points at the requested user
+    lookup_relation = None
+    # Field on Follow that points at the users being listed
+    listed_relation = None
     
     def get_queryset(self):
         user = get_object_or_404(User, pk=self.kwargs['pk'])
-        return User.objects.filter(followers__follower=user) 
\ No newline at end of file
+        return Follow.objects.filter(
+            **{self.lookup_relation: user}
+        ).prefetch_related(
+            Prefetch(self.listed_relation, queryset=self.get_user_queryset())
+        )
+    
+    def get_list_rows(self):
+        # The cursor is built from created_at and id
+        return self.get_queryset().prefetch_related(None).values(
+            'id', 'created_at', f'{self.listed_relation}_id'
+        )
+    
+    def get_page_user_ids(self, page):
+        return [row[f'{self.listed_relation}_id'] for row in page]
+    
+    def list(self, request, *args, **kwargs):
+        if self.get_field_selection().is_default:
+            return super().list(request, *args, **kwargs)
+        
+        page = self.paginate_queryset(self.get_queryset())
+        users = [getattr(follow, self.listed_relation) for follow in page]
+        serializer = self.get_serializer(users, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class UserFollowersView(FollowListView):
+    """
+    API endpoint for listing a user's followers.
+    """
+    lookup_relation = 'following'
+    listed_relation = 'follower'
+
+
+class UserFollowingView(FollowListView):
+    """
+    API endpoint for listing users that a user is following.
+    """
+    lookup_relation = 'follower'
+    listed_relation = 'following'